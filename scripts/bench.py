@@ -0,0 +1,231 @@
+"""
+Micro-benchmarks on synthetic episodes (no files outside a temp folder, no network).
+
+    python scripts/bench.py                 # all sections, 10k episodes
+    python scripts/bench.py editorial -n 2000
+"""
+import argparse
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from editorial import derive_editorial, derive_editorial_batch
+from editorial import utils as editorial_utils
+import catalog
+import faststart
+import metadata
+
+WORDS = (
+    "bass groove filter sweep tension drop loop layer pad arp chord resonance "
+    "swing kick snare hat pattern fill macro envelope release attack live"
+).split()
+GEAR = ["ASM Hydrasynth 49", "Elektron Digitakt", "Boss RC-505", "Arturia MatrixBrute", "Korg Wavestate"]
+GENRES = ["Funk house", "Funky House", "trance", "electronic", "techno", "melodic techno"]
+
+
+def _phrase(rng: random.Random, n: int) -> str:
+    return "  ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def synthetic_episodes(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        out.append({
+            "episode": {
+                "episode_id": f"DS-{i:05d}",
+                "episode_title": _phrase(rng, 3).title(),
+                "episode_type": rng.choice(["performance_challenge", "sound_design", "jam"]),
+            },
+            "music": {"genres": rng.sample(GENRES, 2), "tempo_bpm": rng.randint(90, 140)},
+            "gear": {"synths": rng.sample(GEAR[:2] + GEAR[3:], 2), "groovebox": [GEAR[1]], "looper": [GEAR[2]]},
+            "dopamine_core": {
+                "hook_line": _phrase(rng, rng.randint(4, 12)),
+                "core_idea": _phrase(rng, rng.randint(6, 14)),
+                "reward_moment": _phrase(rng, rng.randint(4, 10)),
+                "punchline": _phrase(rng, rng.randint(2, 5)),
+            },
+            "cta_intent": {"primary": "youtube_full", "secondary": rng.choice(["none", "optional_comment"])},
+            "release": {"week_id": "2026-W10", "package_ready": True},
+        })
+    return out
+
+
+def _timed(label: str, n: int, fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"  {label:<28} {dt * 1000:9.1f} ms   {dt / n * 1e6:8.1f} us/episode")
+    return dt
+
+
+def bench_editorial(episodes: list[dict]) -> None:
+    n = len(episodes)
+    tags = [["#livelooping", "#synth", "#hydrasynth"]] * n
+    print(f"[editorial] {n} synthetic episodes")
+
+    editorial_utils._collapse_spaces_str.cache_clear()
+    editorial_utils._sentence_case_str.cache_clear()
+    one = _timed("derive_editorial (loop)", n, lambda: [derive_editorial(m, t) for m, t in zip(episodes, tags)])
+
+    editorial_utils._collapse_spaces_str.cache_clear()
+    editorial_utils._sentence_case_str.cache_clear()
+    results = []
+    batch = _timed("derive_editorial_batch", n, lambda: results.extend(derive_editorial_batch(episodes, tags)))
+
+    assert results == [derive_editorial(m, t) for m, t in zip(episodes, tags)], "batch output differs"
+    print(f"  speedup x{one / batch:.2f}")
+
+
+def bench_metadata(episodes: list[dict]) -> None:
+    n = len(episodes)
+    print(f"[metadata] {n} metadata.yaml files")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        paths = []
+        for i, meta in enumerate(episodes):
+            p = root / "in" / f"ep{i:05d}" / metadata.METADATA_NAME
+            p.parent.mkdir(parents=True)
+            p.write_text(yaml.safe_dump(meta, allow_unicode=True, sort_keys=False), encoding="utf-8")
+            paths.append(p)
+
+        _timed("yaml.SafeLoader (pure Python)", n, lambda: [yaml.load(p.read_text(encoding="utf-8"), Loader=yaml.SafeLoader) for p in paths])
+        if metadata.SafeLoader is not yaml.SafeLoader:
+            _timed("yaml.CSafeLoader", n, lambda: [metadata.safe_load(p.read_text(encoding="utf-8")) for p in paths])
+        else:
+            print("  yaml.CSafeLoader             (not available: PyYAML built without libyaml)")
+
+        os.environ["METADATA_CACHE_DIR"] = str(root / "cache")
+        _timed("load_metadata_yaml (cold)", n, lambda: [metadata.load_metadata_yaml(p) for p in paths])
+        _timed("load_metadata_yaml (cached)", n, lambda: [metadata.load_metadata_yaml(p) for p in paths])
+        assert [metadata.load_metadata_yaml(p) for p in paths] == episodes, "cached metadata differs"
+        del os.environ["METADATA_CACHE_DIR"]
+
+
+def bench_catalog(episodes: list[dict]) -> None:
+    n = len(episodes)
+    print(f"[catalog] {n} episodes")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for i, meta in enumerate(episodes):
+            p = root / "in" / f"ep{i:05d}" / metadata.METADATA_NAME
+            p.parent.mkdir(parents=True)
+            p.write_text(yaml.safe_dump(meta, allow_unicode=True, sort_keys=False), encoding="utf-8")
+
+        os.environ["METADATA_CACHE_DIR"] = str(root / "cache")
+        out_root = root / "out"
+        _timed("update_catalog (full build)", n, lambda: catalog.update_catalog(out_root, root / "in"))
+        _timed("update_catalog (no change)", n, lambda: catalog.update_catalog(out_root, root / "in"))
+        del os.environ["METADATA_CACHE_DIR"]
+
+        for q in ("matrixbrute", "gear:digitakt AND genres:trance", "filter sweep"):
+            t0 = time.perf_counter()
+            rows = catalog.search(out_root, q, unpublished=True, limit=10_000)
+            print(f"  search {q!r:<36} {len(rows):6d} hits {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+
+def _box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def synthetic_mp4(path: Path, mdat_bytes: int, chunks: int = 256) -> list[bytes]:
+    """
+    ftyp + mdat + moov (moov last, like most camera/DAW exports). Two tracks: one with
+    an stco table, one with co64. Returns the 8 marker bytes each chunk offset points at.
+    """
+    step = mdat_bytes // chunks
+    ftyp = _box(b"ftyp", b"isom\0\0\x02\0isomiso2mp41")
+    mdat_start = len(ftyp) + 8
+    offsets = [mdat_start + i * step for i in range(chunks)]
+    markers = [struct.pack(">Q", 0xC0FFEE00 + i) for i in range(chunks)]
+
+    def trak(kind: bytes, fmt: str, mine: list[int]) -> bytes:
+        table = _box(kind, struct.pack(">II", 0, len(mine)) + b"".join(struct.pack(fmt, o) for o in mine))
+        return _box(b"trak", _box(b"mdia", _box(b"minf", _box(b"stbl", table))))
+
+    moov = _box(b"moov", _box(b"mvhd", bytes(100)) + trak(b"stco", ">I", offsets[::2]) + trak(b"co64", ">Q", offsets[1::2]))
+    filler = bytes(step - 8)
+    with path.open("wb") as f:
+        f.write(ftyp)
+        f.write(struct.pack(">I4s", 8 + step * chunks, b"mdat"))
+        for m in markers:
+            f.write(m)
+            f.write(filler)
+        f.write(moov)
+    return markers
+
+
+def _chunk_offsets(path: Path) -> list[int]:
+    with path.open("rb") as f:
+        atoms = faststart.read_atoms(f, path.stat().st_size)
+        moov = next(a for a in atoms if a.kind == b"moov")
+        f.seek(moov.offset)
+        data = f.read(moov.size)
+    found = {}
+    for kind, fmt, width in ((b"stco", ">I", 4), (b"co64", ">Q", 8)):
+        at = data.index(kind) + 4
+        count = struct.unpack_from(">I", data, at + 4)[0]
+        found[kind] = [struct.unpack_from(fmt, data, at + 8 + i * width)[0] for i in range(count)]
+    return [o for pair in zip(found[b"stco"], found[b"co64"]) for o in pair]
+
+
+def bench_faststart(episodes: list[dict]) -> None:
+    size_mb = 64
+    print(f"[faststart] synthetic {size_mb} MB video.mp4 (moov at the end)")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        src = root / "video.mp4"
+        markers = synthetic_mp4(src, size_mb * 1_048_576)
+
+        _timed("shutil.copy2", 1, lambda: shutil.copy2(src, root / "copy.mp4"))
+        tracemalloc.start()
+        _timed("faststart_copy", 1, lambda: faststart.faststart_copy(src, root / "fast.mp4"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  peak Python allocations      {peak / 1024:9.1f} KiB")
+
+        dst = root / "fast.mp4"
+        assert dst.stat().st_size == src.stat().st_size
+        assert not faststart.needs_faststart(dst), "moov is still after mdat"
+        with dst.open("rb") as f:
+            for offset, marker in zip(_chunk_offsets(dst), markers):
+                f.seek(offset)
+                assert f.read(8) == marker, f"chunk offset {offset} not patched"
+        assert faststart.faststart_copy(dst, root / "again.mp4") is False, "already faststart: plain copy expected"
+
+
+SECTIONS = {
+    "editorial": bench_editorial,
+    "metadata": bench_metadata,
+    "catalog": bench_catalog,
+    "faststart": bench_faststart,
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("sections", nargs="*", metavar="section", help=f"Any of: {', '.join(SECTIONS)} (default: all).")
+    ap.add_argument("-n", type=int, default=10_000, help="Number of synthetic episodes (default: 10000).")
+    args = ap.parse_args()
+    unknown = [s for s in args.sections if s not in SECTIONS]
+    if unknown:
+        ap.error(f"unknown section(s): {', '.join(unknown)}")
+
+    episodes = synthetic_episodes(args.n)
+    for name in args.sections or SECTIONS:
+        SECTIONS[name](episodes)
+
+
+if __name__ == "__main__":
+    main()
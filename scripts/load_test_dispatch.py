@@ -0,0 +1,142 @@
+"""
+Load test: real-run dispatch of many packages against the local platform stand-ins.
+
+    python scripts/load_test_dispatch.py                       # 200 packages, 2 MB videos, 16 in flight
+    python scripts/load_test_dispatch.py -n 500 --size-mb 8 --latency-ms 80 --bandwidth 2e6 \
+        --error-rate 0.02 --rate-limit 50
+
+Every package is a throwaway run folder (temp dir, hardlinked media) with YouTube and
+Reddit enabled. The adapters run unchanged, through googleapiclient / praw, pointed at
+src/standin.py servers by env. Timings come from the runs' journals.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from journal import read_entries
+from standin import Faults, StandIns
+
+PLATFORMS = ("youtube", "reddit")
+
+
+def make_runs(root: Path, n: int, size_mb: float) -> list[Path]:
+    media = root / "_media"
+    media.mkdir()
+    (media / "video.mp4").write_bytes(os.urandom(int(size_mb * 1_048_576)))
+    (media / "thumbnail.jpg").write_bytes(b"\xff\xd8\xff\xe0" + os.urandom(60_000))
+
+    runs = []
+    for i in range(n):
+        run = root / f"20260101_000000_{i:05d}"
+        (run / "media").mkdir(parents=True)
+        (run / "outbox").mkdir()
+        for name in ("video.mp4", "thumbnail.jpg"):
+            os.link(media / name, run / "media" / name)
+        (run / "outbox" / "reddit.md").write_text("stand-in\n", encoding="utf-8")
+        package = {
+            "id": f"LT-{i:05d}",
+            "title": f"Load test episode {i}",
+            "description": "Load test package.",
+            "hashtags": ["#electronicmusic"],
+            "media": {"video": "media/video.mp4", "thumbnail": "media/thumbnail.jpg"},
+            "platforms": {
+                "youtube": {"enabled": True, "visibility": "unlisted", "playlist_id": "PLstandin"},
+                "reddit": {"enabled": True, "subreddit": "synthesizers"},
+                "instagram": {"enabled": False},
+            },
+            "schedule": {"publish_at": None, "window": None},
+        }
+        (run / "post_package.json").write_text(json.dumps(package), encoding="utf-8")
+        runs.append(run)
+    return runs
+
+
+def _dispatch_one(run: Path) -> str | None:
+    from publish import dispatch
+
+    package = json.loads((run / "post_package.json").read_text(encoding="utf-8"))
+    try:
+        dispatch(package, package_dir=run, dry_run=False)
+    except Exception as e:  # the journal has the failed attempt
+        return f"{type(e).__name__}: {str(e)[:120]}"
+    return None
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def report(runs: list[Path], errors: list[str], wall_s: float, size_mb: float, stats: dict) -> None:
+    results = [e for run in runs for e in read_entries(run) if e.get("event") == "result"]
+    ok_runs = sum(1 for run in runs if {e["platform"] for e in read_entries(run) if e.get("outcome") == "ok"} >= set(PLATFORMS))
+
+    print(f"\n{len(runs)} packages in {wall_s:.1f}s: {len(runs) / wall_s:.1f} packages/s, "
+          f"{ok_runs} fully published, {len(errors)} dispatch errors")
+    sent = sum(e.get("bytes_sent", 0) for e in results if e.get("outcome") == "ok")
+    print(f"Uploaded {sent / 1_048_576:.0f} MiB ({sent * 8 / wall_s / 1e6:.0f} Mbit/s overall, {size_mb:g} MB videos)")
+
+    print(f"\n{'platform':<10} {'ok':>6} {'error':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for platform in PLATFORMS:
+        rows = [e for e in results if e.get("platform") == platform]
+        ms = [e["duration_ms"] for e in rows if e.get("outcome") == "ok" and "duration_ms" in e]
+        failed = sum(1 for e in rows if e.get("outcome") != "ok")
+        print(f"{platform:<10} {len(ms):>6} {failed:>6} {_pct(ms, .5):9.0f} {_pct(ms, .95):9.0f} {max(ms, default=0):9.0f}")
+
+    if errors:
+        print("\nMost common errors:")
+        counts: dict[str, int] = {}
+        for err in errors:
+            counts[err] = counts.get(err, 0) + 1
+        for err, c in sorted(counts.items(), key=lambda kv: -kv[1])[:5]:
+            print(f"  {c:>5}x {err}")
+
+    print("\nStand-in counters:")
+    for platform, counters in stats.items():
+        extra = {k: v for k, v in counters.items() if k in ("errors_injected", "rate_limited")}
+        print(f"  {platform:<10} {counters.get('requests', 0):>7} requests  "
+              f"{counters.get('bytes_in', 0) / 1_048_576:8.0f} MiB in  {extra or ''}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-n", type=int, default=200, help="Number of packages (default: 200).")
+    ap.add_argument("--size-mb", type=float, default=2.0, help="Video size per package (default: 2).")
+    ap.add_argument("--concurrency", type=int, default=16, help="Packages dispatched in parallel (default: 16).")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--bandwidth", type=float, default=0.0, help="Upload bytes/s per connection (default: unlimited).")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503.")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="Requests/s per platform before 429s.")
+    ap.add_argument("--processing-s", type=float, default=0.5, help="Server-side processing time per video.")
+    args = ap.parse_args()
+
+    faults = Faults(args.latency_ms, args.jitter_ms, args.bandwidth, args.error_rate, args.rate_limit)
+    with tempfile.TemporaryDirectory(prefix="load_test_") as tmp, \
+            StandIns(faults, processing_s=args.processing_s) as standins:
+        runs = make_runs(Path(tmp), args.n, args.size_mb)
+        os.environ.update(standins.env())
+        print(f"Dispatching {args.n} packages ({args.concurrency} in flight) to stand-ins: {faults}")
+
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(args.concurrency) as pool:
+            errors = [e for e in pool.map(_dispatch_one, runs) if e]
+        wall_s = time.perf_counter() - t0
+
+        report(runs, errors, wall_s, args.size_mb, standins.stats())
+
+
+if __name__ == "__main__":
+    main()
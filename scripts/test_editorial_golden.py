@@ -0,0 +1,116 @@
+"""
+Golden check for editorial/outbox text: renders fixed fixtures and compares them
+byte-for-byte with scripts/golden/<fixture>/<artifact>.
+
+    python scripts/test_editorial_golden.py           # compare
+    python scripts/test_editorial_golden.py --update  # rewrite goldens after an intended copy change
+"""
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from editorial import derive_editorial
+from main import derive_description, derive_hashtags, derive_platforms
+from outbox.reddit_outbox import render_reddit_outbox
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+
+FULL = {
+    "episode": {"episode_id": "DS-009", "episode_title": "Funking Punching Bass", "episode_type": "performance_challenge"},
+    "music": {"genres": ["Funk house", "electronic"], "mood": ["energetic", "focused"], "tempo_bpm": 122, "key": "Am"},
+    "gear": {
+        "synths": ["ASM Hydrasynth 49", "Arturia MatrixBrute", "Korg Wavestate"],
+        "groovebox": ["Elektron Digitakt"],
+        "looper": ["Boss RC-505"],
+    },
+    "dopamine_core": {
+        "hook_line": "the bass   pushes back against the groove",
+        "core_idea": "one filter sweep carries the whole tension on the MatrixBrute",
+        "reward_moment": "the drop lands on the fourth bar",
+        "punchline": "groove wins",
+    },
+    "cta_intent": {"primary": "youtube_full", "secondary": "optional_comment"},
+    "release": {"week_id": "2026-W02", "package_ready": True},
+    "platforms": {"youtube": {"enabled": True}, "reddit": {"enabled": True, "subreddit": "synthesizers"}},
+}
+
+SPARSE = {
+    "episode": {"episode_id": "DS-010", "episode_title": "A very long working title that goes on and on past sixty chars"},
+    "dopamine_core": {"hook_line": "", "core_idea": "", "reward_moment": "", "punchline": ""},
+    "cta_intent": {"secondary": "none"},
+}
+
+LONG_HOOK = {
+    "episode": {"episode_id": "DS-011", "episode_title": "Short"},
+    "music": {"genres": ["Trance"], "mood": ["dark", "driving", "hypnotic"]},
+    "gear": {"synths": ["ASM Hydrasynth 49", "ASM Hydrasynth 49"], "mixer": ["Yamaha MG-12"]},
+    "dopamine_core": {
+        "hook_line": "an arp that never resolves keeps climbing while the kick stays perfectly still underneath",
+        "core_idea": "tension",
+        "reward_moment": "the release finally arrives when everything drops out",
+        "punchline": "",
+    },
+}
+
+FIXTURES = {"full": FULL, "sparse": SPARSE, "long_hook": LONG_HOOK}
+
+# Lines that legitimately differ between runs.
+VOLATILE = [
+    (re.compile(r"^Absolute path \(for your reference\): `.*`$", re.M), "Absolute path (for your reference): `<abs>`"),
+]
+
+
+def render_fixture(meta: dict) -> dict:
+    hashtags = derive_hashtags(meta)
+    ed = derive_editorial(meta, hashtags)
+    package = {
+        "id": meta["episode"]["episode_id"],
+        "title": meta["episode"]["episode_title"],
+        "description": derive_description(meta),
+        "hashtags": hashtags,
+        "media": {"video": "media/video.mp4", "thumbnail": "media/thumbnail.jpg"},
+        "platforms": derive_platforms(meta),
+        "schedule": {"publish_at": None, "window": "full"},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = render_reddit_outbox(package, tmp, ed["reddit"]["md"])
+    for rx, repl in VOLATILE:
+        outbox = rx.sub(repl, outbox)
+
+    return {
+        "description.txt": package["description"],
+        "instagram.txt": ed["instagram"]["caption"],
+        "reddit_editorial.md": ed["reddit"]["md"],
+        "tiktok.txt": ed["tiktok"]["caption"],
+        "youtube_shorts_titles.txt": "\n".join(ed["shorts"]["youtube"]),
+        "reddit_outbox.md": outbox,
+    }
+
+
+def main() -> int:
+    update = "--update" in sys.argv
+    failures = 0
+    for name, meta in FIXTURES.items():
+        for artifact, text in render_fixture(meta).items():
+            path = GOLDEN_DIR / name / artifact
+            if update:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(text.encode("utf-8"))
+                continue
+            expected = path.read_bytes().decode("utf-8") if path.exists() else None
+            if expected != text:
+                failures += 1
+                print(f"MISMATCH {name}/{artifact}")
+    if update:
+        print(f"Goldens written to {GOLDEN_DIR}")
+        return 0
+    print("Golden OK" if not failures else f"{failures} golden mismatch(es)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
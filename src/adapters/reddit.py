@@ -3,8 +3,11 @@ from __future__ import annotations
 import os
 from pathlib import Path
 from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
 
 import praw
+import requests
+import requests.adapters
 
 
 def _get(d: Dict[str, Any], path: str, default=None):
@@ -23,6 +26,38 @@ def _require_env(name: str) -> str:
     return v
 
 
+class _PlainHTTPAdapter(requests.adapters.HTTPAdapter):
+    """Sends https:// requests for one host over plain http (see _server_overrides)."""
+
+    def send(self, request, **kwargs):
+        request.url = "http://" + request.url[len("https://"):]
+        return super().send(request, **kwargs)
+
+
+def _server_overrides() -> Dict[str, Any]:
+    """
+    REDDIT_URL / REDDIT_OAUTH_URL point praw at another server (e.g. the local stand-ins
+    in src/standin.py). praw always prefixes media upload leases with https:, so for a
+    plain-http server its host is mounted on a session that keeps those uploads on http.
+    """
+    reddit_url = os.getenv("REDDIT_URL")
+    oauth_url = os.getenv("REDDIT_OAUTH_URL")
+    if not (reddit_url or oauth_url):
+        return {}
+
+    overrides: Dict[str, Any] = {}
+    session = requests.Session()
+    for key, url in (("reddit_url", reddit_url), ("oauth_url", oauth_url)):
+        if not url:
+            continue
+        overrides[key] = url.rstrip("/")
+        parts = urlsplit(url)
+        if parts.scheme == "http":
+            session.mount(f"https://{parts.netloc}", _PlainHTTPAdapter())
+    overrides["requestor_kwargs"] = {"session": session}
+    return overrides
+
+
 def _build_reddit_client() -> praw.Reddit:
     return praw.Reddit(
         client_id=_require_env("REDDIT_CLIENT_ID"),
@@ -30,6 +65,7 @@ def _build_reddit_client() -> praw.Reddit:
         username=_require_env("REDDIT_USERNAME"),
         password=_require_env("REDDIT_PASSWORD"),
         user_agent=os.getenv("REDDIT_USER_AGENT", "automate_posting/1.0"),
+        **_server_overrides(),
     )
 
 
@@ -3,21 +3,64 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import Dict, Optional, Sequence
+
 from googleapiclient.http import MediaFileUpload
 
-from youtube_auth import get_youtube_service
+from youtube_auth import get_youtube_service, get_youtube_service_at
 
 
-def run(package: dict, package_dir: str, dry_run: bool = True) -> None:
+def _service():
+    api_base = os.getenv("YOUTUBE_API_BASE")
+    if api_base:
+        return get_youtube_service_at(api_base, os.getenv("YOUTUBE_ACCESS_TOKEN", ""))
+    client_secrets = os.environ["YOUTUBE_CLIENT_SECRETS"]
+    token_file = os.environ["YOUTUBE_TOKEN_FILE"]
+    return get_youtube_service(client_secrets, token_file)
+
+
+# videos.list accepts at most 50 ids per call (1 quota unit per call).
+MAX_IDS_PER_LIST = 50
+
+
+def processing_details(video_ids: Sequence[str], youtube=None) -> Dict[str, dict]:
+    """
+    videos.list(part=processingDetails,status) for any number of ids, 50 per call.
+    Returns {video_id: resource}; ids YouTube does not return (deleted, other channel) are absent.
+    """
+    youtube = youtube or _service()
+    found: Dict[str, dict] = {}
+    for i in range(0, len(video_ids), MAX_IDS_PER_LIST):
+        batch = video_ids[i:i + MAX_IDS_PER_LIST]
+        response = youtube.videos().list(
+            part="processingDetails,status",
+            id=",".join(batch),
+            maxResults=MAX_IDS_PER_LIST,
+        ).execute()
+        for item in response.get("items", []):
+            found[item["id"]] = item
+    return found
+
+
+def run(
+    package: dict,
+    package_dir: str,
+    dry_run: bool = True,
+    visibility_override: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Uploads the video (+ playlist, thumbnail). Returns the video id (None in dry-run).
+    visibility_override is used by pre-staging to upload as 'private' ahead of the window.
+    """
     cfg = package.get("platforms", {}).get("youtube", {})
     playlist_id = cfg.get("playlist_id")
 
     if not cfg.get("enabled", False):
-        return
+        return None
 
     title = package.get("title", "").strip()
     description = package.get("description", "").strip()
-    visibility = cfg.get("visibility", "unlisted")  # <-- recommandation: unlisted par défaut au début
+    visibility = visibility_override or cfg.get("visibility", "unlisted")  # <-- recommandation: unlisted par défaut au début
 
     video_rel = package["media"]["video"]
     thumb_rel = package["media"].get("thumbnail")
@@ -25,7 +68,8 @@ def run(package: dict, package_dir: str, dry_run: bool = True) -> None:
     video_path = str(Path(package_dir) / video_rel)
     thumb_path = str(Path(package_dir) / thumb_rel) if thumb_rel else None
 
-    print("\n[YOUTUBE] " + ("DRY-RUN" if dry_run else "REAL-RUN"))
+    mode = "DRY-RUN" if dry_run else "REAL-RUN"
+    print("\n[YOUTUBE] " + (f"PRE-STAGE {mode}" if visibility_override else mode))
     print(f"Title      : {title}")
     print(f"Visibility : {visibility}")
     print(f"Video      : {video_path}")
@@ -33,13 +77,10 @@ def run(package: dict, package_dir: str, dry_run: bool = True) -> None:
         print(f"Thumbnail  : {thumb_path}")
 
     if dry_run:
-        return
+        return None
 
     # --- Real upload ---
-    client_secrets = os.environ["YOUTUBE_CLIENT_SECRETS"]
-    token_file = os.environ["YOUTUBE_TOKEN_FILE"]
-
-    youtube = get_youtube_service(client_secrets, token_file)
+    youtube = _service()
 
     request_body = {
         "snippet": {
@@ -95,3 +136,33 @@ def run(package: dict, package_dir: str, dry_run: bool = True) -> None:
             media_body=MediaFileUpload(thumb_path),
         ).execute()
         print("Thumbnail set.")
+
+    return video_id
+
+
+def publish_prestaged(package: dict, video_id: str, dry_run: bool = True) -> Optional[str]:
+    """
+    Window-time half of pre-staging: the video, playlist and thumbnail are already on
+    YouTube as 'private'; only switch privacyStatus to the configured visibility.
+    """
+    cfg = package.get("platforms", {}).get("youtube", {})
+    if not cfg.get("enabled", False):
+        return None
+
+    visibility = cfg.get("visibility", "unlisted")
+
+    print("\n[YOUTUBE] " + ("DRY-RUN" if dry_run else "REAL-RUN") + " (pre-staged)")
+    print(f"Video id   : {video_id}")
+    print(f"Visibility : private → {visibility}")
+
+    if dry_run:
+        return None
+
+    # status is the only part sent; run() sets nothing else in it, so nothing is reset.
+    _service().videos().update(
+        part="status",
+        body={"id": video_id, "status": {"privacyStatus": visibility}},
+    ).execute()
+    print(f"Visibility set: {visibility}")
+
+    return video_id
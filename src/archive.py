@@ -0,0 +1,306 @@
+# src/archive.py
+"""
+Archival of fully published runs (every enabled platform done; manual-only platforms,
+journaled "skipped" by a real run, count as done) into one compressed tar per run:
+
+    data/out/_archive/<run_id>.tar.gz          (or .tar.bz2 / .tar.xz, ARCHIVE_CODEC)
+    data/out/_archive/<run_id>.tar.gz.index.json
+
+Each file is written as its own compressed stream (gzip member, bz2 or xz stream).
+Concatenated streams are still a regular tarball (`tar -xf` restores the run folder),
+and the index records where each member's stream starts, so post_package.json or
+the journal can be read back by decompressing only that member.
+
+Files are streamed through the compressor in COPY_CHUNK blocks: memory stays bounded
+whatever the video size. Media is only archived on request (--archive-media).
+"""
+from __future__ import annotations
+
+import bz2
+import json
+import lzma
+import os
+import shutil
+import tarfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from journal import JOURNAL_NAME, completed_platforms, completed_in, manual_platforms, parse_entries, read_entries
+from metadata import METADATA_NAME
+from runs import PACKAGE_NAME, iter_run_dirs, load_package
+from tracing import span
+
+ARCHIVE_DIR_NAME = "_archive"
+INDEX_SUFFIX = ".index.json"
+INDEX_VERSION = 1
+COPY_CHUNK = 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+# name -> (bundle suffix, compressor factory, decompressor factory)
+CODECS: Dict[str, Tuple[str, Callable[[], Any], Callable[[], Any]]] = {
+    "gz": (".tar.gz", lambda: zlib.compressobj(6, zlib.DEFLATED, 31), lambda: zlib.decompressobj(31)),
+    "bz2": (".tar.bz2", bz2.BZ2Compressor, bz2.BZ2Decompressor),
+    "xz": (".tar.xz", lambda: lzma.LZMACompressor(lzma.FORMAT_XZ), lambda: lzma.LZMADecompressor(lzma.FORMAT_XZ)),
+}
+DEFAULT_CODEC = "gz"
+
+# Small files first: the package is the first member of every bundle.
+_FIRST = (PACKAGE_NAME, METADATA_NAME, JOURNAL_NAME)
+
+
+class ArchiveError(Exception):
+    """Raised when a bundle or its index is missing, unreadable or inconsistent."""
+
+
+def archive_dir(out_root: Path) -> Path:
+    return out_root / ARCHIVE_DIR_NAME
+
+
+def codec_name() -> str:
+    name = os.getenv("ARCHIVE_CODEC", DEFAULT_CODEC)
+    if name not in CODECS:
+        raise ArchiveError(f"Unknown ARCHIVE_CODEC={name!r} (expected one of: {', '.join(CODECS)})")
+    return name
+
+
+def _run_files(run_dir: Path, include_media: bool) -> List[str]:
+    """Relative paths (posix) to archive, package first, media last."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(run_dir):
+        dirnames.sort()
+        for fn in sorted(filenames):
+            if fn.startswith(".") or fn.endswith(".tmp"):
+                continue
+            rel = (Path(dirpath) / fn).relative_to(run_dir).as_posix()
+            if rel.startswith("media/") and not include_media:
+                continue
+            files.append(rel)
+
+    def order(rel: str):
+        if rel in _FIRST:
+            return 0, _FIRST.index(rel), rel
+        return (2 if rel.startswith("media/") else 1), 0, rel
+
+    return sorted(files, key=order)
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+
+def _write_member(out, compressor, path: Path, arcname: str) -> Tuple[int, int]:
+    """One tar member (header + data + padding) as one compressed stream. Returns (header_len, size)."""
+    st = path.stat()
+    info = tarfile.TarInfo(arcname)
+    info.size = st.st_size
+    info.mtime = int(st.st_mtime)
+    info.mode = 0o644
+    header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+
+    out.write(compressor.compress(header))
+    copied = 0
+    with path.open("rb") as f:
+        while True:
+            block = f.read(COPY_CHUNK)
+            if not block:
+                break
+            copied += len(block)
+            out.write(compressor.compress(block))
+    if copied != st.st_size:
+        raise ArchiveError(f"{path} changed while it was archived")
+    pad = -st.st_size % tarfile.BLOCKSIZE
+    out.write(compressor.compress(b"\0" * pad) + compressor.flush())
+    return len(header), st.st_size
+
+
+def archive_run(run_dir: Path, dest_dir: Path, *, include_media: bool = False, codec: str = DEFAULT_CODEC) -> Path:
+    """
+    Writes <dest_dir>/<run_id><suffix> and its index (both atomically). The run folder
+    itself is left untouched. Returns the bundle path.
+    """
+    suffix, make_compressor, _ = CODECS[codec]
+    run_id = run_dir.name
+    bundle = dest_dir / f"{run_id}{suffix}"
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    members = []
+    tmp = dest_dir / f".{bundle.name}.tmp"
+    with span("archive_run") as sp:
+        try:
+            with tmp.open("wb") as out:
+                for rel in _run_files(run_dir, include_media):
+                    offset = out.tell()
+                    header_len, size = _write_member(out, make_compressor(), run_dir / rel, f"{run_id}/{rel}")
+                    members.append({"name": rel, "offset": offset, "header": header_len, "size": size})
+                c = make_compressor()
+                out.write(c.compress(b"\0" * (2 * tarfile.BLOCKSIZE)) + c.flush())  # end-of-archive
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, bundle)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+        index = {"version": INDEX_VERSION, "run_id": run_id, "codec": codec, "members": members}
+        index_path = bundle.with_name(bundle.name + INDEX_SUFFIX)
+        index_tmp = index_path.with_name(f".{index_path.name}.tmp")
+        index_tmp.write_text(json.dumps(index, indent=1), encoding="utf-8")
+        os.replace(index_tmp, index_path)
+
+        sp["files"] = len(members)
+        sp["bytes"] = sum(m["size"] for m in members)
+        sp["compressed"] = bundle.stat().st_size
+    return bundle
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+
+@dataclass
+class ArchivedRun:
+    """Random access to the members of one archived run (no unpacking)."""
+
+    run_id: str
+    bundle: Path
+    codec: str
+    members: Dict[str, dict]
+
+    @classmethod
+    def open(cls, bundle: Path) -> "ArchivedRun":
+        index_path = bundle.with_name(bundle.name + INDEX_SUFFIX)
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ArchiveError(f"Cannot read archive index {index_path} ({e})") from e
+        if index.get("version") != INDEX_VERSION or index.get("codec") not in CODECS:
+            raise ArchiveError(f"Unsupported archive index: {index_path}")
+        members = {m["name"]: m for m in index.get("members") or []}
+        return cls(run_id=str(index.get("run_id")), bundle=bundle, codec=index["codec"], members=members)
+
+    def names(self) -> List[str]:
+        return list(self.members)
+
+    def read(self, name: str) -> bytes:
+        """Decompresses one member's stream only."""
+        m = self.members.get(name)
+        if m is None:
+            raise ArchiveError(f"{name} is not in {self.bundle.name}")
+        want = m["header"] + m["size"]
+        decomp = CODECS[self.codec][2]()
+        data = bytearray()
+        with self.bundle.open("rb") as f:
+            f.seek(m["offset"])
+            while len(data) < want and not decomp.eof:
+                block = f.read(READ_CHUNK)
+                if not block:
+                    break
+                data += decomp.decompress(block)
+        if len(data) < want:
+            raise ArchiveError(f"Truncated member {name} in {self.bundle.name}")
+        return bytes(data[m["header"]:want])
+
+    def read_text(self, name: str) -> str:
+        return self.read(name).decode("utf-8")
+
+    def package(self) -> Dict[str, Any]:
+        return json.loads(self.read_text(PACKAGE_NAME))
+
+    def journal_entries(self) -> List[Dict[str, Any]]:
+        if JOURNAL_NAME not in self.members:
+            return []
+        return parse_entries(self.read_text(JOURNAL_NAME).splitlines())
+
+
+def iter_archived(out_root: Path) -> Iterator[ArchivedRun]:
+    """Archived runs under data/out/_archive, oldest first (unreadable indexes skipped)."""
+    root = archive_dir(out_root)
+    if not root.is_dir():
+        return
+    for index_path in sorted(root.glob(f"*{INDEX_SUFFIX}")):
+        try:
+            yield ArchivedRun.open(index_path.with_name(index_path.name[: -len(INDEX_SUFFIX)]))
+        except ArchiveError as e:
+            print(f"⚠️ Archive: {e}")
+
+
+def find_archived(out_root: Path, run_id: str) -> Optional[ArchivedRun]:
+    for suffix, _, _ in CODECS.values():
+        bundle = archive_dir(out_root) / f"{run_id}{suffix}"
+        if bundle.exists():
+            return ArchivedRun.open(bundle)
+    return None
+
+
+# -----------------------------
+# Command
+# -----------------------------
+
+def replayable_platforms(run_dir: Path) -> Optional[Set[str]]:
+    """
+    Enabled platforms a replay could still publish: not published for real, and not
+    manual-only (a real run journaled them "skipped", posted by hand). None when the
+    package is unreadable.
+    """
+    try:
+        platforms = load_package(run_dir).get("platforms") or {}
+    except (OSError, ValueError):
+        return None
+    entries = read_entries(run_dir)
+    enabled = {k for k, cfg in platforms.items() if isinstance(cfg, dict) and cfg.get("enabled") is True}
+    return enabled - completed_in(entries) - manual_platforms(entries)
+
+
+def fully_published(run_dir: Path) -> bool:
+    """
+    At least one real publish, and nothing left a replay could publish. A partly
+    published run stays in data/out: replay retries only its missing platforms there.
+    """
+    return bool(completed_platforms(run_dir)) and replayable_platforms(run_dir) == set()
+
+
+def run_archive(out_root: Path, *, include_media: bool, confirm: bool) -> int:
+    """
+    --archive: bundles every fully published run folder, checks the bundle, then removes
+    the folder. Preview only unless confirm. Returns the number of runs archived.
+    """
+    codec = codec_name()
+    runs = iter_run_dirs(out_root)
+    candidates = [d for d in runs if fully_published(d)]
+    partial = [d for d in runs if d not in candidates and completed_platforms(d)]
+    media = "with media" if include_media else "without media"
+    for d in partial:
+        missing = replayable_platforms(d)
+        hint = f"replay it to publish {', '.join(sorted(missing))}" if missing else "package unreadable"
+        print(f" - {d.name}: partly published, kept ({hint})")
+    if not candidates:
+        print("No fully published run folders to archive.")
+        return 0
+    if not confirm:
+        print(f"Would archive {len(candidates)} published run(s) ({codec}, {media}):")
+        for d in candidates:
+            print(f" - {d.name}")
+        print("(preview only: add --confirm to archive and remove the run folders)")
+        return 0
+
+    archived = 0
+    dest = archive_dir(out_root)
+    for run_dir in candidates:
+        try:
+            bundle = archive_run(run_dir, dest, include_media=include_media, codec=codec)
+            stored = ArchivedRun.open(bundle)
+            if stored.read(PACKAGE_NAME) != (run_dir / PACKAGE_NAME).read_bytes():
+                raise ArchiveError(f"{bundle.name}: archived package differs from the run folder")
+            if completed_in(stored.journal_entries()) != completed_platforms(run_dir):
+                raise ArchiveError(f"{bundle.name}: journal changed while archiving")
+        except (OSError, ArchiveError) as e:
+            print(f"❌ {run_dir.name}: {e} (run folder kept)")
+            continue
+        before = sum(p.stat().st_size for p in run_dir.rglob("*") if p.is_file())
+        shutil.rmtree(run_dir)
+        archived += 1
+        print(f" - {run_dir.name}: {before / 1_048_576:.1f} MB -> {bundle.name} ({bundle.stat().st_size / 1_048_576:.2f} MB)")
+    print(f"Archived {archived}/{len(candidates)} run(s) into {dest} ({media}).")
+    return archived
@@ -0,0 +1,387 @@
+# src/catalog.py
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from archive import iter_archived
+from gear import get_catalog
+from journal import completed_in, completed_platforms, journal_path
+from metadata import METADATA_NAME, load_metadata_yaml, safe_load
+from runs import PACKAGE_NAME, iter_run_dirs, load_package
+from scheduling.planner import find_metadata_files
+
+CATALOG_NAME = "catalog.sqlite"
+
+GEAR_SECTIONS = ("synths", "groovebox", "looper", "mixer", "interface")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    source        TEXT PRIMARY KEY,   -- metadata.yaml path, or run:<run_id>
+    kind          TEXT NOT NULL,      -- input | run
+    fingerprint   TEXT NOT NULL,
+    episode_id    TEXT NOT NULL,
+    episode_type  TEXT,
+    week_id       TEXT,
+    package_ready INTEGER,
+    gear          TEXT,
+    genres        TEXT,
+    title         TEXT,
+    run_id        TEXT,
+    published     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS docs_episode ON docs(episode_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    episode_id, title, description, editorial, gear, genres,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    episode_id    TEXT PRIMARY KEY,
+    episode_type  TEXT,
+    week_id       TEXT,
+    package_ready INTEGER,
+    gear          TEXT,
+    genres        TEXT,
+    title         TEXT,
+    runs          INTEGER NOT NULL DEFAULT 0,
+    last_run      TEXT,
+    published     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS episodes_type ON episodes(episode_type);
+CREATE INDEX IF NOT EXISTS episodes_week ON episodes(week_id);
+CREATE INDEX IF NOT EXISTS episodes_published ON episodes(published);
+"""
+
+
+@dataclass
+class CatalogUpdate:
+    scanned: int = 0
+    updated: int = 0
+    removed: int = 0
+
+
+def catalog_path(out_root: Path) -> Path:
+    return out_root / CATALOG_NAME
+
+
+def connect(out_root: Path) -> sqlite3.Connection:
+    out_root.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(catalog_path(out_root))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# -----------------------------
+# Documents
+# -----------------------------
+
+def _section(meta: dict, key: str) -> dict:
+    v = meta.get(key)
+    return v if isinstance(v, dict) else {}
+
+
+def _gear(meta: dict) -> str:
+    gear = _section(meta, "gear")
+    items = [
+        str(x) for k in GEAR_SECTIONS
+        for x in (gear.get(k) if isinstance(gear.get(k), list) else [])
+        if str(x).strip()
+    ]
+    return " · ".join(get_catalog().canonicalize(items))
+
+
+def _genres(meta: dict) -> str:
+    genres = _section(meta, "music").get("genres") or []
+    return ", ".join(str(g).strip() for g in genres if str(g).strip()) if isinstance(genres, list) else ""
+
+
+def _doc_from_meta(meta: dict) -> Optional[dict]:
+    epi = _section(meta, "episode")
+    episode_id = epi.get("episode_id")
+    if not isinstance(episode_id, str) or not episode_id.strip():
+        return None
+    rel = _section(meta, "release")
+    dc = _section(meta, "dopamine_core")
+    return {
+        "episode_id": episode_id.strip(),
+        "episode_type": str(epi.get("episode_type") or ""),
+        "week_id": rel.get("week_id") if isinstance(rel.get("week_id"), str) else None,
+        "package_ready": 1 if rel.get("package_ready") is True else 0,
+        "gear": _gear(meta),
+        "genres": _genres(meta),
+        "title": str(epi.get("episode_title") or ""),
+        "description": "\n".join(str(dc.get(k) or "") for k in ("hook_line", "core_idea", "reward_moment", "punchline")),
+        "editorial": "",
+    }
+
+
+def _doc_from_run(package: dict, meta: dict, editorial: str) -> Optional[dict]:
+    doc = _doc_from_meta(meta)
+    if doc is None:
+        # Runs from before metadata snapshots: the package id is the episode id.
+        if not package.get("id"):
+            return None
+        doc = {
+            "episode_id": str(package["id"]), "episode_type": "", "week_id": None,
+            "package_ready": 0, "gear": "", "genres": "", "title": "", "description": "", "editorial": "",
+        }
+    doc["title"] = str(package.get("title") or doc["title"])
+    doc["description"] = str(package.get("description") or doc["description"])
+    doc["editorial"] = editorial
+    return doc
+
+
+def _read_outbox(run_dir: Path) -> str:
+    outbox = run_dir / "outbox"
+    if not outbox.is_dir():
+        return ""
+    parts = []
+    for p in sorted(outbox.iterdir()):
+        if p.suffix in (".md", ".txt") and not p.name.startswith("."):
+            parts.append(p.read_text(encoding="utf-8", errors="replace"))
+    return "\n".join(parts)
+
+
+def _fingerprint(*paths: Path) -> str:
+    out = []
+    for p in paths:
+        try:
+            st = p.stat()
+            out.append(f"{st.st_size}:{st.st_mtime_ns}")
+        except FileNotFoundError:
+            out.append("-")
+    return "|".join(out)
+
+
+def _run_fingerprint(run_dir: Path) -> str:
+    outbox = run_dir / "outbox"
+    outbox_files = sorted(outbox.iterdir()) if outbox.is_dir() else []
+    return _fingerprint(run_dir / PACKAGE_NAME, run_dir / METADATA_NAME, journal_path(run_dir), *outbox_files)
+
+
+# -----------------------------
+# Incremental update
+# -----------------------------
+
+def _put_doc(conn: sqlite3.Connection, source: str, kind: str, fingerprint: str, doc: dict,
+             run_id: Optional[str] = None, published: bool = False) -> None:
+    row = conn.execute("SELECT rowid FROM docs WHERE source = ?", (source,)).fetchone()
+    if row:
+        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row[0],))
+        conn.execute("DELETE FROM docs WHERE rowid = ?", (row[0],))
+    cur = conn.execute(
+        "INSERT INTO docs (source, kind, fingerprint, episode_id, episode_type, week_id, package_ready,"
+        " gear, genres, title, run_id, published) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (source, kind, fingerprint, doc["episode_id"], doc["episode_type"], doc["week_id"], doc["package_ready"],
+         doc["gear"], doc["genres"], doc["title"], run_id, 1 if published else 0),
+    )
+    conn.execute(
+        "INSERT INTO docs_fts (rowid, episode_id, title, description, editorial, gear, genres)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (cur.lastrowid, doc["episode_id"], doc["title"], doc["description"], doc["editorial"], doc["gear"], doc["genres"]),
+    )
+
+
+def _drop_doc(conn: sqlite3.Connection, source: str) -> Optional[str]:
+    row = conn.execute("SELECT rowid, episode_id FROM docs WHERE source = ?", (source,)).fetchone()
+    if not row:
+        return None
+    conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (row[0],))
+    conn.execute("DELETE FROM docs WHERE rowid = ?", (row[0],))
+    return row[1]
+
+
+def _refresh_episodes(conn: sqlite3.Connection, episode_ids: Iterable[str]) -> None:
+    """Rebuild the episode rows from their documents (the input metadata wins over run snapshots)."""
+    for episode_id in episode_ids:
+        docs = conn.execute(
+            "SELECT * FROM docs WHERE episode_id = ? ORDER BY kind = 'input' DESC, run_id DESC",
+            (episode_id,),
+        ).fetchall()
+        conn.execute("DELETE FROM episodes WHERE episode_id = ?", (episode_id,))
+        if not docs:
+            continue
+        main = docs[0]
+        runs = [d["run_id"] for d in docs if d["kind"] == "run"]
+        conn.execute(
+            "INSERT INTO episodes (episode_id, episode_type, week_id, package_ready, gear, genres, title,"
+            " runs, last_run, published) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (episode_id, main["episode_type"], main["week_id"], main["package_ready"], main["gear"],
+             main["genres"], main["title"], len(runs), max(runs) if runs else None,
+             1 if any(d["published"] for d in docs) else 0),
+        )
+
+
+def update_catalog(out_root: Path, input_dir: Path) -> CatalogUpdate:
+    """
+    Brings data/out/catalog.sqlite up to date: one document per INPUT_DIR metadata.yaml
+    and per run folder, re-read only when its files' (size, mtime) changed.
+    """
+    result = CatalogUpdate()
+    touched: Set[str] = set()
+
+    with closing(connect(out_root)) as conn, conn:
+        known: Dict[str, Tuple[str, str]] = {
+            r["source"]: (r["fingerprint"], r["episode_id"])
+            for r in conn.execute("SELECT source, fingerprint, episode_id FROM docs")
+        }
+        seen: Set[str] = set()
+
+        for path in find_metadata_files(input_dir):
+            source = str(path.resolve())
+            seen.add(source)
+            result.scanned += 1
+            fp = _fingerprint(path)
+            if known.get(source, ("",))[0] == fp:
+                continue
+            try:
+                doc = _doc_from_meta(load_metadata_yaml(path))
+            except RuntimeError as e:
+                print(f"⚠️ Catalog: {e}")
+                continue
+            if doc is None:
+                continue
+            if source in known:
+                touched.add(known[source][1])
+            _put_doc(conn, source, "input", fp, doc)
+            touched.add(doc["episode_id"])
+            result.updated += 1
+
+        for run_dir in iter_run_dirs(out_root):
+            source = f"run:{run_dir.name}"
+            seen.add(source)
+            result.scanned += 1
+            fp = _run_fingerprint(run_dir)
+            if known.get(source, ("",))[0] == fp:
+                continue
+            try:
+                package = load_package(run_dir)
+                meta = load_metadata_yaml(run_dir / METADATA_NAME)
+            except Exception as e:
+                print(f"⚠️ Catalog: cannot read run {run_dir.name} ({e})")
+                continue
+            doc = _doc_from_run(package, meta, _read_outbox(run_dir))
+            if doc is None:
+                continue
+            if source in known:
+                touched.add(known[source][1])
+            _put_doc(conn, source, "run", fp, doc, run_id=run_dir.name,
+                     published=bool(completed_platforms(run_dir)))
+            touched.add(doc["episode_id"])
+            result.updated += 1
+
+        # Archived runs (data/out/_archive) stay searchable: members are read from the
+        # bundle index, and only when the bundle itself changed.
+        for archived in iter_archived(out_root):
+            source = f"run:{archived.run_id}"
+            if source in seen:
+                continue  # a loose copy of the run (e.g. extracted again) wins
+            seen.add(source)
+            result.scanned += 1
+            fp = "archive:" + _fingerprint(archived.bundle)
+            if known.get(source, ("",))[0] == fp:
+                continue
+            try:
+                package = archived.package()
+                names = archived.names()
+                meta = (safe_load(archived.read_text(METADATA_NAME)) or {}) if METADATA_NAME in names else {}
+                outbox = "\n".join(
+                    archived.read_text(n) for n in sorted(names)
+                    if n.startswith("outbox/") and n.endswith((".md", ".txt"))
+                )
+                published = bool(completed_in(archived.journal_entries()))
+            except Exception as e:
+                print(f"⚠️ Catalog: cannot read archived run {archived.run_id} ({e})")
+                continue
+            doc = _doc_from_run(package, meta if isinstance(meta, dict) else {}, outbox)
+            if doc is None:
+                continue
+            if source in known:
+                touched.add(known[source][1])
+            _put_doc(conn, source, "run", fp, doc, run_id=archived.run_id, published=published)
+            touched.add(doc["episode_id"])
+            result.updated += 1
+
+        for source, (_, episode_id) in known.items():
+            if source not in seen:
+                _drop_doc(conn, source)
+                touched.add(episode_id)
+                result.removed += 1
+
+        _refresh_episodes(conn, touched)
+    return result
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+def _quote_terms(query: str) -> str:
+    return " ".join('"' + t.replace('"', '""') + '"' for t in query.split())
+
+
+def search(
+    out_root: Path,
+    query: str = "",
+    *,
+    unpublished: bool = False,
+    ready: Optional[bool] = None,
+    episode_type: Optional[str] = None,
+    limit: int = 50,
+) -> List[sqlite3.Row]:
+    """
+    Episodes matching an FTS5 query over episode id, title, description, editorial
+    text, gear and genres (e.g. 'matrixbrute', 'gear:digitakt AND genres:trance').
+    Malformed FTS syntax is retried as plain terms.
+    """
+    where, params = [], []
+    if unpublished:
+        where.append("e.published = 0")
+    if ready is not None:
+        where.append("e.package_ready = ?")
+        params.append(1 if ready else 0)
+    if episode_type:
+        where.append("e.episode_type = ?")
+        params.append(episode_type)
+
+    def run(q: str) -> List[sqlite3.Row]:
+        clauses = list(where)
+        args: list = []
+        if q:
+            clauses.insert(0, "e.episode_id IN (SELECT d.episode_id FROM docs_fts"
+                              " JOIN docs d ON d.rowid = docs_fts.rowid WHERE docs_fts MATCH ?)")
+            args.append(q)
+        sql = "SELECT e.* FROM episodes e"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.week_id IS NULL, e.week_id, e.episode_id LIMIT ?"
+        with closing(connect(out_root)) as conn:
+            return conn.execute(sql, [*args, *params, limit]).fetchall()
+
+    try:
+        return run(query.strip())
+    except sqlite3.OperationalError:
+        return run(_quote_terms(query))
+
+
+def print_search(out_root: Path, input_dir: Path, query: str, *, unpublished: bool = False) -> None:
+    upd = update_catalog(out_root, input_dir)
+    t0 = time.perf_counter()
+    rows = search(out_root, query, unpublished=unpublished)
+    ms = (time.perf_counter() - t0) * 1000
+
+    scope = " (unpublished)" if unpublished else ""
+    print(f"Catalog: {upd.scanned} sources, {upd.updated} re-indexed, {upd.removed} removed")
+    print(f"Search '{query}'{scope}: {len(rows)} episode(s) in {ms:.1f} ms")
+    for r in rows:
+        state = "published" if r["published"] else ("ready" if r["package_ready"] else "not ready")
+        print(f" - {r['episode_id']:<10} {r['week_id'] or '-':<9} {r['episode_type'] or '-':<22} {state:<10} {r['title']}")
+        if r["gear"]:
+            print(f"   gear: {r['gear']}")
@@ -0,0 +1,298 @@
+# src/daemon.py
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from eventlog import event, log_context
+from journal import completed_platforms, journal_path
+from metadata import METADATA_NAME, load_run_metadata
+from publish import dispatch
+from runs import PACKAGE_NAME, dispatch_candidates, episode_id, iter_run_dirs, load_package
+from scheduling import can_dispatch, next_dispatch_time
+from scheduling.planner import SCHEDULE_NAME, effective_week_id, load_schedule
+from scheduling.windows import window_tz
+
+# How often the output folder is re-listed to pick up newly generated runs.
+DEFAULT_RESCAN_S = 60.0
+
+# Runs uploading at the same time; a slow upload no longer holds back the other deadlines.
+DEFAULT_DISPATCH_WORKERS = 2
+
+# A failed dispatch is retried (still inside its window) after 5, 10, 20 minutes.
+RETRY_DELAY_S = 300.0
+MAX_RETRIES = 3
+
+
+class SchedulerDaemon:
+    """
+    Long-running dispatcher (--daemon).
+
+    Every ready run gets its next eligible window (WINDOWS inside the planned week from
+    schedule.json, else release.week_id) pushed onto a timer heap; the loop then sleeps
+    until the earliest deadline, re-checks the Phase 10 guardrail and dispatches. Deadlines are absolute UTC timestamps computed
+    from zone-aware datetimes, so DST changes in the windows' timezones are already resolved.
+
+    New runs are found by re-listing data/out every rescan_s seconds; runs whose
+    post_package.json / metadata snapshot / schedule.json did not change since they were
+    last found ineligible are not re-parsed.
+
+    Each dry-run generation leaves its own run folder, so one episode (package id) usually
+    has several. Only one run per episode is queued: the run that already holds a real
+    publish (so a partial publish is retried in place, never uploaded again from another
+    folder), else the newest run.
+
+    Dispatches run on a small worker pool; a failed one is retried up to MAX_RETRIES
+    times, and the guardrail is re-checked each time.
+    """
+
+    def __init__(
+        self,
+        out_root: Path,
+        input_dir: Path,
+        *,
+        dry_run: bool = True,
+        platform_filter: Optional[str] = None,
+        rescan_s: float = DEFAULT_RESCAN_S,
+        workers: int = DEFAULT_DISPATCH_WORKERS,
+    ):
+        self.out_root = out_root
+        self.input_dir = input_dir
+        self.dry_run = dry_run
+        self.platform_filter = platform_filter
+        self.rescan_s = rescan_s
+
+        self._heap: List[Tuple[float, str, str]] = []  # (deadline_ts, run_id, week_id)
+        self._queued: Set[str] = set()
+        self._fired: Set[Tuple[str, str]] = set()  # (run_id, week_id) already dispatched
+        self._ineligible: Dict[str, Tuple[float, float]] = {}  # run_id -> file mtimes
+        self._schedule: dict = {}
+        self._schedule_mtime: Optional[float] = None
+        self._runs: Dict[str, Tuple[Tuple[float, float], str, Set[str]]] = {}  # run_id -> (mtimes, episode, published)
+        self._retries: Dict[str, int] = {}
+        self._running: Dict[str, Future] = {}  # run_id -> in-flight dispatch
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="dispatch")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    # -----------------------------
+    # Scanning
+    # -----------------------------
+
+    def _mtimes(self, run_dir: Path) -> Tuple[float, float]:
+        snap = run_dir / METADATA_NAME
+        return (
+            (run_dir / PACKAGE_NAME).stat().st_mtime,
+            snap.stat().st_mtime if snap.exists() else 0.0,
+        )
+
+    def _pending_platforms(self, run_dir: Path, package: dict) -> Set[str]:
+        platforms = package.get("platforms", {}) or {}
+        enabled = {
+            k for k, cfg in platforms.items()
+            if isinstance(cfg, dict) and cfg.get("enabled") is True
+            and (not self.platform_filter or self.platform_filter == k)
+        }
+        return enabled - completed_platforms(run_dir)
+
+    def _run_info(self, run_dir: Path) -> Tuple[str, Set[str]]:
+        """(episode id, platforms really published in this run), re-read only when the files change."""
+        journal = journal_path(run_dir)
+        mtimes = ((run_dir / PACKAGE_NAME).stat().st_mtime, journal.stat().st_mtime if journal.exists() else 0.0)
+        cached = self._runs.get(run_dir.name)
+        if cached and cached[0] == mtimes:
+            return cached[1], cached[2]
+        episode = episode_id(load_package(run_dir), run_dir)
+        published = completed_platforms(run_dir)
+        self._runs[run_dir.name] = (mtimes, episode, published)
+        return episode, published
+
+    def candidate_runs(self) -> Dict[str, Path]:
+        """episode id -> the one run folder the daemon may dispatch for it (runs.dispatch_candidates)."""
+        def infos():
+            for run_dir in iter_run_dirs(self.out_root):
+                try:
+                    episode, done = self._run_info(run_dir)
+                except Exception as e:
+                    event("daemon", f"⚠️ Daemon: cannot read run {run_dir.name} ({e})", level=logging.WARNING,
+                          run_id=run_dir.name, outcome="error", error=str(e))
+                    continue
+                yield run_dir, episode, bool(done)
+
+        return dispatch_candidates(infos())
+
+    def scan(self) -> int:
+        """Queue every run that has an upcoming window. Returns how many were added."""
+        now = datetime.now(timezone.utc)
+        added = 0
+
+        sched_path = self.out_root / SCHEDULE_NAME
+        sched_mtime = sched_path.stat().st_mtime if sched_path.exists() else None
+        if sched_mtime != self._schedule_mtime:
+            self._schedule = load_schedule(self.out_root)
+            self._schedule_mtime = sched_mtime
+            self._ineligible.clear()
+
+        for run_dir in self.candidate_runs().values():
+            run_id = run_dir.name
+            if run_id in self._queued or run_id in self._running:
+                continue
+
+            try:
+                mtimes = self._mtimes(run_dir)
+                if self._ineligible.get(run_id) == mtimes:
+                    continue
+
+                package = load_package(run_dir)
+                meta = load_run_metadata(run_dir, self.input_dir)
+            except Exception as e:
+                event("daemon", f"⚠️ Daemon: cannot read run {run_id} ({e})", level=logging.WARNING,
+                      run_id=run_id, outcome="error", error=str(e))
+                continue
+
+            window_key = (package.get("schedule") or {}).get("window")
+            week_id = str(effective_week_id(meta, self._schedule))
+            at = next_dispatch_time(window_key, meta, now, self._schedule) if window_key else None
+
+            if at is None or (run_id, week_id) in self._fired or not self._pending_platforms(run_dir, package):
+                self._ineligible[run_id] = mtimes
+                continue
+
+            heapq.heappush(self._heap, (at.timestamp(), run_id, week_id))
+            self._queued.add(run_id)
+            self._ineligible.pop(run_id, None)
+            added += 1
+            event("daemon", f"🗓️ Daemon: {run_id} queued for '{window_key}' at {at.astimezone(window_tz(window_key)):%a %Y-%m-%d %H:%M %Z}",
+                  run_id=run_id, window=window_key, at=at.isoformat(), outcome="queued")
+
+        return added
+
+    # -----------------------------
+    # Dispatch
+    # -----------------------------
+
+    def _fire(self, run_id: str, week_id: str) -> None:
+        with self._lock:
+            self._queued.discard(run_id)
+
+        run_dir = self.out_root / run_id
+        try:
+            package = load_package(run_dir)
+            meta = load_run_metadata(run_dir, self.input_dir)
+        except Exception as e:
+            event("daemon", f"⚠️ Daemon: run {run_id} disappeared or is unreadable ({e})", level=logging.WARNING,
+                  run_id=run_id, outcome="error", error=str(e))
+            return
+
+        # A newer run of the same episode (or a published one) took over since this was queued.
+        episode = episode_id(package, run_dir)
+        if self.candidate_runs().get(episode, run_dir) != run_dir:
+            event("daemon", f"Daemon: {run_id} superseded by another run of {episode}. Skipped.",
+                  run_id=run_id, episode=episode, outcome="skipped")
+            return
+
+        window_key = (package.get("schedule") or {}).get("window")
+        now = datetime.now(timezone.utc)
+        if not self.dry_run and not can_dispatch(window_key, meta, now, self._schedule):
+            with self._lock:
+                self._fired.add((run_id, week_id))
+            event("daemon", f"⏳ Daemon: {run_id} no longer eligible at {now:%H:%M}. Dispatch skipped.",
+                  run_id=run_id, window=window_key, outcome="skipped")
+            return
+
+        event("daemon", f"\n🚀 Daemon: dispatching {run_id} ('{window_key}')", run_id=run_id, window=window_key)
+        future = self._pool.submit(self._dispatch, run_dir, package)
+        with self._lock:
+            self._running[run_id] = future
+        future.add_done_callback(lambda f: self._done(run_id, week_id, f))
+
+    def _dispatch(self, run_dir: Path, package: dict) -> None:
+        with log_context(run_id=run_dir.name):
+            dispatch(package, package_dir=run_dir, dry_run=self.dry_run, platform_filter=self.platform_filter)
+
+    def _done(self, run_id: str, week_id: str, future: Future) -> None:
+        """Worker thread: record the outcome; a failure is retried later inside the window."""
+        with self._lock:
+            self._running.pop(run_id, None)
+            error = future.exception()
+            if error is None:
+                self._fired.add((run_id, week_id))
+                self._retries.pop(run_id, None)
+            else:
+                # The journal has the failed attempt; keep serving the other runs.
+                attempt = self._retries.get(run_id, 0) + 1
+                self._retries[run_id] = attempt
+                msg = f"❌ Daemon: dispatch failed for {run_id}: {type(error).__name__}: {error}"
+                if attempt <= MAX_RETRIES:
+                    delay = RETRY_DELAY_S * 2 ** (attempt - 1)
+                    heapq.heappush(self._heap, (time.time() + delay, run_id, week_id))
+                    self._queued.add(run_id)
+                    msg += f" (retry {attempt}/{MAX_RETRIES} in {delay / 60:.0f} min)"
+                else:
+                    self._fired.add((run_id, week_id))
+                event("daemon", msg, level=logging.ERROR, run_id=run_id, attempt=attempt,
+                      outcome="error", error=f"{type(error).__name__}: {error}")
+        self._wake.set()
+
+    def _fire_due(self) -> None:
+        while True:
+            with self._lock:
+                if not self._heap or self._heap[0][0] > time.time():
+                    return
+                _, run_id, week_id = heapq.heappop(self._heap)
+                if run_id in self._running:
+                    continue
+            self._fire(run_id, week_id)
+
+    # -----------------------------
+    # Loop
+    # -----------------------------
+
+    def run_forever(self) -> None:
+        event("daemon", "=== DAEMON ===" + (" (DRY-RUN)" if self.dry_run else " (REAL-RUN)"), dry_run=self.dry_run)
+        event("daemon", f"Watching: {self.out_root.resolve()} (rescan every {self.rescan_s:.0f}s)")
+
+        next_scan = 0.0
+        try:
+            while not self._stop.is_set():
+                if time.time() >= next_scan:
+                    with self._lock:
+                        self.scan()
+                    next_scan = time.time() + self.rescan_s
+
+                self._fire_due()
+
+                wake = next_scan
+                with self._lock:
+                    if self._heap:
+                        wake = min(wake, self._heap[0][0])
+                self._wake.wait(max(0.0, wake - time.time()))
+                self._wake.clear()
+        finally:
+            # In-flight uploads finish (and get journaled) before the daemon exits.
+            self._pool.shutdown(wait=True)
+
+        event("daemon", "Daemon stopped.", outcome="stopped")
+
+
+def run_daemon(out_root: Path, input_dir: Path, *, dry_run: bool, platform_filter: Optional[str] = None) -> None:
+    workers = int(os.getenv("DAEMON_WORKERS", DEFAULT_DISPATCH_WORKERS))
+    daemon = SchedulerDaemon(out_root, input_dir, dry_run=dry_run, platform_filter=platform_filter, workers=workers)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        event("daemon", "\nDaemon interrupted.", outcome="stopped")
@@ -1,30 +1,72 @@
+from typing import Iterable, List, Optional
+
 from .cta import CTA_LIBRARY, resolve_cta
 from .shorts import derive_youtube_short_titles
 from .instagram import derive_instagram_caption
 from .reddit import derive_reddit_outbox_md
+from .templates import frozen
 from .tiktok import derive_tiktok_caption
+from tracing import annotate, span, traced
 
 
-def derive_editorial(meta: dict, hashtags: list[str]) -> dict:
-    """
-    Returns a dict with derived editorial content (short titles, captions, reddit outbox).
-    This is pure logic: no file IO.
-    """
+def _derive(meta: dict, hashtags: list[str]) -> dict:
     cta = resolve_cta(meta)
+    shorts = derive_youtube_short_titles(meta)
+    ig_caption = derive_instagram_caption(meta, hashtags, cta)
+    reddit_md = derive_reddit_outbox_md(meta, cta)
 
     return {
         "cta": cta,
         "shorts": {
-            "youtube": derive_youtube_short_titles(meta),
+            "youtube": shorts,
         },
         "instagram": {
-            "caption": derive_instagram_caption(meta, hashtags, cta),
+            "caption": ig_caption,
         },
         "reddit": {
-            "md": derive_reddit_outbox_md(meta, cta),
+            "md": reddit_md,
         },
         "tiktok": {
             "caption": derive_tiktok_caption(meta),
             "pinned_comment": cta.get("tiktok_pinned_comment", "Full performance on YouTube."),
         },
     }
+
+
+@traced("derive_editorial")
+def derive_editorial(meta: dict, hashtags: list[str]) -> dict:
+    """
+    Returns a dict with derived editorial content (short titles, captions, reddit outbox).
+    This is pure logic: no file IO per call. Nothing is read from data/out; templates,
+    the gear catalog and hashtag aliases are config, loaded once and cached.
+    """
+    out = _derive(meta, hashtags)
+    annotate(
+        hashtags=len(hashtags or []),
+        shorts=len(out["shorts"]["youtube"]),
+        chars=len(out["instagram"]["caption"]) + len(out["reddit"]["md"]),
+    )
+    return out
+
+
+def derive_editorial_batch(
+    metas: Iterable[dict],
+    hashtags: Optional[Iterable[list[str]]] = None,
+) -> List[dict]:
+    """
+    derive_editorial() for many episodes at once (e.g. regenerating every outbox after
+    a CTA wording change). 'hashtags' is consumed in parallel with 'metas'; episodes
+    without one get no hashtags.
+
+    Templates are resolved once for the whole batch and normalized fields are memoized
+    across episodes (editorial.utils), so the per-episode cost is the rendering only.
+    """
+    tag_iter = iter(hashtags) if hashtags is not None else None
+    out: List[dict] = []
+
+    with span("derive_editorial_batch"), frozen():
+        for meta in metas:
+            tags = next(tag_iter, None) if tag_iter is not None else None
+            out.append(_derive(meta, tags or []))
+        annotate(episodes=len(out))
+    return out
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from hashtags import canonicalize_tags
+
+from .templates import render
 from .utils import sentence_case, _collapse_spaces
 
 
@@ -10,6 +13,7 @@ def derive_instagram_caption(meta: dict, hashtags: list[str], cta: dict) -> str:
     - short narrative
     - neutral CTA (locked)
     - 5–10 hashtags (we trust upstream already capped; we’ll cap again)
+    - hashtags get their canonical spelling (src/hashtags.py) like derive_hashtags
     """
     dc = meta.get("dopamine_core", {}) if isinstance(meta.get("dopamine_core"), dict) else {}
 
@@ -20,25 +24,15 @@ def derive_instagram_caption(meta: dict, hashtags: list[str], cta: dict) -> str:
     cta_line = (cta or {}).get("instagram", "") or ""
     cta_line = cta_line.strip()
 
-    # Keep hashtags reasonable
-    tags = [h for h in (hashtags or []) if isinstance(h, str) and h.strip()]
-    tags = tags[:10]
+    # Keep hashtags reasonable (canonical spelling, aliases folded, no duplicates)
+    tags = canonicalize_tags(hashtags or [])[:10]
     tag_line = " ".join(tags)
 
-    parts = []
-    if hook:
-        parts.append(hook)
-    if body:
-        parts.append("")
-        parts.append(body)
-    if reward:
-        parts.append("")
-        parts.append(reward)
-    if cta_line:
-        parts.append("")
-        parts.append(cta_line)
-    if tag_line:
-        parts.append("")
-        parts.append(tag_line)
-
-    return "\n".join(parts).strip() + "\n"
+    text = render("instagram_caption.txt", {
+        "hook": hook,
+        "body": body,
+        "reward": reward,
+        "cta_line": cta_line,
+        "tag_line": tag_line,
+    })
+    return text.strip() + "\n"
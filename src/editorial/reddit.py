@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from gear import get_catalog
+
+from .templates import render
 from .utils import _collapse_spaces, sentence_case
 
 
@@ -15,15 +18,8 @@ def _format_gear(meta: dict) -> str:
         if isinstance(v, list):
             items.extend([str(x).strip() for x in v if str(x).strip()])
 
-    # Deduplicate preserving order
-    seen = set()
-    out = []
-    for it in items:
-        if it not in seen:
-            seen.add(it)
-            out.append(it)
-
-    return " · ".join(out)
+    # Catalog names (config/gear.yaml), deduplicated preserving order
+    return " · ".join(get_catalog().canonicalize(items))
 
 
 def derive_reddit_outbox_md(meta: dict, cta: dict) -> str:
@@ -47,36 +43,14 @@ def derive_reddit_outbox_md(meta: dict, cta: dict) -> str:
     # Optional comment prompt only if intent requested (still neutral)
     comment_prompt = (cta or {}).get("comment_prompt")
 
-    md = []
-    md.append(f"## Episode: {episode_id} — {episode_title}")
-    md.append("")
-    md.append("**Context**")
-    if hook:
-        md.append(hook)
-    if core:
-        md.append(core)
-    md.append("")
-    md.append("**What happens**")
-    if reward:
-        md.append(reward)
-    if punch:
-        md.append(punch)
-    md.append("")
-    if gear_line:
-        md.append("**Gear**")
-        md.append(gear_line)
-        md.append("")
-
-    md.append("**Suggested approach (pick 1–2 subreddits max)**")
-    md.append("- r/synthesizers → weekly self-promo thread comment (best practice)")
-    md.append("- r/dawless → performance / live constraints angle")
-    md.append("- r/hydrasynth → patch/mod-matrix expressivity angle (if relevant)")
-    md.append("")
-    md.append("_No emojis. No crosspost dump. Keep it technical + human._")
-
-    if comment_prompt:
-        md.append("")
-        md.append("**Optional closing question**")
-        md.append(comment_prompt)
-
-    return "\n".join(md).strip() + "\n"
+    text = render("reddit_editorial.md", {
+        "episode_id": str(episode_id),
+        "episode_title": str(episode_title),
+        "hook": hook,
+        "core": core,
+        "reward": reward,
+        "punch": punch,
+        "gear_line": gear_line,
+        "comment_prompt": comment_prompt,
+    })
+    return text.strip() + "\n"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from .templates import render
 from .utils import truncate_to, ensure_length_window, _collapse_spaces
 
 
@@ -19,13 +20,10 @@ def derive_youtube_short_titles(meta: dict) -> list[str]:
     punch = _collapse_spaces(dc.get("punchline", ""))
     title = _collapse_spaces(epi.get("episode_title", ""))
 
-    raw_candidates = [
-        hook,
-        reward,
-        f"{title} — Live balance test",
-        f"{reward} — {punch}",
-        f"{hook} — live",
-    ]
+    ctx = {"hook": hook, "reward": reward, "punch": punch, "title": title}
+
+    # One candidate per template line
+    raw_candidates = render("shorts_candidates.txt", ctx).split("\n")
 
     # Make a pass: truncate long ones to 60
     candidates = [truncate_to(c, 60) for c in raw_candidates if c]
@@ -35,12 +33,8 @@ def derive_youtube_short_titles(meta: dict) -> list[str]:
 
     # If not enough, create tighter variants
     if len(good) < 2:
-        variants = []
-        if title:
-            variants.append(truncate_to(f"{title} — until it breaks", 60))
-            variants.append(truncate_to(f"{title} — tension snaps live", 60))
-        if hook and len(hook) < 40:
-            variants.append(truncate_to(f"{hook} (live)", 60))
+        ctx["short_hook"] = hook if len(hook) < 40 else ""
+        variants = [truncate_to(v, 60) for v in render("shorts_variants.txt", ctx).split("\n") if v]
         good += ensure_length_window(variants, 40, 60)
 
     # Deduplicate while preserving order
@@ -0,0 +1,185 @@
+"""
+Minimal text templates for editorial/outbox copy.
+
+Syntax:
+    {{ name }} / {{ item.field }}         value (dict key or attribute); missing -> ""
+    {% if name %} ... {% else %} ... {% endif %}
+    {% for x in name %} ... {% endfor %}
+
+A tag alone on its line (only whitespace around it) removes the whole line, so
+templates can be written one output line per template line.
+
+Templates are compiled once to a Python function and cached per file, keyed on
+(mtime_ns, size): editing a template file is picked up without restarting.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+BUILTIN_DIR = Path(__file__).resolve().parent / "templates"
+
+_TOKEN_RE = re.compile(r"{{\s*(.+?)\s*}}|{%\s*(.+?)\s*%}")
+_STANDALONE_RE = re.compile(r"^[ \t]*{%[^%\n]*%}[ \t]*\n", re.M)
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+class TemplateError(Exception):
+    """Raised when a template file cannot be parsed."""
+
+
+def _lookup(value: Any, path: Tuple[str, ...]) -> Any:
+    for part in path:
+        if isinstance(value, dict):
+            value = value.get(part)
+        else:
+            value = getattr(value, part, None)
+        if value is None:
+            return None
+    return value
+
+
+def _text(v: Any) -> str:
+    return "" if v is None else str(v)
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    """Returns [(kind, value)] with kind in text | var | tag; standalone tag lines lose their newline."""
+    # Drop the trailing newline of tag-only lines (and their indentation).
+    source = _STANDALONE_RE.sub(lambda m: m.group(0).strip(" \t\n"), source)
+
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    for m in _TOKEN_RE.finditer(source):
+        if m.start() > pos:
+            tokens.append(("text", source[pos:m.start()]))
+        if m.group(1) is not None:
+            tokens.append(("var", m.group(1)))
+        else:
+            tokens.append(("tag", m.group(2)))
+        pos = m.end()
+    if pos < len(source):
+        tokens.append(("text", source[pos:]))
+    return tokens
+
+
+def compile_template(source: str, name: str = "<template>") -> Callable[[Dict[str, Any]], str]:
+    """Compile template source into render(context) -> str."""
+    lines = ["def render(ctx):", " out = []", " w = out.append"]
+    loop_vars: List[str] = []
+    stack: List[str] = []
+    indent = 1
+
+    def expr(ref: str) -> str:
+        if not _NAME_RE.match(ref):
+            raise TemplateError(f"{name}: invalid name {ref!r}")
+        head, *rest = ref.split(".")
+        base = f"v_{head}" if head in loop_vars else f"ctx.get({head!r})"
+        return f"_lookup({base}, {tuple(rest)!r})" if rest else base
+
+    def emit(code: str) -> None:
+        lines.append(" " * indent + code)
+
+    for kind, value in _tokenize(source):
+        if kind == "text":
+            emit(f"w({value!r})")
+        elif kind == "var":
+            emit(f"w(_text({expr(value)}))")
+        else:
+            words = value.split()
+            if words[0] == "if" and len(words) == 2:
+                emit(f"if {expr(words[1])}:")
+                stack.append("if")
+                indent += 1
+                emit("pass")
+            elif words == ["else"] and stack and stack[-1] == "if":
+                indent -= 1
+                emit("else:")
+                indent += 1
+                emit("pass")
+            elif words == ["endif"] and stack and stack[-1] == "if":
+                stack.pop()
+                indent -= 1
+            elif words[0] == "for" and len(words) == 4 and words[2] == "in":
+                var = words[1]
+                if not _NAME_RE.match(var) or "." in var:
+                    raise TemplateError(f"{name}: invalid loop variable {var!r}")
+                emit(f"for v_{var} in ({expr(words[3])} or ()):")
+                loop_vars.append(var)
+                stack.append("for")
+                indent += 1
+                emit("pass")
+            elif words == ["endfor"] and stack and stack[-1] == "for":
+                stack.pop()
+                loop_vars.pop()
+                indent -= 1
+            else:
+                raise TemplateError(f"{name}: unexpected tag {{% {value} %}}")
+
+    if stack:
+        raise TemplateError(f"{name}: unclosed {{% {stack[-1]} %}}")
+
+    lines.append(" return ''.join(out)")
+    namespace: Dict[str, Any] = {"_lookup": _lookup, "_text": _text}
+    exec(compile("\n".join(lines), f"<template {name}>", "exec"), namespace)
+    return namespace["render"]
+
+
+_cache: Dict[Path, Tuple[int, int, Callable[[Dict[str, Any]], str]]] = {}
+_cache_lock = threading.Lock()
+_frozen = threading.local()
+
+
+def template_path(name: str) -> Path:
+    """EDITORIAL_TEMPLATES_DIR/<name> if it exists there, else the built-in template."""
+    override = os.getenv("EDITORIAL_TEMPLATES_DIR")
+    if override:
+        p = Path(override) / name
+        if p.exists():
+            return p
+    return BUILTIN_DIR / name
+
+
+def get_template(name: str) -> Callable[[Dict[str, Any]], str]:
+    """Compiled template, recompiled only when the file's (mtime_ns, size) changed."""
+    pinned = getattr(_frozen, "templates", None)
+    if pinned is not None and name in pinned:
+        return pinned[name]
+
+    path = template_path(name)
+    st = path.stat()
+    cached = _cache.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        fn = cached[2]
+    else:
+        with _cache_lock:
+            fn = compile_template(path.read_text(encoding="utf-8"), name)
+            _cache[path] = (st.st_mtime_ns, st.st_size, fn)
+    if pinned is not None:
+        pinned[name] = fn
+    return fn
+
+
+def render(name: str, context: Optional[Dict[str, Any]] = None) -> str:
+    return get_template(name)(context or {})
+
+
+@contextmanager
+def frozen() -> Iterator[None]:
+    """
+    Inside this block (this thread only) each template is resolved and mtime-checked
+    once; a batch renders thousands of times and should not stat the files each time.
+    """
+    outer = getattr(_frozen, "templates", None)
+    if outer is None:
+        _frozen.templates = {}
+    try:
+        yield
+    finally:
+        if outer is None:
+            _frozen.templates = None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from .templates import render
 from .utils import _collapse_spaces, truncate_to
 
 
@@ -11,5 +12,4 @@ def derive_tiktok_caption(meta: dict) -> str:
     punch = _collapse_spaces(dc.get("punchline", ""))
     reward = _collapse_spaces(dc.get("reward_moment", ""))
 
-    base = punch or reward or "Live performance."
-    return truncate_to(base, 80)
+    return truncate_to(render("tiktok_caption.txt", {"punch": punch, "reward": reward}), 80)
@@ -1,11 +1,25 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Iterable
 
+_SPACES_RE = re.compile(r"\s+")
+
+# The same metadata fields are normalized by every platform deriver (and, in a batch,
+# recur across episodes): keep the normalized strings around.
+_MEMO_SIZE = 8192
+
 
 def _collapse_spaces(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    if not isinstance(s, str):
+        return _SPACES_RE.sub(" ", (s or "").strip())
+    return _collapse_spaces_str(s)
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def _collapse_spaces_str(s: str) -> str:
+    return _SPACES_RE.sub(" ", s.strip())
 
 
 def truncate_to(s: str, max_len: int) -> str:
@@ -28,7 +42,17 @@ def ensure_length_window(candidates: Iterable[str], min_len: int, max_len: int)
     return out
 
 
+@lru_cache(maxsize=_MEMO_SIZE)
+def _sentence_case_str(s: str) -> str:
+    s = s.strip()
+    if not s:
+        return s
+    return s[0].upper() + s[1:]
+
+
 def sentence_case(s: str) -> str:
+    if isinstance(s, str):
+        return _sentence_case_str(s)
     s = (s or "").strip()
     if not s:
         return s
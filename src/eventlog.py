@@ -0,0 +1,136 @@
+# src/eventlog.py
+"""
+Structured events: one JSON object per line in LOG_DIR/events.jsonl, plus the usual
+human-readable console line rendered from the same event.
+
+    event("dispatch", "✅ Validation OK", outcome="ok")
+    with log_context(run_id=run_out.name):
+        event("upload", platform="youtube", bytes=n, duration_ms=ms, outcome="ok")
+
+An event without a message is written to the file only. The file side goes through a
+QueueHandler: the caller only enqueues the record, and a QueueListener thread formats
+and writes it (RotatingFileHandler, rotated by size), so logging never blocks uploads.
+The console side stays synchronous so it interleaves correctly with adapter output.
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+LOGGER_NAME = "automate_posting"
+LOG_FILE_NAME = "events.jsonl"
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 5
+
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.setLevel(logging.INFO)
+_logger.propagate = False
+
+_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("event_context", default={})
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """{"ts", "level", "stage", <context + fields>, "msg"} on one line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "event", None) or {}
+        out: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            **fields,
+        }
+        msg = record.getMessage().strip()
+        if msg:
+            out["msg"] = msg
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class ConsoleHandler(logging.Handler):
+    """Prints the event's human message (same text the CLI always printed); silent events are skipped."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = record.getMessage()
+            if msg:
+                print(msg)
+        except Exception:
+            self.handleError(record)
+
+
+_console = ConsoleHandler()
+_logger.addHandler(_console)
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Adds fields (run_id, platform...) to every event emitted inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def event(stage: str, message: str = "", *, level: int = logging.INFO, **fields: Any) -> None:
+    """
+    One structured event. Common fields: run_id, platform, bytes, duration_ms, outcome.
+    None values are dropped.
+    """
+    data = {"stage": stage, **_context.get(), **fields}
+    _logger.log(level, message, extra={"event": {k: v for k, v in data.items() if v is not None}})
+
+
+def setup_logging(log_dir: Optional[Path]) -> Optional[Path]:
+    """
+    Starts the background JSONL writer into log_dir (idempotent). Rotation: LOG_MAX_BYTES
+    per file (default 10 MiB), LOG_BACKUPS old files kept (default 5).
+    Returns the log file path, or None when log_dir is None.
+    """
+    global _listener
+    if log_dir is None:
+        return None
+    path = Path(log_dir) / LOG_FILE_NAME
+    if _listener is not None:
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=int(os.getenv("LOG_MAX_BYTES", DEFAULT_LOG_MAX_BYTES)),
+        backupCount=int(os.getenv("LOG_BACKUPS", DEFAULT_LOG_BACKUPS)),
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(q, file_handler)
+    _listener.start()
+    _logger.addHandler(logging.handlers.QueueHandler(q))
+    atexit.register(shutdown_logging)
+    return path
+
+
+def shutdown_logging() -> None:
+    """Flushes queued events to disk and stops the writer thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for h in list(_logger.handlers):
+        if isinstance(h, logging.handlers.QueueHandler):
+            _logger.removeHandler(h)
+    for h in _listener.handlers:
+        h.close()
+    _listener = None
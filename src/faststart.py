@@ -0,0 +1,194 @@
+# src/faststart.py
+"""
+MP4 "faststart" without ffmpeg: moves the moov atom in front of mdat so platforms
+can start processing before the whole upload has arrived.
+
+Only moov is held in memory (it is the index, typically a few hundred KB); media
+data is streamed in COPY_CHUNK blocks straight into the destination file.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import struct
+from pathlib import Path
+from typing import BinaryIO, List, NamedTuple, Optional
+
+COPY_CHUNK = 1024 * 1024
+
+# Refuse to load absurd moov atoms (corrupt header) instead of allocating them.
+MAX_MOOV_BYTES = 256 * 1024 * 1024
+
+# Atoms that contain other atoms on the path to stco/co64.
+CONTAINERS = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts", b"udta", b"meta"}
+
+
+class FaststartError(Exception):
+    """The file cannot be remuxed (not an MP4, compressed moov, 32-bit offset overflow...)."""
+
+
+class Atom(NamedTuple):
+    kind: bytes
+    offset: int
+    size: int  # total size, header included
+
+
+def read_atoms(f: BinaryIO, file_size: int) -> List[Atom]:
+    """Top-level atoms of the file (headers only)."""
+    atoms: List[Atom] = []
+    offset = 0
+    while offset < file_size:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            raise FaststartError(f"truncated atom header at {offset}")
+        size, kind = struct.unpack(">I4s", header)
+        if size == 1:
+            ext = f.read(8)
+            if len(ext) < 8:
+                raise FaststartError(f"truncated 64-bit atom size at {offset}")
+            size = struct.unpack(">Q", ext)[0]
+        elif size == 0:
+            size = file_size - offset
+        if size < 8 or offset + size > file_size:
+            raise FaststartError(f"invalid size for atom {kind!r} at {offset}")
+        atoms.append(Atom(kind, offset, size))
+        offset += size
+    return atoms
+
+
+def _patch_offsets(moov: bytearray, start: int, end: int, moov_offset: int, delta: int) -> int:
+    """
+    Adds delta to every stco/co64 entry under moov[start:end] that points before the
+    original moov (data that moves forward). Chunks after moov (an mdat written after it)
+    stay where they are. Returns tables patched.
+    """
+    patched = 0
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", moov, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                raise FaststartError(f"truncated 64-bit size for atom {kind!r} inside moov")
+            size = struct.unpack_from(">Q", moov, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise FaststartError(f"invalid size for atom {kind!r} inside moov")
+
+        body = pos + header
+        if kind == b"cmov":
+            raise FaststartError("compressed moov (cmov) is not supported")
+        if kind in (b"stco", b"co64"):
+            if body + 8 > pos + size:
+                raise FaststartError(f"truncated {kind.decode()} atom")
+            count = struct.unpack_from(">I", moov, body + 4)[0]
+            width = 4 if kind == b"stco" else 8
+            fmt = ">I" if kind == b"stco" else ">Q"
+            table = body + 8
+            if table + count * width > pos + size:
+                raise FaststartError(f"{kind.decode()} table overruns its atom")
+            for i in range(count):
+                at = table + i * width
+                value = struct.unpack_from(fmt, moov, at)[0]
+                if value >= moov_offset:
+                    if value < moov_offset + delta:
+                        raise FaststartError(f"{kind.decode()} entry points inside moov")
+                    continue
+                value += delta
+                if kind == b"stco" and value > 0xFFFFFFFF:
+                    raise FaststartError("chunk offset overflows stco (would need co64)")
+                struct.pack_into(fmt, moov, at, value)
+            patched += 1
+        elif kind in CONTAINERS:
+            # 'meta' is a full box: 4 bytes of version/flags before its children
+            child = body + 4 if kind == b"meta" else body
+            patched += _patch_offsets(moov, child, pos + size, moov_offset, delta)
+        pos += size
+    return patched
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, offset: int, size: int) -> None:
+    src.seek(offset)
+    left = size
+    while left:
+        block = src.read(min(COPY_CHUNK, left))
+        if not block:
+            raise FaststartError("unexpected end of file")
+        dst.write(block)
+        left -= len(block)
+
+
+def needs_faststart(path: Path) -> bool:
+    with path.open("rb") as f:
+        atoms = read_atoms(f, path.stat().st_size)
+    kinds = [a.kind for a in atoms]
+    return b"moov" in kinds and b"mdat" in kinds and kinds.index(b"moov") > kinds.index(b"mdat")
+
+
+def faststart_copy(src: Path, dst: Path) -> bool:
+    """
+    Writes src to dst with moov moved right after ftyp (chunk offsets shifted).
+    Files that are already faststart (or not remuxable) are copied as-is.
+    Returns True if the file was remuxed. dst gets src's mtime either way.
+    """
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    remuxed = False
+    try:
+        with src.open("rb") as fin:
+            file_size = os.fstat(fin.fileno()).st_size
+            try:
+                atoms = read_atoms(fin, file_size)
+                moov = _remuxed_moov(fin, atoms)
+            except FaststartError:
+                moov = None
+
+            with tmp.open("wb") as fout:
+                if moov is None:
+                    _copy_range(fin, fout, 0, file_size)
+                else:
+                    head = [a for a in atoms if a.kind == b"ftyp"][:1]
+                    for a in head:
+                        _copy_range(fin, fout, a.offset, a.size)
+                    fout.write(moov)
+                    for a in atoms:
+                        if a.kind != b"moov" and a not in head:
+                            _copy_range(fin, fout, a.offset, a.size)
+                    remuxed = True
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return remuxed
+
+
+def _remuxed_moov(f: BinaryIO, atoms: List[Atom]) -> Optional[bytearray]:
+    """Patched moov bytes, or None when the file is already faststart."""
+    kinds = [a.kind for a in atoms]
+    if b"moov" not in kinds or b"mdat" not in kinds:
+        raise FaststartError("not an MP4 with moov and mdat")
+    moov_atom = atoms[kinds.index(b"moov")]
+    if kinds.index(b"moov") < kinds.index(b"mdat"):
+        return None
+    if kinds.count(b"moov") > 1:
+        raise FaststartError("more than one moov atom")
+    if moov_atom.size > MAX_MOOV_BYTES:
+        raise FaststartError(f"moov atom too large ({moov_atom.size} bytes)")
+    # moov is inserted right after ftyp: every atom between ftyp and moov (mdat
+    # included) moves forward by exactly the moov size; atoms after moov do not move.
+    if kinds[0] != b"ftyp" and b"ftyp" in kinds:
+        raise FaststartError("ftyp is not the first atom")
+
+    f.seek(moov_atom.offset)
+    moov = bytearray(f.read(moov_atom.size))
+    header = 16 if struct.unpack_from(">I", moov, 0)[0] == 1 else 8
+    try:
+        patched = _patch_offsets(moov, header, len(moov), moov_atom.offset, moov_atom.size)
+    except struct.error as e:  # a table cut short inside moov
+        raise FaststartError(f"truncated atom inside moov ({e})") from e
+    if not patched:
+        raise FaststartError("no stco/co64 table in moov")
+    return moov
@@ -0,0 +1,158 @@
+# src/gear.py
+from __future__ import annotations
+
+import os
+import re
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metadata import safe_load
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parents[1] / "config" / "gear.yaml"
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def _norm(s: str) -> str:
+    return _SPACES_RE.sub(" ", (s or "").strip()).casefold()
+
+
+class GearCatalog:
+    """
+    Canonical gear names plus aliases, compiled into an Aho-Corasick automaton.
+
+    find() scans a text once, whatever the catalog size, and returns the canonical
+    names of every whole-word mention (leftmost-longest: "ASM Hydrasynth 49" is one
+    mention, not also "Hydrasynth").
+    """
+
+    def __init__(self, entries: Dict[str, Iterable[str]]):
+        self.aliases: Dict[str, str] = {}  # normalized alias -> canonical
+        for canonical, aliases in entries.items():
+            canonical = str(canonical).strip()
+            for name in (canonical, *(aliases or [])):
+                key = _norm(str(name))
+                if key:
+                    self.aliases.setdefault(key, canonical)
+
+        # Trie as parallel lists: goto[state] = {char: state}, fail links, and every
+        # pattern ending at a state as (length, canonical).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]
+
+        for key, canonical in self.aliases.items():
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(key), canonical))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def canonical(self, name: str) -> str:
+        """
+        Catalog name for a gear name: an exact alias (any case/spacing), else the longest
+        whole-word mention inside it, as find() would see it in free text ("Yamaha MG-12"
+        -> "Yamaha MG"); else the name as written.
+        """
+        name = (name or "").strip()
+        key = _norm(name)
+        if key in self.aliases:
+            return self.aliases[key]
+        matches = self._matches(key)
+        if not matches:
+            return name
+        start, end, canonical = max(matches, key=lambda m: (m[1] - m[0], -m[0]))
+        return canonical
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """Canonical names in input order, without duplicates or blanks."""
+        seen = set()
+        out = []
+        for n in names:
+            c = self.canonical(str(n))
+            if c and c.casefold() not in seen:
+                seen.add(c.casefold())
+                out.append(c)
+        return out
+
+    def _matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """All whole-word matches as (start, end, canonical) over the normalized text."""
+        found = []
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, canonical in out[state]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    found.append((start, end, canonical))
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """Canonical names mentioned in text, in order of first mention."""
+        matches = self._matches(_norm(text))
+        # leftmost-longest, non-overlapping
+        matches.sort(key=lambda m: (m[0], -m[1]))
+        seen = set()
+        out = []
+        pos = 0
+        for start, end, canonical in matches:
+            if start < pos:
+                continue
+            pos = end
+            if canonical not in seen:
+                seen.add(canonical)
+                out.append(canonical)
+        return out
+
+
+def load_catalog(path: Optional[Path] = None) -> GearCatalog:
+    """GEAR_CONFIG (default: config/gear.yaml). An absent file gives an empty catalog."""
+    if path is None:
+        env = os.getenv("GEAR_CONFIG")
+        path = Path(env) if env else DEFAULT_CATALOG_PATH
+    if not path.exists():
+        return GearCatalog({})
+
+    data = safe_load(path.read_text(encoding="utf-8")) or {}
+    entries = data.get("gear") or {}
+    if not isinstance(entries, dict):
+        raise ValueError(f"{path}: 'gear' must be a mapping of canonical name -> list of aliases")
+    return GearCatalog(entries)
+
+
+_catalog: Optional[Tuple[Tuple[str, Optional[int]], GearCatalog]] = None
+
+
+def get_catalog() -> GearCatalog:
+    """Shared catalog, recompiled only when the catalog file (or GEAR_CONFIG) changed."""
+    global _catalog
+    path = os.getenv("GEAR_CONFIG") or str(DEFAULT_CATALOG_PATH)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _catalog is None or _catalog[0] != (path, mtime):
+        _catalog = ((path, mtime), load_catalog(Path(path)))
+    return _catalog[1]
@@ -0,0 +1,244 @@
+# src/hashtags.py
+from __future__ import annotations
+
+import json
+import os
+import unicodedata
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metadata import safe_load
+from runs import iter_run_dirs, load_package
+
+VOCAB_NAME = "hashtags.json"
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_ALIASES_PATH = PROJECT_ROOT / "config" / "hashtags.yaml"
+
+
+def fold_key(s: str) -> str:
+    """
+    Lookup key of a tag or label: NFKD, accents dropped, casefolded, alphanumerics only.
+    "Funk House", "funk-house", "#FunkHouse" and "Fünk house" all give "funkhouse".
+    """
+    s = unicodedata.normalize("NFKD", (s or "").lstrip("#"))
+    return "".join(ch for ch in s.casefold() if ch.isalnum() and not unicodedata.combining(ch))
+
+
+def slug_tag(s: str) -> str:
+    """'#' + lowercase alphanumerics of the NFKC form (accents kept, as typed)."""
+    s = unicodedata.normalize("NFKC", (s or "").strip().lower())
+    return "#" + "".join(ch for ch in s if ch.isalnum())
+
+
+def load_aliases(path: Optional[Path] = None) -> Dict[str, str]:
+    """
+    HASHTAGS_CONFIG (default: config/hashtags.yaml):
+
+        aliases:
+          "#funkhouse": ["Funky House", "funk-house"]
+
+    Returns folded variant -> canonical tag (the canonical tag maps to itself).
+    """
+    if path is None:
+        env = os.getenv("HASHTAGS_CONFIG")
+        path = Path(env) if env else DEFAULT_ALIASES_PATH
+    if not path.exists():
+        return {}
+
+    data = safe_load(path.read_text(encoding="utf-8")) or {}
+    raw = data.get("aliases") or {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: 'aliases' must be a mapping of tag -> list of variants")
+
+    out: Dict[str, str] = {}
+    for canonical, variants in raw.items():
+        tag = slug_tag(str(canonical))
+        out[fold_key(tag)] = tag
+        for v in variants or []:
+            out[fold_key(str(v))] = tag
+    return out
+
+
+_aliases: Optional[Tuple[Tuple[str, Optional[int]], Dict[str, str]]] = None
+
+
+def get_aliases() -> Dict[str, str]:
+    """Shared alias table, reloaded only when the aliases file (or HASHTAGS_CONFIG) changed."""
+    global _aliases
+    path = os.getenv("HASHTAGS_CONFIG") or str(DEFAULT_ALIASES_PATH)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if _aliases is None or _aliases[0] != (path, mtime):
+        _aliases = ((path, mtime), load_aliases(Path(path)))
+    return _aliases[1]
+
+
+def canonical_tag(label: str, aliases: Optional[Dict[str, str]] = None) -> str:
+    """
+    Canonical spelling of a tag: its alias from config/hashtags.yaml, else slug_tag().
+    Depends on the alias table only, never on earlier runs, so the same input always
+    gives the same tag.
+    """
+    key = fold_key(label)
+    if not key:
+        return ""
+    table = aliases if aliases is not None else get_aliases()
+    return table.get(key) or slug_tag(label)
+
+
+def canonicalize_tags(labels: Iterable[str], aliases: Optional[Dict[str, str]] = None) -> List[str]:
+    """Canonical tags in input order, without duplicates or empty labels."""
+    table = aliases if aliases is not None else get_aliases()
+    seen = set()
+    out = []
+    for label in labels:
+        if not isinstance(label, str):
+            continue
+        tag = canonical_tag(label, table)
+        if tag and tag not in seen:
+            seen.add(tag)
+            out.append(tag)
+    return out
+
+
+class Vocabulary:
+    """
+    Hashtag usage stats over the runs in data/out (persisted as data/out/hashtags.json).
+
+    Each canonical tag keeps its usage count per platform. Only --top-tags reads it:
+    tag spelling (canonical_tag) never depends on these counts.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.aliases: Dict[str, str] = aliases if aliases is not None else load_aliases()
+        self.tags: Dict[str, Dict[str, int]] = {}  # canonical tag -> {platform: count}
+        self.runs: List[str] = []  # run ids counted, limited to runs still in data/out
+        self._memo: Dict[str, str] = {}  # raw label -> canonical tag
+        self._runs_set = set()
+
+    # -----------------------------
+    # Lookup
+    # -----------------------------
+
+    def canonical(self, label: str) -> str:
+        tag = self._memo.get(label)
+        if tag is None:
+            tag = self._memo[label] = canonical_tag(label, self.aliases)
+        return tag
+
+    def canonicalize(self, labels: Iterable[str]) -> List[str]:
+        return canonicalize_tags(labels, self.aliases)
+
+    def count(self, tag: str, platform: Optional[str] = None) -> int:
+        usage = self.tags.get(self.canonical(tag)) or {}
+        return usage.get(platform, 0) if platform else sum(usage.values())
+
+    def top(self, n: int = 20, platform: Optional[str] = None) -> List[Tuple[str, int, Dict[str, int]]]:
+        rows = []
+        for tag, usage in self.tags.items():
+            total = usage.get(platform, 0) if platform else sum(usage.values())
+            if total:
+                rows.append((tag, total, usage))
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return rows[:n]
+
+    # -----------------------------
+    # Building
+    # -----------------------------
+
+    def add(self, tags: Iterable[str], platforms: Iterable[str]) -> None:
+        platforms = list(platforms)
+        for tag in self.canonicalize(tags):
+            usage = self.tags.setdefault(tag, {})
+            for platform in platforms:
+                usage[platform] = usage.get(platform, 0) + 1
+
+    def add_run(self, run_id: str, package: dict) -> bool:
+        """Count a run's hashtags once per enabled platform. False if already counted."""
+        if run_id in self._runs_set:
+            return False
+        platforms = [
+            k for k, cfg in (package.get("platforms") or {}).items()
+            if isinstance(cfg, dict) and cfg.get("enabled") is True
+        ]
+        self.add(package.get("hashtags") or [], platforms)
+        self.runs.append(run_id)
+        self._runs_set.add(run_id)
+        return True
+
+    def forget_missing_runs(self, out_root: Path) -> int:
+        """
+        Drops the ids of runs no longer in data/out (archived, deleted), so the list stays
+        bounded by the run folders. Their counts stay. Returns how many were dropped.
+        """
+        present = {d.name for d in iter_run_dirs(out_root)}
+        kept = [r for r in self.runs if r in present]
+        dropped = len(self.runs) - len(kept)
+        self.runs, self._runs_set = kept, set(kept)
+        return dropped
+
+    def update_from_runs(self, out_root: Path) -> int:
+        """Ingest runs not counted yet. Returns how many were added."""
+        added = 0
+        for run_dir in iter_run_dirs(out_root):
+            if run_dir.name in self._runs_set:
+                continue
+            try:
+                package = load_package(run_dir)
+            except Exception:
+                continue
+            added += self.add_run(run_dir.name, package)
+        return added
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    @classmethod
+    def load(cls, out_root: Path, aliases: Optional[Dict[str, str]] = None) -> "Vocabulary":
+        vocab = cls(aliases)
+        path = out_root / VOCAB_NAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        except (OSError, json.JSONDecodeError):
+            data = {}
+
+        for tag, usage in (data.get("tags") or {}).items():
+            if not isinstance(usage, dict):
+                continue
+            # An alias added since the last save folds the old spelling into its canonical tag.
+            tag = vocab.canonical(tag)
+            if not tag:
+                continue
+            merged = vocab.tags.setdefault(tag, {})
+            for platform, c in usage.items():
+                merged[platform] = merged.get(platform, 0) + int(c)
+        vocab.runs = [r for r in data.get("runs") or [] if isinstance(r, str)]
+        vocab._runs_set = set(vocab.runs)
+        return vocab
+
+    def save(self, out_root: Path) -> Path:
+        out_root.mkdir(parents=True, exist_ok=True)
+        data = {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "tags": dict(sorted(self.tags.items())),
+            "runs": self.runs,
+        }
+        path = out_root / VOCAB_NAME
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+
+def update_vocabulary(out_root: Path) -> Vocabulary:
+    """Load data/out/hashtags.json, count new runs and save it back if anything changed."""
+    vocab = Vocabulary.load(out_root)
+    if vocab.forget_missing_runs(out_root) + vocab.update_from_runs(out_root):
+        vocab.save(out_root)
+    return vocab
+
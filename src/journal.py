@@ -0,0 +1,128 @@
+# src/journal.py
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+def journal_path(run_dir: str | Path) -> Path:
+    return Path(run_dir) / JOURNAL_NAME
+
+
+def append_entry(run_dir: str | Path, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Append one entry to data/out/<run_id>/journal.jsonl (append-only, one JSON object per line).
+    The line is fsync'ed: the journal is what prevents a replay from uploading twice.
+    """
+    record = {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"), **entry}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+
+    path = journal_path(run_dir)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return record
+
+
+def parse_entries(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Journal entries from JSONL lines (a run folder's journal or an archived copy).
+    A torn last line (crash mid-write) is ignored instead of failing the replay.
+    """
+    entries: List[Dict[str, Any]] = []
+    for ln in lines:
+        ln = ln.strip()
+        if not ln:
+            continue
+        try:
+            obj = json.loads(ln)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(obj, dict):
+            entries.append(obj)
+    return entries
+
+
+def read_entries(run_dir: str | Path) -> List[Dict[str, Any]]:
+    """Returns all journal entries in write order."""
+    path = journal_path(run_dir)
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        return parse_entries(f)
+
+
+def _is_real_success(e: Dict[str, Any], action: str) -> bool:
+    return (
+        e.get("event") == "result"
+        and e.get("outcome") == "ok"
+        and e.get("dry_run") is False
+        and e.get("action", "publish") == action
+    )
+
+
+def completed_platforms(run_dir: str | Path) -> Set[str]:
+    """
+    Platforms that already have a successful REAL publish result in this run.
+    Dry-run results and pre-stage uploads never count as completed.
+    """
+    return completed_in(read_entries(run_dir))
+
+
+def completed_in(entries: Iterable[Dict[str, Any]]) -> Set[str]:
+    """completed_platforms() over already-parsed entries."""
+    done: Set[str] = set()
+    for e in entries:
+        if _is_real_success(e, "publish"):
+            platform = e.get("platform")
+            if isinstance(platform, str):
+                done.add(platform)
+    return done
+
+
+def manual_platforms(entries: Iterable[Dict[str, Any]]) -> Set[str]:
+    """
+    Platforms whose real publish posted nothing (journaled "skipped": a manual-only
+    adapter such as Instagram, posted by hand from the outbox). Final: replaying the
+    run cannot publish them.
+    """
+    manual: Set[str] = set()
+    for e in entries:
+        if (e.get("event") == "result" and e.get("outcome") == "skipped" and e.get("dry_run") is False
+                and e.get("action", "publish") == "publish" and isinstance(e.get("platform"), str)):
+            manual.add(e["platform"])
+    return manual
+
+
+def prestaged_video_id(run_dir: str | Path, platform: str = "youtube") -> Optional[str]:
+    """Video id of the last successful real pre-stage upload for this platform, if any."""
+    video_id = None
+    for e in read_entries(run_dir):
+        if e.get("platform") == platform and _is_real_success(e, "prestage") and e.get("video_id"):
+            video_id = e["video_id"]
+    return video_id
+
+
+def uploaded_video_ids(entries: Iterable[Dict[str, Any]], platform: str = "youtube") -> List[str]:
+    """Video ids of real successful uploads (publish or pre-stage), in upload order."""
+    ids: List[str] = []
+    for e in entries:
+        if e.get("platform") != platform or not e.get("video_id"):
+            continue
+        if (_is_real_success(e, "publish") or _is_real_success(e, "prestage")) and e["video_id"] not in ids:
+            ids.append(e["video_id"])
+    return ids
+
+
+def processed_video_ids(entries: Iterable[Dict[str, Any]], platform: str = "youtube") -> Set[str]:
+    """Video ids whose final processing state is already journaled (event "processing")."""
+    return {
+        e["video_id"] for e in entries
+        if e.get("platform") == platform and e.get("event") == "processing" and e.get("video_id")
+    }
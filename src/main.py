@@ -1,25 +1,51 @@
 import json
+import logging
 import os
 import shutil
 import argparse
-import yaml
+import io
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
 from dotenv import load_dotenv
-from validate import raise_if_invalid, ValidationError
-from publish import dispatch
-from scheduling import can_dispatch
+
+# Load .env before local imports: some modules read env vars at import.
+load_dotenv()
+
+from validate import load_post_package, raise_if_invalid, ValidationError
+from publish import dispatch, prestage
+from daemon import run_daemon
+from scheduling import can_dispatch, next_dispatch_time
+from scheduling.planner import effective_week_id, load_schedule, plan_releases, write_schedule
+from scheduling.windows import WindowsConfigError, get_calendar, get_windows, window_tz
+from runs import PACKAGE_NAME, WATCH_RUN_ID, create_run_dir, iter_run_dirs, load_package, one_run_per_episode, select_runs
+from metadata import METADATA_NAME, load_metadata_yaml, load_run_metadata
+from hashtags import canonicalize_tags, update_vocabulary
+from gear import get_catalog
+from catalog import print_search
+from watch import watch
+from faststart import faststart_copy
+from archive import find_archived, run_archive
+from journal import completed_in, completed_platforms, read_entries
+from retention import DEFAULT_KEEP_DRY_RUNS, parse_size, run_gc
+from processing_status import DEFAULT_MAX_POLL_S, DEFAULT_MIN_POLL_S, DEFAULT_TIMEOUT_S, run_processing_status
+from tracing import annotate, span, traced
+from eventlog import event, log_context, setup_logging
+import tracing
+import profiler
 
 # Phase 9 (editorial expansion)
 # NOTE: these imports assume editorial/ and outbox/ are folders inside src/
 # and you're running: python src/main.py
-from editorial import derive_editorial
+from editorial import derive_editorial, derive_editorial_batch
 from outbox import write_outboxes
 
-load_dotenv()
-
 
 # -----------------------------
 # Helpers
@@ -33,7 +59,101 @@ def parse_args():
         help="Force real dispatch even if outside posting window (TEST ONLY).",
     )
     p.add_argument("--list-runs", action="store_true", help="List existing run folders in data/out and exit.")
-    p.add_argument("--run-id", type=str, default=None, help="Replay an existing run folder in data/out/<run-id>.")
+    p.add_argument(
+        "--next-windows",
+        type=int,
+        nargs="?",
+        const=3,
+        default=None,
+        metavar="N",
+        help="Show the next N posting windows (default 3) and each run's dispatch slot, then exit.",
+    )
+    p.add_argument(
+        "--plan",
+        action="store_true",
+        help="Assign ready episodes in INPUT_DIR to upcoming weeks, write data/out/schedule.json and exit.",
+    )
+    p.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stay running and dispatch every ready run when its locked window opens.",
+    )
+    p.add_argument(
+        "--top-tags",
+        type=int,
+        nargs="?",
+        const=20,
+        default=None,
+        metavar="N",
+        help="Update data/out/hashtags.json from all runs and show the N most used tags (default 20; --platform filters).",
+    )
+    p.add_argument(
+        "--search",
+        type=str,
+        default=None,
+        metavar="QUERY",
+        help="Update data/out/catalog.sqlite and search episodes (FTS5 syntax, e.g. 'gear:matrixbrute'; '' lists all).",
+    )
+    p.add_argument("--unpublished", action="store_true", help="With --search: only episodes never published.")
+    p.add_argument(
+        "--regen-outboxes",
+        action="store_true",
+        help="Re-derive the editorial outboxes of the unpublished runs in data/out from their metadata snapshot (e.g. after a CTA wording change) and exit.",
+    )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Rebuild data/out/_watch in place whenever INPUT_DIR changes (no dispatch).",
+    )
+    p.add_argument(
+        "--gc",
+        action="store_true",
+        help="Remove old dry runs from data/out (preview only unless --confirm).",
+    )
+    p.add_argument(
+        "--keep-dry-runs",
+        type=int,
+        default=None,
+        help="With --gc: dry runs kept per episode (default: GC_KEEP_DRY_RUNS or 3). Published runs are always kept.",
+    )
+    p.add_argument(
+        "--max-disk",
+        type=str,
+        default=None,
+        help="With --gc: disk budget for run folders, e.g. 20G (default: GC_MAX_DISK, none).",
+    )
+    p.add_argument(
+        "--archive",
+        action="store_true",
+        help="Bundle fully published runs into data/out/_archive/<run-id>.tar.gz and remove the folders (preview only unless --confirm).",
+    )
+    p.add_argument("--archive-media", action="store_true", help="With --archive: include media/ in the bundles.")
+    p.add_argument(
+        "--yt-status",
+        action="store_true",
+        help="Poll YouTube processing of uploaded videos (all runs, or --run-id/--since) and journal the final state.",
+    )
+    p.add_argument(
+        "--run-id",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="RUN_ID",
+        help="Replay run folders in data/out: one or more run ids or globs, e.g. '202603*' (a single archived run is shown read-only).",
+    )
+    p.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        metavar="WHEN",
+        help="Replay runs created at or after WHEN (2026-03-14, '2026-03-14 09:00' or a run id); narrows --run-id when both are given. One run per episode is replayed (the published one, else the newest).",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Runs replayed in parallel when several are selected (default: REPLAY_CONCURRENCY or 4; 1 with --trace/--profile).",
+    )
     p.add_argument(
         "--platform",
         type=str,
@@ -45,19 +165,30 @@ def parse_args():
     # Safe default: dry-run always (unless --confirm is used).
     p.add_argument("--dry-run", action="store_true", help="Force dry-run (default behavior).")
     p.add_argument("--confirm", action="store_true", help="Allow real posting (where supported).")
+    p.add_argument(
+        "--prestage",
+        action="store_true",
+        help="Upload the YouTube video now as private; dispatch at window time only switches visibility.",
+    )
+    p.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record stage spans to <run>/trace.json (Chrome trace format). Also enabled by TRACE=1.",
+    )
+    p.add_argument(
+        "--profile",
+        action="store_true",
+        help="cProfile + tracemalloc per stage: <run>/profile/*.pstats, allocations.txt and a hotspot table (implies --trace).",
+    )
+    p.add_argument(
+        "--faststart",
+        action="store_true",
+        help="Copy video.mp4 with its moov atom moved to the front (streamable upload). Also enabled by FASTSTART=1.",
+    )
 
     return p.parse_args()
 
 
-def load_metadata_yaml(meta_path: Path) -> dict:
-    if not meta_path.exists():
-        return {}
-    try:
-        return yaml.safe_load(meta_path.read_text(encoding="utf-8")) or {}
-    except Exception as e:
-        raise RuntimeError(f"Invalid metadata.yaml: {meta_path} ({e})")
-
-
 def _get(d: dict, *keys, default=None):
     cur = d
     for k in keys:
@@ -67,11 +198,6 @@ def _get(d: dict, *keys, default=None):
     return cur
 
 
-def _slug_hash(s: str) -> str:
-    s = (s or "").strip().lower()
-    return "#" + "".join(ch for ch in s if ch.isalnum())
-
-
 ALLOWED_EPISODE_TYPES = {
     "sound_explained_fast",
     "performance_challenge",
@@ -134,6 +260,7 @@ def derive_description(meta: dict) -> str:
     if key:
         ctx_lines.append(f"Key: {key}")
 
+    catalog = get_catalog()
     gear_lines = []
     for section, label in [
         ("synths", "Synths"),
@@ -143,7 +270,7 @@ def derive_description(meta: dict) -> str:
         ("interface", "Interface"),
     ]:
         items = _get(meta, "gear", section, default=[]) or []
-        items = [x for x in items if isinstance(x, str) and x.strip()]
+        items = catalog.canonicalize(x for x in items if isinstance(x, str) and x.strip())
         if items:
             gear_lines.append(f"{label}: " + ", ".join(items))
 
@@ -157,21 +284,9 @@ def derive_hashtags(meta: dict) -> list[str]:
     genres = _get(meta, "music", "genres", default=[]) or []
     mood = _get(meta, "music", "mood", default=[]) or []
 
-    tags = ["#electronicmusic", "#liveperformance"]
-    for g in genres:
-        if isinstance(g, str) and g.strip():
-            tags.append(_slug_hash(g))
-    for m in mood[:2]:
-        if isinstance(m, str) and m.strip():
-            tags.append(_slug_hash(m))
-
-    seen = set()
-    out = []
-    for t in tags:
-        if t not in seen:
-            seen.add(t)
-            out.append(t)
-    return out[:12]
+    # Canonical tags (aliases folded, e.g. "Funky House" -> #funkhouse)
+    labels = ["#electronicmusic", "#liveperformance", *genres, *mood[:2]]
+    return canonicalize_tags(labels)[:12]
 
 
 def derive_platforms(meta: dict) -> dict:
@@ -206,15 +321,291 @@ def list_runs(out_root: Path):
         print(f" - {r}")
 
 
+def list_next_windows(out_root: Path, input_dir: Path, n: int):
+    now = datetime.now(timezone.utc)
+    cal = get_calendar(now)
+
+    print("Upcoming windows:")
+    for opens_ts, closes_ts, key in cal.upcoming(now.timestamp(), n * len(get_windows())):
+        opens_at = datetime.fromtimestamp(opens_ts, window_tz(key))
+        closes_at = datetime.fromtimestamp(closes_ts, window_tz(key))
+        print(f" - {key:<9} {opens_at:%a %Y-%m-%d %H:%M}–{closes_at:%H:%M} {opens_at.tzinfo}")
+
+    runs = iter_run_dirs(out_root)
+    if not runs:
+        return
+    schedule = load_schedule(out_root)
+    print("\nRuns:")
+    for run_dir in reversed(runs):
+        try:
+            pkg = load_package(run_dir)
+            meta = load_run_metadata(run_dir, input_dir)
+        except Exception as e:
+            print(f" - {run_dir.name}: unreadable ({e})")
+            continue
+        window_key = (pkg.get("schedule") or {}).get("window")
+        week_id = effective_week_id(meta, schedule)
+        at = next_dispatch_time(window_key, meta, now, schedule) if window_key else None
+        if at is None:
+            slot = "no upcoming slot (not ready, wrong week or window passed)"
+        else:
+            slot = f"{at.astimezone(window_tz(window_key)):%a %Y-%m-%d %H:%M %Z}"
+        print(f" - {run_dir.name}  {window_key or '-'} / {week_id or '-'}  → {slot}")
+
+
+def run_planner(out_root: Path, input_dir: Path):
+    plan = plan_releases(input_dir, out_root)
+    path = write_schedule(out_root, plan)
+
+    print(f"Release plan ({len(plan.assignments)} episodes, {plan.reparsed} metadata files re-read):")
+    for episode_id, a in sorted(plan.assignments.items(), key=lambda kv: (kv[1]["week_id"], kv[0])):
+        pin = " (pinned)" if a["pinned"] else ""
+        print(f" - {a['week_id']}  {episode_id:<10} {a['episode_type']:<22} {', '.join(a['slots'])}{pin}")
+    if plan.unplaced:
+        print("Not planned:")
+        for key, reason in sorted(plan.unplaced.items()):
+            print(f" - {key}: {reason}")
+    print(f"Schedule written: {path}")
+
+
+def top_tags(out_root: Path, n: int, platform: str | None):
+    vocab = update_vocabulary(out_root)
+    rows = vocab.top(n, platform)
+    scope = f" on {platform}" if platform else ""
+    print(f"Top hashtags{scope} ({len(vocab.tags)} tags from {len(vocab.runs)} runs):")
+    for tag, total, usage in rows:
+        per = ", ".join(f"{p} {c}" for p, c in sorted(usage.items()))
+        print(f" - {tag:<24} {total:>5}   ({per})")
+
+
+def regen_outboxes(out_root: Path):
+    """
+    Re-derives the outboxes of runs from their own metadata.yaml snapshot. Runs without
+    a snapshot are skipped (INPUT_DIR/metadata.yaml may describe another episode), and
+    so are published runs: their outboxes are the record of what was posted.
+    """
+    run_dirs, packages, metas, hashtags = [], [], [], []
+    for run_dir in iter_run_dirs(out_root):
+        if not (run_dir / METADATA_NAME).exists():
+            print(f" - {run_dir.name}: skipped (no metadata snapshot)")
+            continue
+        if completed_platforms(run_dir):
+            print(f" - {run_dir.name}: skipped (published, outboxes kept as posted)")
+            continue
+        try:
+            pkg = load_package(run_dir)
+            meta = load_metadata_yaml(run_dir / METADATA_NAME)
+        except Exception as e:
+            print(f" - {run_dir.name}: skipped ({e})")
+            continue
+        run_dirs.append(run_dir)
+        packages.append(pkg)
+        metas.append(meta)
+        hashtags.append(pkg.get("hashtags", []))
+
+    editorials = derive_editorial_batch(metas, hashtags)
+    written = unchanged = 0
+    for run_dir, pkg, ed in zip(run_dirs, packages, editorials):
+        report = write_outboxes(str(run_dir), ed, pkg)
+        written += len(report.written)
+        unchanged += len(report.unchanged)
+    print(f"Outboxes regenerated: {len(run_dirs)} runs, {written} files written, {unchanged} unchanged.")
+
+
+def show_archived_run(archived, *, platform_filter: str | None):
+    """Replay of an archived run: package + journal read from the bundle, nothing dispatched."""
+    pkg = archived.package()
+    done = completed_in(archived.journal_entries())
+    print(f"Archived run {archived.run_id} ({archived.bundle.name}, read-only)")
+    print(f"Package: {pkg.get('id')} - {pkg.get('title')}")
+    pending = []
+    for key, cfg in (pkg.get("platforms") or {}).items():
+        if (platform_filter and key != platform_filter) or not (cfg or {}).get("enabled"):
+            continue
+        print(f" - {key:<10} {'published' if key in done else 'not published'}")
+        if key not in done:
+            pending.append(key)
+    if pending:
+        print(f"To dispatch {', '.join(pending)}, extract the run first: tar -xf {archived.bundle} -C {archived.bundle.parent.parent}")
+
+
 # -----------------------------
-# Phase 8 generator (restored)
+# Replay (--run-id / --since)
 # -----------------------------
 
-def generate_package(meta: dict, input_dir: Path, run_out: Path, *, dry_run: bool) -> tuple[dict, Path]:
-    errors = validate_metadata_semantic(meta, require_ready=not dry_run)
-    if errors:
-        raise RuntimeError("Metadata semantic validation failed:\n- " + "\n- ".join(errors))
+DEFAULT_REPLAY_CONCURRENCY = 4
+
+
+class _PerThreadStdout(io.TextIOBase):
+    """
+    sys.stdout stand-in while runs replay in parallel: a worker's prints go to its own
+    buffer (see capture), flushed as one block when its run ends, so the adapters'
+    output is not interleaved line by line.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buf = getattr(self.local, "buf", None)
+        if buf is None:
+            with self.lock:
+                return self.target.write(text)
+        return buf.write(text)
+
+    def flush(self) -> None:
+        if getattr(self.local, "buf", None) is None:
+            self.target.flush()
+
+    @contextmanager
+    def capture(self):
+        self.local.buf = io.StringIO()
+        try:
+            yield
+        finally:
+            text, self.local.buf = self.local.buf.getvalue(), None
+            with self.lock:
+                self.target.write(text)
+                self.target.flush()
+
+
+def load_replay_package(run_out: Path) -> dict:
+    """Reads post_package.json once; that same dict is validated and then dispatched."""
+    package_path = run_out / PACKAGE_NAME
+    pkg = load_post_package(package_path)
+    raise_if_invalid(package_path, pkg)
+    return pkg
+
+
+def replay_run(
+    run_out: Path,
+    pkg: dict,
+    *,
+    out_root: Path,
+    input_dir: Path,
+    dry_run: bool,
+    platform_filter: str | None,
+    prestage_only: bool,
+    schedule: dict | None = None,
+) -> str:
+    """Pre-stage, or guardrail + dispatch, of one loaded run. Returns the outcome."""
+    # Pre-stage is private, so it is not bound to the posting window.
+    if prestage_only:
+        prestage(pkg, package_dir=run_out, dry_run=dry_run)
+        return "prestaged"
+
+    # Phase 10 guardrail: ONLY block in REAL runs (--confirm), and only for YT/IG
+    if not dry_run:
+        now = datetime.now(ZoneInfo("America/New_York"))
+
+        window_key = None
+        if platform_filter in (None, "youtube", "instagram"):
+            window_key = pkg.get("schedule", {}).get("window")
+
+        # Reddit is manual/outbox-first: never block.
+        # metadata.yaml is only loaded for this check (window + week).
+        meta = load_run_metadata(run_out, input_dir) if window_key else {}
+        if window_key and not can_dispatch(window_key, meta, now, schedule if schedule is not None else load_schedule(out_root)):
+            event("guardrail", "⏳ Phase 10: Not in posting window or wrong week. Dispatch skipped.",
+                  window=window_key, outcome="skipped")
+            return "skipped"
+
+    dispatch(pkg, package_dir=run_out, dry_run=dry_run, platform_filter=platform_filter)
+    return "dispatched"
+
+
+def replay_many(
+    out_root: Path,
+    input_dir: Path,
+    runs: list[Path],
+    *,
+    dry_run: bool,
+    platform_filter: str | None,
+    prestage_only: bool,
+    jobs: int,
+    superseded: dict[str, Path] | None = None,
+) -> bool:
+    """
+    Replays several runs through a bounded pool (each package loaded and validated once,
+    schedule.json once for all) and prints a combined summary. superseded (run id ->
+    run replayed instead, see runs.one_run_per_episode) is listed in the summary, not
+    dispatched. Returns True when every run was valid and dispatched without error.
+    """
+    superseded = superseded or {}
+    schedule = load_schedule(out_root)
+    # Trace and profile buffers are per process: one run at a time, on the main thread.
+    workers = 1 if tracing.is_enabled() else max(1, jobs)
+
+    def one(run_out: Path) -> tuple[str, list[dict], str]:
+        seen = len(read_entries(run_out))
+        with log_context(run_id=run_out.name), output.capture():
+            print(f"\n--- {run_out.name} ---")
+            try:
+                try:
+                    pkg = load_replay_package(run_out)
+                except ValidationError as e:
+                    event("validate", f"\n{run_out.name}: {e}", level=logging.ERROR, outcome="error")
+                    errors = [line.lstrip("- ") for line in str(e).splitlines()[1:]] or [str(e)]
+                    return "invalid", [], errors[0] + (f" (+{len(errors) - 1} more)" if len(errors) > 1 else "")
+                outcome = replay_run(
+                    run_out, pkg, out_root=out_root, input_dir=input_dir, dry_run=dry_run,
+                    platform_filter=platform_filter, prestage_only=prestage_only, schedule=schedule,
+                )
+                return outcome, read_entries(run_out)[seen:], ""
+            except Exception as e:
+                # The journal has the failed attempt; keep replaying the other runs.
+                error = f"{type(e).__name__}: {e}"
+                event("replay", f"❌ {run_out.name}: {error}", level=logging.ERROR, outcome="error", error=error)
+                return "error", read_entries(run_out)[seen:], error
+            finally:
+                if workers == 1:
+                    tracing.write(run_out)
+                    profiler.write(run_out)
+
+    event("replay", f"=== REPLAY: {len(runs)} runs, {workers} in parallel" + (" (DRY-RUN) ===" if dry_run else " (REAL-RUN) ==="),
+          runs=len(runs), jobs=workers, dry_run=dry_run)
+    t0 = time.perf_counter()
+    output = _PerThreadStdout(sys.stdout)
+    sys.stdout = output
+    try:
+        if workers == 1:
+            results = [one(r) for r in runs]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(one, runs))
+    finally:
+        sys.stdout = output.target
+    elapsed = time.perf_counter() - t0
+
+    counts: dict[str, int] = {}
+    for outcome, _, _ in results:
+        counts[outcome] = counts.get(outcome, 0) + 1
+    if superseded:
+        counts["superseded"] = len(superseded)
+    print(f"\n=== REPLAY SUMMARY: {len(runs) + len(superseded)} runs in {elapsed:.1f}s: "
+          + ", ".join(f"{n} {k}" for k, n in sorted(counts.items())) + " ===")
+    for run_id, winner in sorted(superseded.items()):
+        print(f" - {run_id:<24} {'superseded':<10} same episode as {winner.name} (replayed instead)")
+    for run_out, (outcome, entries, error) in zip(runs, results):
+        platforms = [
+            f"{e['platform']} {e.get('outcome')}" + (f" {e['duration_ms']} ms" if e.get("duration_ms") is not None else "")
+            for e in entries if e.get("event") == "result"
+        ]
+        detail = ", ".join(platforms) or ("" if error else "nothing pending")
+        detail += f" ({error})" if detail and error else error
+        print(f" - {run_out.name:<24} {outcome:<10} {detail}")
+    event("replay", "", runs=len(runs), duration_ms=int(elapsed * 1000), outcome="done", **counts)
+
+    return all(outcome not in ("invalid", "error") for outcome, _, _ in results)
+
 
+# -----------------------------
+# Phase 8 generator (restored)
+# -----------------------------
+
+def _input_media(input_dir: Path) -> tuple[Path, Path]:
     media_in = input_dir / "media"
     if not media_in.exists():
         raise RuntimeError(f"Missing input media folder: {media_in}")
@@ -226,12 +617,59 @@ def generate_package(meta: dict, input_dir: Path, run_out: Path, *, dry_run: boo
         raise RuntimeError(f"Missing required input video: {video_in}")
     if not thumb_in.exists():
         raise RuntimeError(f"Missing required input thumbnail: {thumb_in}")
+    return video_in, thumb_in
+
 
+def copy_media(input_dir: Path, run_out: Path, *, faststart: bool = False) -> int:
+    """
+    Copies video + thumbnail into <run>/media. A file whose copy already has the same
+    size and mtime (copy2 keeps mtime) is left alone. With faststart, video.mp4 is
+    remuxed (moov first) while it is copied. Returns the bytes copied.
+    """
+    video_in, thumb_in = _input_media(input_dir)
     media_out = run_out / "media"
     media_out.mkdir(parents=True, exist_ok=True)
 
-    shutil.copy2(video_in, media_out / "video.mp4")
-    shutil.copy2(thumb_in, media_out / "thumbnail.jpg")
+    copied = 0
+    t0 = time.perf_counter()
+    with span("copy_media") as sp:
+        for src, name in ((video_in, "video.mp4"), (thumb_in, "thumbnail.jpg")):
+            dst = media_out / name
+            st = src.stat()
+            if dst.exists():
+                dst_st = dst.stat()
+                if (dst_st.st_size, dst_st.st_mtime_ns) == (st.st_size, st.st_mtime_ns):
+                    continue
+            if faststart and name == "video.mp4":
+                sp["faststart"] = "remuxed" if faststart_copy(src, dst) else "copied"
+            else:
+                shutil.copy2(src, dst)
+            copied += st.st_size
+        sp["files"] = 2
+        sp["bytes"] = copied
+    event("media", bytes=copied, duration_ms=int((time.perf_counter() - t0) * 1000),
+          outcome="copied" if copied else "unchanged", faststart=faststart)
+    return copied
+
+
+@traced("generate_package")
+def generate_package(
+    meta: dict, input_dir: Path, run_out: Path, *, dry_run: bool, faststart: bool = False
+) -> tuple[dict, Path]:
+    errors = validate_metadata_semantic(meta, require_ready=not dry_run)
+    if errors:
+        raise RuntimeError("Metadata semantic validation failed:\n- " + "\n- ".join(errors))
+
+    copy_media(input_dir, run_out, faststart=faststart)
+    return write_package(meta, input_dir, run_out)
+
+
+def write_package(meta: dict, input_dir: Path, run_out: Path) -> tuple[dict, Path]:
+    """Metadata snapshot + post_package.json (no media work)."""
+    # Snapshot the metadata this run was generated from (replay/daemon read it back).
+    meta_in = input_dir / METADATA_NAME
+    if meta_in.exists():
+        shutil.copy2(meta_in, run_out / METADATA_NAME)
 
     episode_id = _get(meta, "episode", "episode_id", default=None) or f"package_{run_out.name}"
     title = _get(meta, "episode", "episode_title", default="Untitled") or "Untitled"
@@ -257,11 +695,58 @@ def generate_package(meta: dict, input_dir: Path, run_out: Path, *, dry_run: boo
     }
 
     package_path = run_out / "post_package.json"
-    package_path.write_text(json.dumps(package, indent=2, ensure_ascii=False), encoding="utf-8")
+    package_json = json.dumps(package, indent=2, ensure_ascii=False)
+    package_path.write_text(package_json, encoding="utf-8")
+    annotate(hashtags=len(hashtags), package_bytes=len(package_json.encode("utf-8")))
 
     return package, package_path
 
 
+def run_watch(out_root: Path, input_dir: Path, *, dry_run: bool, faststart: bool = False):
+    """
+    --watch: one working folder (data/out/_watch) kept in sync with INPUT_DIR.
+    A metadata.yaml change re-derives package + outboxes only; a media change only
+    re-copies media. Nothing is dispatched.
+    """
+    run_out = out_root / WATCH_RUN_ID
+    run_out.mkdir(parents=True, exist_ok=True)
+
+    def refresh(changed: set[Path]) -> None:
+        t0 = time.perf_counter()
+        everything = Path(".") in changed
+        meta_changed = everything or any(p.name == METADATA_NAME for p in changed)
+        media_changed = everything or any(p.parts and p.parts[0] == "media" for p in changed)
+        if not (meta_changed or media_changed):
+            return
+
+        stages = []
+        try:
+            meta = load_metadata_yaml(input_dir / METADATA_NAME)
+            errors = validate_metadata_semantic(meta, require_ready=not dry_run)
+            if errors:
+                raise RuntimeError("Metadata semantic validation failed:\n- " + "\n- ".join(errors))
+
+            if media_changed:
+                copied = copy_media(input_dir, run_out, faststart=faststart)
+                stages.append(f"media ({copied / 1_048_576:.1f} MB copied)")
+
+            if meta_changed:
+                package, package_path = write_package(meta, input_dir, run_out)
+                raise_if_invalid(package_path)
+                report = write_outboxes(str(run_out), derive_editorial(meta, package.get("hashtags", [])), package)
+                stages.append(f"package + outboxes ({len(report.written)} written, {len(report.unchanged)} unchanged)")
+        except (RuntimeError, ValidationError) as e:
+            print(f"❌ [WATCH] {e}")
+            return
+
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"🔁 [WATCH] {datetime.now():%H:%M:%S} {', '.join(stages)} in {ms:.0f} ms → {run_out}")
+
+    print(f"Working folder: {run_out.resolve()}")
+    refresh({Path(".")})
+    watch(input_dir, refresh)
+
+
 # -----------------------------
 # Main
 # -----------------------------
@@ -280,101 +765,207 @@ def main():
     if args.dry_run:
         dry_run = True
 
+    if args.trace or os.getenv("TRACE") == "1":
+        tracing.enable()
+    if args.profile:
+        profiler.enable()
+    log_dir = os.getenv("LOG_DIR", str(project_root / "logs"))
+    setup_logging(Path(log_dir) if log_dir else None)
+    faststart = args.faststart or os.getenv("FASTSTART") == "1"
+
     # ---- LIST MODE
     if args.list_runs:
         list_runs(out_root)
         return
 
-    # ---- REPLAY MODE
-    if args.run_id:
-        run_out = out_root / args.run_id
-        package_path = run_out / "post_package.json"
+    if args.next_windows is not None:
+        list_next_windows(out_root, input_dir, args.next_windows)
+        return
 
-        if not package_path.exists():
-            print(f"ERROR: run-id not found or missing post_package.json: {package_path}")
-            raise SystemExit(2)
+    if args.plan:
+        run_planner(out_root, input_dir)
+        return
 
-        # Validate (schema)
-        try:
-            raise_if_invalid(package_path)
-            print("✅ Validation OK (replay)")
-        except ValidationError as e:
-            print(str(e))
-            raise SystemExit(2)
+    if args.top_tags is not None:
+        top_tags(out_root, args.top_tags, args.platform)
+        return
+
+    if args.search is not None:
+        print_search(out_root, input_dir, args.search, unpublished=args.unpublished)
+        return
+
+    if args.regen_outboxes:
+        regen_outboxes(out_root)
+        return
 
-        # Load package
-        pkg = json.loads(package_path.read_text(encoding="utf-8"))
+    if args.gc:
+        keep = args.keep_dry_runs if args.keep_dry_runs is not None else int(os.getenv("GC_KEEP_DRY_RUNS", DEFAULT_KEEP_DRY_RUNS))
+        max_disk = args.max_disk or os.getenv("GC_MAX_DISK")
+        update_vocabulary(out_root)  # count the hashtags of runs about to be removed
+        run_gc(out_root, keep_dry_runs=keep, max_bytes=parse_size(max_disk) if max_disk else None, confirm=args.confirm)
+        return
+
+    if args.archive:
+        update_vocabulary(out_root)  # count the hashtags of runs about to leave data/out
+        run_archive(out_root, include_media=args.archive_media, confirm=args.confirm)
+        return
+
+    if args.watch:
+        run_watch(out_root, input_dir, dry_run=dry_run, faststart=faststart)
+        return
 
-        # Load metadata.yaml (needed for Phase 10 guardrail in real posting)
-        meta_path = input_dir / "metadata.yaml"
-        meta = load_metadata_yaml(meta_path)
+    if args.yt_status:
+        runs = select_runs(out_root, args.run_id or [], args.since)[0] if (args.run_id or args.since) else iter_run_dirs(out_root)
+        result = run_processing_status(
+            runs,
+            timeout_s=float(os.getenv("YT_STATUS_TIMEOUT_S", DEFAULT_TIMEOUT_S)),
+            min_poll_s=float(os.getenv("YT_STATUS_MIN_POLL_S", DEFAULT_MIN_POLL_S)),
+            max_poll_s=float(os.getenv("YT_STATUS_MAX_POLL_S", DEFAULT_MAX_POLL_S)),
+        )
+        failed = [e for e in result.final.values() if e.get("processing_status", e.get("upload_status")) not in ("succeeded", "processed")]
+        if failed:
+            raise SystemExit(2)
+        return
 
-        # Phase 10 guardrail: ONLY block in REAL runs (--confirm), and only for YT/IG
-        if not dry_run:
-            now = datetime.now(ZoneInfo("America/New_York"))
+    # ---- DAEMON MODE
+    if args.daemon:
+        run_daemon(out_root, input_dir, dry_run=dry_run, platform_filter=args.platform)
+        return
 
-            window_key = None
-            if args.platform in (None, "youtube", "instagram"):
-                window_key = pkg.get("schedule", {}).get("window")
+    # ---- REPLAY MODE
+    single = args.run_id and len(args.run_id) == 1 and not args.since and not any(c in args.run_id[0] for c in "*?[")
+    if single:
+        run_id = args.run_id[0]
+        run_out = out_root / run_id
+        package_path = run_out / PACKAGE_NAME
 
-            # Reddit is manual/outbox-first: never block
-            if window_key and not can_dispatch(window_key, meta, now):
-                print("⏳ Phase 10: Not in posting window or wrong week. Dispatch skipped.")
+        if not package_path.exists():
+            archived = find_archived(out_root, run_id) if not run_out.exists() else None
+            if archived is not None:
+                show_archived_run(archived, platform_filter=args.platform)
                 return
+            event("replay", f"ERROR: run-id not found or missing post_package.json: {package_path}",
+                  level=logging.ERROR, run_id=run_id, outcome="error")
+            raise SystemExit(2)
+
+        with log_context(run_id=run_id):
+            try:
+                # Load + validate (schema), one read of post_package.json
+                try:
+                    pkg = load_replay_package(run_out)
+                    event("validate", "✅ Validation OK (replay)", outcome="ok")
+                except ValidationError as e:
+                    event("validate", str(e), level=logging.ERROR, outcome="error")
+                    raise SystemExit(2)
+
+                # Another folder already published this episode: replay that one instead.
+                winner = one_run_per_episode(out_root, [run_out])[1].get(run_id)
+                if winner is not None:
+                    event("replay", f"⏭️ {run_id} superseded: episode {pkg.get('id')} was published from {winner.name}. "
+                          f"Replay --run-id {winner.name} to retry its missing platforms.",
+                          level=logging.WARNING, superseded_by=winner.name, outcome="skipped")
+                    return
+
+                replay_run(
+                    run_out, pkg, out_root=out_root, input_dir=input_dir, dry_run=dry_run,
+                    platform_filter=args.platform, prestage_only=args.prestage,
+                )
+            finally:
+                tracing.write(run_out)
+                profiler.write(run_out)
+        return
+
+    if args.run_id or args.since:
+        runs, missing = select_runs(out_root, args.run_id or [], args.since)
+        for pattern in missing:
+            archived = find_archived(out_root, pattern)
+            hint = f" (archived: replay it alone with --run-id {pattern})" if archived is not None else ""
+            event("replay", f"⚠️ No run folder matches '{pattern}'{hint}", level=logging.WARNING,
+                  pattern=pattern, outcome="missing")
+        if not runs:
+            event("replay", "ERROR: no run selected.", level=logging.ERROR, outcome="error")
+            raise SystemExit(2)
 
-        dispatch(pkg, package_dir=run_out, dry_run=dry_run, platform_filter=args.platform)
+        # One run per episode, as the daemon does: never the same video uploaded from several folders.
+        runs, superseded = one_run_per_episode(out_root, runs)
+        jobs = args.jobs if args.jobs is not None else int(os.getenv("REPLAY_CONCURRENCY") or DEFAULT_REPLAY_CONCURRENCY)
+        ok = replay_many(
+            out_root, input_dir, runs, dry_run=dry_run, platform_filter=args.platform,
+            prestage_only=args.prestage, jobs=jobs, superseded=superseded,
+        )
+        if missing or not ok:
+            raise SystemExit(2)
         return
 
     # ---- GENERATION MODE
-    print("=== DRY-RUN: GENERATE PACKAGE ===" if dry_run else "=== REAL-RUN: GENERATE PACKAGE ===")
-    print(f"Input:  {input_dir.resolve()}")
+    event("generate", "=== DRY-RUN: GENERATE PACKAGE ===" if dry_run else "=== REAL-RUN: GENERATE PACKAGE ===",
+          dry_run=dry_run)
+    event("generate", f"Input:  {input_dir.resolve()}", input_dir=str(input_dir.resolve()))
 
     # Load canonical metadata
     meta_path = input_dir / "metadata.yaml"
     meta = load_metadata_yaml(meta_path)
 
     # Create new run folder
-    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    run_out = out_root / run_id
-    run_out.mkdir(parents=True, exist_ok=True)
-
-    # Generate package
-    package, package_path = generate_package(meta, input_dir, run_out, dry_run=dry_run)
-
-    # Validate
-    try:
-        raise_if_invalid(package_path)
-        print("✅ Validation OK")
-    except ValidationError as e:
-        print(str(e))
-        raise SystemExit(2)
+    run_out = create_run_dir(out_root)
 
-    # Phase 9: editorial + outboxes
-    editorial = derive_editorial(meta, package.get("hashtags", []))
-    written = write_outboxes(str(run_out), editorial)
-    if written:
-        print("\nOutbox generated:")
-        for p in written:
-            print(f" - {p}")
+    with log_context(run_id=run_out.name):
+        try:
+            # Generate package
+            package, package_path = generate_package(meta, input_dir, run_out, dry_run=dry_run, faststart=faststart)
+
+            # Validate
+            try:
+                raise_if_invalid(package_path)
+                event("validate", "✅ Validation OK", outcome="ok")
+            except ValidationError as e:
+                event("validate", str(e), level=logging.ERROR, outcome="error")
+                raise SystemExit(2)
+
+            # Count this run's hashtags in data/out/hashtags.json
+            update_vocabulary(out_root)
+
+            # Phase 9: editorial + outboxes
+            editorial = derive_editorial(meta, package.get("hashtags", []))
+            report = write_outboxes(str(run_out), editorial, package)
+            if report.written:
+                event("outbox", "\nOutbox generated:\n" + "\n".join(f" - {p}" for p in report.written),
+                      files=len(report.written))
+            if report.unchanged:
+                event("outbox", f"Outbox unchanged: {len(report.unchanged)} file(s)", unchanged=len(report.unchanged))
+
+            # Pre-stage is private, so it is not bound to the posting window.
+            if args.prestage:
+                prestage(package, package_dir=run_out, dry_run=dry_run)
+                return
 
-    # Phase 10 guardrail: ONLY block in REAL runs (--confirm), only for YT/IG (never reddit)
-    if not dry_run:
-        now = datetime.now(ZoneInfo("America/New_York"))
+            # Phase 10 guardrail: ONLY block in REAL runs (--confirm), only for YT/IG (never reddit)
+            if not dry_run:
+                now = datetime.now(ZoneInfo("America/New_York"))
 
-        window_key = None
-        if args.platform in (None, "youtube", "instagram"):
-            window_key = package.get("schedule", {}).get("window")
+                window_key = None
+                if args.platform in (None, "youtube", "instagram"):
+                    window_key = package.get("schedule", {}).get("window")
 
-        if window_key and not can_dispatch(window_key, meta, now):
-            if not args.force_dispatch:
-                print("⏳ Phase 10: Not in posting window or wrong week. Dispatch skipped.")
-                return
-            else:
-                print("⚠️ Phase 10 bypassed with --force-dispatch (TEST MODE).")
+                if window_key and not can_dispatch(window_key, meta, now, load_schedule(out_root)):
+                    if not args.force_dispatch:
+                        event("guardrail", "⏳ Phase 10: Not in posting window or wrong week. Dispatch skipped.",
+                              window=window_key, outcome="skipped")
+                        return
+                    else:
+                        event("guardrail", "⚠️ Phase 10 bypassed with --force-dispatch (TEST MODE).",
+                              level=logging.WARNING, window=window_key, outcome="bypassed")
 
-    # Dispatch (always allowed in dry-run so you can test anytime)
-    dispatch(package, package_dir=run_out, dry_run=dry_run, platform_filter=args.platform)
+            # Dispatch (always allowed in dry-run so you can test anytime)
+            dispatch(package, package_dir=run_out, dry_run=dry_run, platform_filter=args.platform)
+        finally:
+            tracing.write(run_out)
+            profiler.write(run_out)
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except WindowsConfigError as e:
+        print(f"❌ {e}")
+        raise SystemExit(2)
@@ -0,0 +1,153 @@
+# src/metadata.py
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+from tracing import annotate, traced
+
+METADATA_NAME = "metadata.yaml"
+
+# libyaml's C loader when PyYAML was built with it (same safe subset, much faster).
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "metadata"
+
+# Bump when the cached record layout (or what the loader returns) changes.
+CACHE_VERSION = 2
+
+# YAML timestamps have no JSON type: cached as tagged strings ("\x00date:2026-10-18").
+# A real string starting with the tag marker is escaped the same way ("\x00str:...").
+_TAG = "\x00"
+
+
+def safe_load(text: str) -> Any:
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def cache_dir() -> Optional[Path]:
+    """METADATA_CACHE_DIR (default: data/cache/metadata); METADATA_CACHE=0 disables the cache."""
+    if os.getenv("METADATA_CACHE") == "0":
+        return None
+    env = os.getenv("METADATA_CACHE_DIR")
+    return Path(env) if env else DEFAULT_CACHE_DIR
+
+
+def _cache_file(root: Path, path: Path) -> Path:
+    return root / (hashlib.sha1(str(path).encode("utf-8")).hexdigest() + ".json")
+
+
+class _Uncacheable(Exception):
+    """Parsed YAML JSON cannot hold faithfully (non-string keys, sets, binary)."""
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, str):
+        return _TAG + "str:" + value if value.startswith(_TAG) else value
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dt.datetime):
+        return _TAG + "datetime:" + value.isoformat()
+    if isinstance(value, dt.date):
+        return _TAG + "date:" + value.isoformat()
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict) and all(isinstance(k, str) and not k.startswith(_TAG) for k in value):
+        return {k: _encode(v) for k, v in value.items()}
+    raise _Uncacheable(type(value).__name__)
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_TAG):
+        kind, _, text = value[1:].partition(":")
+        if kind == "datetime":
+            return dt.datetime.fromisoformat(text)
+        if kind == "date":
+            return dt.date.fromisoformat(text)
+        return text
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+def _cache_get(root: Path, path: Path, st: os.stat_result) -> Optional[dict]:
+    """
+    Parsed metadata if the cached record matches (path, size, mtime_ns).
+    Records are plain JSON; any unreadable or stale record is simply ignored.
+    """
+    try:
+        record = json.loads(_cache_file(root, path).read_text(encoding="utf-8"))
+        if (record["version"], record["path"], record["size"], record["mtime_ns"]) != (
+                CACHE_VERSION, str(path), st.st_size, st.st_mtime_ns):
+            return None
+        return _decode(record["data"])
+    except Exception:
+        return None
+
+
+def _cache_put(root: Path, path: Path, st: os.stat_result, data: dict) -> None:
+    try:
+        record = {"version": CACHE_VERSION, "path": str(path), "size": st.st_size,
+                  "mtime_ns": st.st_mtime_ns, "data": _encode(data)}
+    except _Uncacheable:
+        return  # parsed from YAML every time instead
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        target = _cache_file(root, path)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        pass  # the cache is an optimization only
+
+
+@traced("load_metadata_yaml")
+def load_metadata_yaml(meta_path: Path) -> dict:
+    """
+    Parses metadata.yaml (C loader when available). Unchanged files (same path, size
+    and mtime) are read back from the parsed-metadata cache instead of re-parsed.
+    """
+    try:
+        st = meta_path.stat()
+    except FileNotFoundError:
+        return {}
+
+    path = meta_path.resolve()
+    root = cache_dir()
+    if root is not None:
+        cached = _cache_get(root, path, st)
+        if cached is not None:
+            annotate(cache="hit")
+            return cached
+
+    try:
+        text = meta_path.read_text(encoding="utf-8")
+        annotate(bytes=len(text.encode("utf-8")), cache="miss")
+        data = safe_load(text) or {}
+    except Exception as e:
+        raise RuntimeError(f"Invalid metadata.yaml: {meta_path} ({e})")
+
+    if root is not None:
+        _cache_put(root, path, st, data)
+    return data
+
+
+def load_run_metadata(run_dir: Path, input_dir: Path) -> dict:
+    """
+    Metadata for an existing run: the snapshot taken at generation time
+    (data/out/<run_id>/metadata.yaml), else the current INPUT_DIR/metadata.yaml
+    (runs generated before snapshots existed).
+    """
+    snapshot = run_dir / METADATA_NAME
+    if snapshot.exists():
+        return load_metadata_yaml(snapshot)
+    return load_metadata_yaml(input_dir / METADATA_NAME)
@@ -1,2 +1,3 @@
 # src/outbox/__init__.py
+from .atomic import OutboxWriteReport, write_files_atomic
 from .writers import write_outboxes
@@ -0,0 +1,88 @@
+# src/outbox/atomic.py
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+
+@dataclass
+class OutboxWriteReport:
+    written: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_digest(path: Path) -> str | None:
+    try:
+        return _digest(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _fsync_dir(path: Path) -> None:
+    # Makes the renames durable; not supported on every platform (e.g. Windows).
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _mode_for(path: Path) -> int:
+    # mkstemp creates 0600 files: keep the target's mode, else a regular file's 0644.
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        return 0o644
+
+
+def write_files_atomic(directory: str | Path, files: Dict[str, str]) -> OutboxWriteReport:
+    """
+    Writes {file name: text} under directory. Each file goes to a temp file that is
+    fsync'ed then renamed over the target, so a reader never sees a half-written file.
+    Files whose content digest did not change are not touched. The directory is
+    fsync'ed once, and only if something was renamed into it. Temp names are unique
+    (mkstemp), so concurrent writers of the same outbox never share a temp file.
+    """
+    out_dir = Path(directory)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report = OutboxWriteReport()
+
+    for name, text in files.items():
+        path = out_dir / name
+        data = text.encode("utf-8")
+        if _file_digest(path) == _digest(data):
+            report.unchanged.append(str(path))
+            continue
+
+        fd, tmp = tempfile.mkstemp(dir=out_dir, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                os.fchmod(f.fileno(), _mode_for(path))
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        report.written.append(str(path))
+
+    if report.written:
+        _fsync_dir(out_dir)
+    return report
@@ -4,8 +4,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-import textwrap
-import datetime
+
+from editorial.templates import render
+from gear import get_catalog
+from tracing import annotate, traced
+
+from .atomic import write_files_atomic
 
 
 @dataclass(frozen=True)
@@ -67,8 +71,9 @@ def _safe_get(d: Dict[str, Any], *keys: str, default=None):
 
 def _infer_gear_lines(description: str) -> List[str]:
     """
-    Heuristic: tries to extract 'Gear used:' blocks or bullet-like lines.
-    If nothing is found, returns an empty list.
+    Heuristic: tries to extract 'Gear used:' blocks or bullet-like lines,
+    else every gear catalog mention (config/gear.yaml) in the description.
+    Names are canonicalized through the catalog. If nothing is found, returns an empty list.
     """
     lines = [ln.strip() for ln in (description or "").splitlines()]
     gear: List[str] = []
@@ -92,12 +97,12 @@ def _infer_gear_lines(description: str) -> List[str]:
                     break
                 gear.append(ln.strip())
 
-    # fallback: detect known gear names in description
-    known = ["Hydrasynth", "Digitakt", "RC-505", "MatrixBrute", "Scarlett", "Yamaha MG"]
-    if not gear:
-        found = [k for k in known if k.lower() in (description or "").lower()]
-        # make them look like bullets
-        gear = found
+    catalog = get_catalog()
+    if gear:
+        gear = [catalog.canonical(g) for g in gear]
+    else:
+        # fallback: one pass over the description for known gear names
+        gear = catalog.find(description or "")
 
     # de-dup while preserving order
     out: List[str] = []
@@ -125,109 +130,65 @@ def _build_post_body(package: Dict[str, Any]) -> str:
 
     gear = _infer_gear_lines(desc)
 
-    # Core body: short + human + technical
-    body_lines: List[str] = []
-    body_lines.append("Original live performance (no repost, no ads).")
+    excerpt: List[str] = []
     if desc:
         # keep a short excerpt (avoid dumping full YT description)
-        excerpt = desc.splitlines()
-        excerpt = [ln.strip() for ln in excerpt if ln.strip()]
-        excerpt = excerpt[:3]  # 3 lines max
-        if excerpt:
-            body_lines.append("")
-            body_lines.extend(excerpt)
-
-    if gear:
-        body_lines.append("")
-        body_lines.append("Gear used:")
-        for g in gear[:8]:
-            body_lines.append(f"- {g}")
+        excerpt = [ln.strip() for ln in desc.splitlines() if ln.strip()][:3]  # 3 lines max
 
     # Optional: tags as plain words (not #hashtags)
-    if hashtags:
-        tags = [h.lstrip("#") for h in hashtags if isinstance(h, str)]
-        tags = [t for t in tags if t]
-        if tags:
-            body_lines.append("")
-            body_lines.append("Tags:")
-            body_lines.append(", ".join(tags[:10]))
-
-    # Soft info line (optional)
-    body_lines.append("")
-    body_lines.append("Happy to answer questions about the patch / workflow.")
+    tags = [h.lstrip("#") for h in hashtags if isinstance(h, str)]
+    tags = [t for t in tags if t]
 
-    return "\n".join(body_lines)
+    # Core body: short + human + technical
+    text = render("reddit_post_body.txt", {
+        "excerpt": excerpt,
+        "gear": gear[:8],
+        "tags": ", ".join(tags[:10]),
+    })
+    return text.rstrip("\n")
 
 
-def generate_reddit_outbox(
+def render_reddit_outbox(
     package: Dict[str, Any],
     package_dir: str | Path,
+    editorial_md: str = "",
     subreddit_rules: Optional[List[SubredditRule]] = None,
     max_suggestions: int = 6,
-) -> Path:
+) -> str:
     """
-    Writes outbox/reddit.md under the package_dir folder.
-    Returns the path to the created file.
+    Renders the outbox/reddit.md document: the episode's editorial notes (if given),
+    subreddit suggestions, the post body and the media path. Pure: no file IO.
     """
     pkg_dir = Path(package_dir)
-    outbox_dir = pkg_dir / "outbox"
-    outbox_dir.mkdir(parents=True, exist_ok=True)
-
-    title = _safe_get(package, "title", default="(untitled)")
     media_video_rel = _safe_get(package, "media", "video", default=None)
     video_path = (pkg_dir / media_video_rel).resolve() if media_video_rel else None
 
     rules = subreddit_rules or DEFAULT_SUBREDDIT_RULES
     rules = rules[:max_suggestions]
 
-    body = _build_post_body(package)
-
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    md = []
-    md.append("# Reddit Posting Outbox")
-    md.append("")
-    md.append(f"_Generated: {now}_")
-    md.append("")
-    md.append("## Primary intent")
-    md.append("Original live electronic music performance")
-    md.append("No repost · No AI · No ads")
-    md.append("")
-    md.append("---")
-    md.append("")
-    md.append("## Suggested subreddits (choose 1–2 max)")
-    md.append("")
-
-    for r in rules:
-        md.append(f"### r/{r.name}")
-        md.append(f"**Mode:** {r.mode}")
-        md.append(f"**Title suggestion:** {r.title_hint}")
-        md.append(f"**Notes:** {r.notes}")
-        md.append("")
-
-    md.append("---")
-    md.append("")
-    md.append("## Post body (copy/paste)")
-    md.append("")
-    md.append(body)
-    md.append("")
-    md.append("---")
-    md.append("")
-    md.append("## Media")
-    if video_path:
-        md.append(f"Video file: `{media_video_rel}`")
-        md.append(f"Absolute path (for your reference): `{str(video_path)}`")
-    else:
-        md.append("Video file: (missing in package)")
-    md.append("")
-    md.append("---")
-    md.append("")
-    md.append("## Reminder")
-    md.append("- Do NOT crosspost")
-    md.append("- Post manually")
-    md.append("- Engage in comments if people reply")
-    md.append("")
-
-    out_path = outbox_dir / "reddit.md"
-    out_path.write_text("\n".join(md), encoding="utf-8")
-    return out_path
+    return render("reddit_outbox.md", {
+        "editorial": editorial_md,
+        "rules": rules,
+        "body": _build_post_body(package),
+        "video_rel": media_video_rel,
+        "video_path": str(video_path) if video_path else "",
+    })
+
+
+@traced("generate_reddit_outbox")
+def generate_reddit_outbox(
+    package: Dict[str, Any],
+    package_dir: str | Path,
+    subreddit_rules: Optional[List[SubredditRule]] = None,
+    max_suggestions: int = 6,
+) -> Path:
+    """
+    Writes outbox/reddit.md under the package_dir folder from the package alone.
+    Only used for runs whose outbox was never rendered (write_outboxes renders it
+    together with the editorial notes). Returns the path to the file.
+    """
+    outbox_dir = Path(package_dir) / "outbox"
+    content = render_reddit_outbox(package, package_dir, "", subreddit_rules, max_suggestions)
+    report = write_files_atomic(outbox_dir, {"reddit.md": content})
+    annotate(bytes=len(content.encode("utf-8")), written=len(report.written))
+    return outbox_dir / "reddit.md"
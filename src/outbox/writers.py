@@ -1,52 +1,60 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Dict, Optional
 
+from tracing import annotate, traced
 
-def write_outboxes(run_dir: str, editorial: dict) -> list[str]:
+from .atomic import OutboxWriteReport, write_files_atomic
+from .reddit_outbox import render_reddit_outbox
+
+
+@traced("write_outboxes")
+def write_outboxes(run_dir: str, editorial: dict, package: Optional[Dict[str, Any]] = None) -> OutboxWriteReport:
     """
-    Writes editorial outbox files under:
+    Writes every outbox file under:
       data/out/<run_id>/outbox/
-    Returns list of written file paths.
+    in one pass, each rendered once from the shared editorial result. With the package
+    and Reddit enabled, reddit.md is the full posting outbox (editorial notes included).
+    Returns the written and unchanged file paths.
     """
     outbox_dir = Path(run_dir) / "outbox"
-    outbox_dir.mkdir(parents=True, exist_ok=True)
-
-    written: list[str] = []
+    files: Dict[str, str] = {}
 
     # Reddit
     reddit_md = (((editorial or {}).get("reddit") or {}).get("md")) or ""
-    if reddit_md.strip():
-        p = outbox_dir / "reddit.md"
-        p.write_text(reddit_md, encoding="utf-8")
-        written.append(str(p))
+    reddit_cfg = ((package or {}).get("platforms") or {}).get("reddit") or {}
+    if package is not None and reddit_cfg.get("enabled"):
+        files["reddit.md"] = render_reddit_outbox(package, run_dir, reddit_md)
+    elif reddit_md.strip():
+        files["reddit.md"] = reddit_md
 
     # Instagram
     ig_caption = (((editorial or {}).get("instagram") or {}).get("caption")) or ""
     if ig_caption.strip():
-        p = outbox_dir / "instagram.txt"
-        p.write_text(ig_caption, encoding="utf-8")
-        written.append(str(p))
+        files["instagram.txt"] = ig_caption
 
     # TikTok
     tiktok_caption = (((editorial or {}).get("tiktok") or {}).get("caption")) or ""
     pinned = (((editorial or {}).get("tiktok") or {}).get("pinned_comment")) or ""
     if (tiktok_caption.strip() or pinned.strip()):
-        p = outbox_dir / "tiktok.txt"
         content = []
         if tiktok_caption.strip():
             content.append(tiktok_caption.strip())
         if pinned.strip():
             content.append("")
             content.append(f"Pinned comment: {pinned.strip()}")
-        p.write_text("\n".join(content).strip() + "\n", encoding="utf-8")
-        written.append(str(p))
+        files["tiktok.txt"] = "\n".join(content).strip() + "\n"
 
     # Shorts (optional debug artifact)
     shorts = (((editorial or {}).get("shorts") or {}).get("youtube")) or []
     if shorts:
-        p = outbox_dir / "youtube_shorts_titles.txt"
-        p.write_text("\n".join(shorts).strip() + "\n", encoding="utf-8")
-        written.append(str(p))
-
-    return written
+        files["youtube_shorts_titles.txt"] = "\n".join(shorts).strip() + "\n"
+
+    report = write_files_atomic(outbox_dir, files)
+    annotate(
+        files=len(report.written),
+        unchanged=len(report.unchanged),
+        bytes=sum(Path(p).stat().st_size for p in report.written),
+    )
+    return report
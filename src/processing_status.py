@@ -0,0 +1,215 @@
+# src/processing_status.py
+"""
+YouTube processing status of uploaded videos (--yt-status).
+
+videos.insert returns as soon as the bytes are in; transcoding happens afterwards and can
+still fail. The uploaded ids are already in each run's journal (youtube publish / pre-stage
+results), so the tracker needs no state of its own:
+
+    pending   = uploaded ids without an event "processing" line
+    each poll = videos.list(part=processingDetails,status), 50 ids per call, so one call
+                covers a week of uploads
+    final     = one journal line per video and run: {"platform": "youtube", "event": "processing",
+                "video_id", "processing_status", "upload_status", "failure_reason"...}
+
+A video id found in several runs (a replayed or copied run) is polled once and its
+final state journaled in every one of them. A failed poll (HTTP error, network) is
+retried with backoff until the timeout; states already journaled are kept.
+
+Polls adapt: the next one is due when the shortest processingProgress.timeLeftMs says a
+video should be done, else the interval grows by BACKOFF; always within
+[min_poll_s, max_poll_s].
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from googleapiclient.errors import HttpError
+
+from adapters.youtube import processing_details
+from eventlog import event
+from journal import append_entry, processed_video_ids, read_entries, uploaded_video_ids
+
+DEFAULT_MIN_POLL_S = 10.0
+DEFAULT_MAX_POLL_S = 300.0
+DEFAULT_TIMEOUT_S = 1800.0
+BACKOFF = 1.5
+
+# videos.list accepts at most 50 ids per call.
+IDS_PER_CALL = 50
+
+# A video listed nowhere this many polls in a row is recorded as not_found (deleted, other channel).
+MISSING_POLLS = 2
+
+FINAL_PROCESSING = {"succeeded", "failed", "terminated"}
+FINAL_UPLOAD = {"processed", "failed", "rejected", "deleted"}
+
+Fetch = Callable[[Sequence[str]], Dict[str, dict]]
+
+
+@dataclass
+class TrackedVideo:
+    run_dir: Path
+    video_id: str
+
+
+@dataclass
+class TrackResult:
+    final: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # video_id -> journal entry
+    pending: List[str] = field(default_factory=list)  # still processing at timeout
+    calls: int = 0
+    errors: int = 0  # failed polls (retried)
+
+
+def pending_videos(run_dirs: Iterable[Path]) -> List[TrackedVideo]:
+    """Uploaded YouTube videos whose final processing state is not journaled yet."""
+    out: List[TrackedVideo] = []
+    for run_dir in run_dirs:
+        entries = read_entries(run_dir)
+        done = processed_video_ids(entries)
+        out.extend(TrackedVideo(run_dir, vid) for vid in uploaded_video_ids(entries) if vid not in done)
+    return out
+
+
+def final_entry(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Journal fields for a videos.list resource in a final state, None while it is still processing."""
+    details = item.get("processingDetails") or {}
+    status = item.get("status") or {}
+    processing = details.get("processingStatus")
+    upload = status.get("uploadStatus")
+    if processing not in FINAL_PROCESSING and upload not in FINAL_UPLOAD:
+        return None
+    entry = {
+        "processing_status": processing,
+        "upload_status": upload,
+        "privacy_status": status.get("privacyStatus"),
+        "failure_reason": details.get("processingFailureReason") or status.get("failureReason") or status.get("rejectionReason"),
+    }
+    return {k: v for k, v in entry.items() if v is not None}
+
+
+def time_left_s(item: Dict[str, Any]) -> Optional[float]:
+    left = ((item.get("processingDetails") or {}).get("processingProgress") or {}).get("timeLeftMs")
+    try:
+        return int(left) / 1000 if left is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def next_interval(previous: float, hints_s: List[float], min_s: float, max_s: float) -> float:
+    """Shortest time-left hint when YouTube gives one, else back off from the previous interval."""
+    wanted = min(hints_s) if hints_s else previous * BACKOFF
+    return min(max_s, max(min_s, wanted))
+
+
+def _record(video_id: str, runs: List[TrackedVideo], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Journals the final state in every run that uploaded video_id."""
+    entry: Dict[str, Any] = {}
+    status = fields.get("processing_status") or fields.get("upload_status")
+    ok = status in ("succeeded", "processed")
+    reason = f" ({fields['failure_reason']})" if fields.get("failure_reason") else ""
+    for video in runs:
+        entry = append_entry(video.run_dir, {"platform": "youtube", "event": "processing", "video_id": video_id, **fields})
+        event("processing", f"{'✅' if ok else '❌'} {video.run_dir.name}: {video_id} {status}{reason}",
+              level=logging.INFO if ok else logging.WARNING,
+              run_id=video.run_dir.name, platform="youtube", video_id=video_id,
+              outcome="ok" if ok else "error", processing_status=status)
+    return entry
+
+
+def track_processing(
+    videos: List[TrackedVideo],
+    fetch: Fetch,
+    *,
+    timeout_s: float = DEFAULT_TIMEOUT_S,
+    min_poll_s: float = DEFAULT_MIN_POLL_S,
+    max_poll_s: float = DEFAULT_MAX_POLL_S,
+    sleep: Callable[[float], None] = time.sleep,
+) -> TrackResult:
+    """
+    Polls until every video reached a final state (journaled as it does) or timeout_s
+    elapsed. timeout_s = 0 checks once. fetch is adapters.youtube.processing_details.
+    """
+    result = TrackResult()
+    pending: Dict[str, List[TrackedVideo]] = defaultdict(list)  # video_id -> runs that uploaded it
+    for v in videos:
+        pending[v.video_id].append(v)
+    missing: Dict[str, int] = {}
+    deadline = time.monotonic() + timeout_s
+    interval = min_poll_s
+
+    while pending:
+        hints: List[float] = []
+        result.calls += -(-len(pending) // IDS_PER_CALL)
+        try:
+            items = fetch(list(pending))
+        except (HttpError, OSError) as e:
+            result.errors += 1
+            event("processing", f"⚠️ videos.list failed ({e}); retrying", level=logging.WARNING,
+                  outcome="error", error=str(e))
+        else:
+            for video_id, runs in list(pending.items()):
+                item = items.get(video_id)
+                if item is None:
+                    missing[video_id] = missing.get(video_id, 0) + 1
+                    if missing[video_id] >= MISSING_POLLS:
+                        result.final[video_id] = _record(video_id, runs, {"processing_status": "not_found"})
+                        del pending[video_id]
+                    continue
+                missing.pop(video_id, None)
+                fields = final_entry(item)
+                if fields is not None:
+                    result.final[video_id] = _record(video_id, runs, fields)
+                    del pending[video_id]
+                else:
+                    left = time_left_s(item)
+                    if left is not None:
+                        hints.append(left)
+
+        if not pending:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        interval = next_interval(interval, hints, min_poll_s, max_poll_s)
+        event("processing", f"⏳ {len(pending)} video(s) still processing; next check in {interval:.1f}s",
+              pending=len(pending), next_poll_s=round(interval, 1))
+        sleep(min(interval, remaining))
+
+    result.pending = list(pending)
+    return result
+
+
+def run_processing_status(
+    run_dirs: List[Path],
+    *,
+    timeout_s: float = DEFAULT_TIMEOUT_S,
+    min_poll_s: float = DEFAULT_MIN_POLL_S,
+    max_poll_s: float = DEFAULT_MAX_POLL_S,
+    fetch: Optional[Fetch] = None,
+) -> TrackResult:
+    """--yt-status: tracks every pending upload of run_dirs and prints a summary."""
+    videos = pending_videos(run_dirs)
+    if not videos:
+        event("processing", "No YouTube upload waiting for a processing result.", outcome="skipped")
+        return TrackResult()
+
+    event("processing", f"=== YOUTUBE PROCESSING: {len({v.video_id for v in videos})} video(s) in {len({v.run_dir for v in videos})} run(s) ===",
+          videos=len({v.video_id for v in videos}))
+    result = track_processing(videos, fetch or processing_details, timeout_s=timeout_s, min_poll_s=min_poll_s, max_poll_s=max_poll_s)
+
+    counts: Dict[str, int] = {}
+    for entry in result.final.values():
+        key = entry.get("processing_status") or entry.get("upload_status") or "?"
+        counts[key] = counts.get(key, 0) + 1
+    if result.pending:
+        counts["processing"] = len(result.pending)
+    failed = f", {result.errors} failed and retried" if result.errors else ""
+    event("processing", f"\nProcessing: {', '.join(f'{n} {k}' for k, n in sorted(counts.items()))} "
+          f"({result.calls} videos.list call(s){failed})", calls=result.calls, errors=result.errors, outcome="done", **counts)
+    return result
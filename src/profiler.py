@@ -0,0 +1,158 @@
+# src/profiler.py
+"""
+--profile: cProfile + tracemalloc per pipeline stage.
+
+Stages are the outermost tracing spans of the main thread (load_metadata_yaml,
+generate_package, raise_if_invalid, derive_editorial, write_outboxes, <platform>.run...),
+so profiling needs no extra instrumentation. cProfile cannot nest, hence outermost only;
+nested spans are part of their stage's profile.
+
+Results are buffered until write(run_dir), which creates:
+    <run>/profile/NN_<stage>.pstats      (python -m pstats, snakeviz...)
+    <run>/profile/allocations.txt        peak + top-N allocation sites per stage
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import tracing
+
+PROFILE_DIR_NAME = "profile"
+DEFAULT_TOP_N = 10
+
+_ALLOC_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracing.__file__),
+)
+
+
+@dataclass
+class StageProfile:
+    name: str
+    wall_ms: float
+    peak_bytes: int  # peak traced memory above the stage's starting point
+    stats: pstats.Stats
+    top_allocs: List[str] = field(default_factory=list)
+
+    def hotspot(self) -> Tuple[str, float]:
+        """(function, own time ms) with the highest own time in this stage."""
+        best, best_tt = "-", 0.0
+        for (filename, line, func), (_, _, tt, _, _) in self.stats.stats.items():
+            if tt > best_tt:
+                best, best_tt = f"{os.path.basename(filename)}:{line}({func})", tt
+        return best, best_tt * 1000
+
+
+class Profiler:
+    """tracing span hook: one cProfile + tracemalloc window per outermost span."""
+
+    def __init__(self, top_n: int = DEFAULT_TOP_N):
+        self.top_n = top_n
+        self.stages: List[StageProfile] = []
+        self._open: Optional[Tuple[cProfile.Profile, float, int, tracemalloc.Snapshot]] = None
+
+    def _active(self, depth: int) -> bool:
+        return depth == 1 and threading.current_thread() is threading.main_thread()
+
+    def enter(self, name: str, depth: int) -> None:
+        if not self._active(depth):
+            return
+        before = tracemalloc.take_snapshot().filter_traces(_ALLOC_FILTERS)
+        tracemalloc.reset_peak()
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        prof = cProfile.Profile()
+        self._open = (prof, time.perf_counter(), start_bytes, before)
+        prof.enable()
+
+    def exit(self, name: str, depth: int) -> None:
+        if not self._active(depth) or self._open is None:
+            return
+        prof, t0, start_bytes, before = self._open
+        prof.disable()
+        wall_ms = (time.perf_counter() - t0) * 1000
+        self._open = None
+
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(_ALLOC_FILTERS)
+        top = [str(d) for d in after.compare_to(before, "lineno")[: self.top_n] if d.size_diff > 0]
+        stats = pstats.Stats(prof, stream=io.StringIO())
+        self.stages.append(StageProfile(name, wall_ms, max(0, peak - start_bytes), stats, top))
+
+
+_profiler: Optional[Profiler] = None
+
+
+def enable(top_n: int = DEFAULT_TOP_N) -> None:
+    """Turns on tracing (stages are its spans) and profiles every outermost span."""
+    global _profiler
+    if _profiler is not None:
+        return
+    tracing.enable()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _profiler = Profiler(top_n)
+    tracing.set_span_hook(_profiler)
+
+
+def is_enabled() -> bool:
+    return _profiler is not None
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "stage"
+
+
+def write(run_dir: str | Path) -> Optional[Path]:
+    """
+    Writes the buffered stage profiles to <run_dir>/profile/ and prints the hotspot table.
+    Returns the folder, or None when profiling is off or nothing was recorded.
+    """
+    if _profiler is None or not _profiler.stages:
+        return None
+    stages, _profiler.stages = _profiler.stages, []
+
+    out = Path(run_dir) / PROFILE_DIR_NAME
+    out.mkdir(parents=True, exist_ok=True)
+    start = len(list(out.glob("*.pstats")))  # replays of the same run append
+
+    lines = []
+    for i, st in enumerate(stages, start + 1):
+        st.stats.dump_stats(str(out / f"{i:02d}_{_slug(st.name)}.pstats"))
+        lines.append(f"[{i:02d}] {st.name}: {st.wall_ms:.1f} ms, peak {st.peak_bytes / 1024:.1f} KiB")
+        lines.extend(f"    {a}" for a in st.top_allocs or ["(no new allocations)"])
+        lines.append("")
+    with (out / "allocations.txt").open("a", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+    print_hotspots(stages, _profiler.top_n)
+    print(f"Profile written: {out}")
+    return out
+
+
+def print_hotspots(stages: List[StageProfile], top_n: int = DEFAULT_TOP_N) -> None:
+    print(f"\n{'stage':<24} {'wall ms':>9} {'peak KiB':>9}  top function (own ms)")
+    for st in stages:
+        func, ms = st.hotspot()
+        print(f"{st.name:<24} {st.wall_ms:9.1f} {st.peak_bytes / 1024:9.1f}  {func} ({ms:.1f})")
+
+    combined = pstats.Stats(stream=io.StringIO())
+    for st in stages:
+        combined.add(st.stats)
+    rows = sorted(combined.stats.items(), key=lambda kv: kv[1][2], reverse=True)[:top_n]
+    print(f"\nTop {len(rows)} functions by own time (all stages):")
+    for (filename, line, func), (_, nc, tt, ct, _) in rows:
+        print(f"  {tt * 1000:8.1f} ms own {ct * 1000:8.1f} ms cum {nc:>8} calls  {os.path.basename(filename)}:{line}({func})")
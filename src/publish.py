@@ -1,8 +1,113 @@
+import logging
+import time
+from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Optional, Dict, Any
+from zoneinfo import ZoneInfo
+from typing import Any, Callable, Dict, Optional
 
 from adapters import youtube, reddit, instagram
+from eventlog import event
+from journal import append_entry, completed_platforms, prestaged_video_id
 from outbox.reddit_outbox import generate_reddit_outbox
+from scheduling.estimate import print_dispatch_estimate, upload_concurrency
+from tracing import span
+
+
+ADAPTERS = (
+    ("youtube", youtube),
+    ("reddit", reddit),
+    ("instagram", instagram),
+)
+
+
+def _file_size(package_dir: Path, rel: Any) -> int:
+    if not isinstance(rel, str) or not rel:
+        return 0
+    p = Path(package_dir) / rel
+    return p.stat().st_size if p.exists() else 0
+
+
+def _upload_bytes(key: str, package: Dict[str, Any], package_dir: Path) -> int:
+    """Bytes a real run of this adapter sends (media files it uploads)."""
+    media = package.get("media", {}) or {}
+    if key == "youtube":
+        return _file_size(package_dir, media.get("video")) + _file_size(package_dir, media.get("thumbnail"))
+    if key == "reddit":
+        cfg = package.get("platforms", {}).get("reddit", {})
+        if cfg.get("type", "video") == "video":
+            return _file_size(package_dir, media.get("video"))
+    return 0
+
+
+def _result_fields(key: str, result: Any) -> Dict[str, Any]:
+    """Normalize adapter return values (youtube: video id, reddit: permalink) for the journal."""
+    if not result:
+        return {}
+    if key == "youtube":
+        return {"video_id": result, "permalink": f"https://youtu.be/{result}"}
+    if key == "reddit":
+        return {"permalink": result}
+    return {}
+
+
+def _log_result(entry: Dict[str, Any], level: int = logging.INFO) -> None:
+    """The journal result as a file-only event (stage = action; bytes_sent -> bytes)."""
+    fields = {k: v for k, v in entry.items() if k not in ("event", "action", "bytes_sent")}
+    event(entry["action"], bytes=entry.get("bytes_sent"), level=level, **fields)
+
+
+def _run_journaled(
+    key: str,
+    call: Callable[[], Any],
+    package_dir: Path,
+    dry_run: bool,
+    *,
+    action: str = "publish",
+    upload_bytes: int = 0,
+) -> Any:
+    """Run one adapter call, recording attempt + result (action: publish | prestage)."""
+    append_entry(package_dir, {"platform": key, "event": "attempt", "action": action, "dry_run": dry_run})
+
+    t0 = time.monotonic()
+    try:
+        with span(f"{key}.{'run' if action == 'publish' else action}", platform=key, dry_run=dry_run) as sp:
+            result = call()
+            bytes_sent = 0 if dry_run else upload_bytes
+            sp["bytes"] = bytes_sent
+    except Exception as e:
+        entry = {
+            "platform": key,
+            "event": "result",
+            "action": action,
+            "outcome": "error",
+            "dry_run": dry_run,
+            "duration_ms": int((time.monotonic() - t0) * 1000),
+            "error": f"{type(e).__name__}: {e}",
+        }
+        append_entry(package_dir, entry)
+        _log_result(entry, level=logging.ERROR)
+        raise
+
+    # A real run that returns nothing posted nothing (e.g. Instagram, posted by hand from
+    # the outbox): journaled as skipped so it never counts as published.
+    posted = dry_run or result is not None
+    entry = {
+        "platform": key,
+        "event": "result",
+        "action": action,
+        "outcome": "ok" if posted else "skipped",
+        "dry_run": dry_run,
+        "duration_ms": int((time.monotonic() - t0) * 1000),
+        "bytes_sent": bytes_sent if posted else 0,
+        **_result_fields(key, result),
+    }
+    append_entry(package_dir, entry)
+    _log_result(entry)
+    if not posted:
+        event("dispatch", f"[{key.upper()}] nothing was posted: journaled as skipped (post it manually from the outbox).",
+              platform=key, outcome="skipped")
+    return result
 
 
 def dispatch(
@@ -14,15 +119,18 @@ def dispatch(
     """
     Dispatch to enabled adapters.
     package_dir is the folder that contains post_package.json (used to resolve media paths).
+    Every adapter attempt is recorded in <package_dir>/journal.jsonl; platforms that already
+    completed a real run are skipped, so a replay only retries what is missing.
     """
 
     platforms = package.get("platforms", {})
     if not isinstance(platforms, dict):
         raise ValueError("package.platforms must be a dict")
 
-    # Generate Reddit outbox if reddit is enabled (recommended behavior)
+    # The Reddit outbox is rendered with the other outboxes at generation time; replays
+    # reuse it. Only runs that never got one have it rendered here.
     reddit_enabled = bool(platforms.get("reddit", {}).get("enabled", False))
-    if reddit_enabled:
+    if reddit_enabled and not (Path(package_dir) / "outbox" / "reddit.md").exists():
         generate_reddit_outbox(package, package_dir)
 
     def should_run(key: str) -> bool:
@@ -31,11 +139,73 @@ def dispatch(
         cfg = platforms.get(key, {})
         return isinstance(cfg, dict) and cfg.get("enabled") is True
 
-    if should_run("youtube"):
-        youtube.run(package, package_dir=package_dir, dry_run=dry_run)
+    pkg_dir = Path(package_dir)
+
+    # Dry-runs never publish, so they always run in full.
+    done = set() if dry_run else completed_platforms(pkg_dir)
+
+    # Pre-staged YouTube upload: only the visibility flip is left to do.
+    prestaged = prestaged_video_id(pkg_dir) if should_run("youtube") else None
+
+    def upload_bytes(key: str) -> int:
+        return 0 if (key == "youtube" and prestaged) else _upload_bytes(key, package, pkg_dir)
+
+    # Dry-run: estimate whether the uploads fit inside the locked window.
+    window_key = (package.get("schedule") or {}).get("window")
+    if dry_run and window_key:
+        uploads = [(key, upload_bytes(key)) for key, _ in ADAPTERS if should_run(key)]
+        if uploads:
+            print_dispatch_estimate(
+                window_key,
+                uploads,
+                out_root=pkg_dir.parent,
+                now=datetime.now(ZoneInfo("America/New_York")),
+                concurrency=upload_concurrency(),
+            )
+
+    for key, adapter in ADAPTERS:
+        if not should_run(key):
+            continue
+        if key in done:
+            event("dispatch", f"\n[{key.upper()}] already published in this run (journal). Skipped.",
+                  platform=key, outcome="skipped")
+            continue
+
+        if key == "youtube" and prestaged:
+            call = partial(youtube.publish_prestaged, package, prestaged, dry_run=dry_run)
+        else:
+            call = partial(adapter.run, package, package_dir=pkg_dir, dry_run=dry_run)
+        _run_journaled(key, call, pkg_dir, dry_run, upload_bytes=upload_bytes(key))
+
+
+def prestage(package: Dict[str, Any], package_dir: Path, dry_run: bool = True) -> Optional[str]:
+    """
+    Upload the YouTube video ahead of its window as 'private' (with playlist + thumbnail)
+    and journal the video id. dispatch() then only flips privacyStatus at window time.
+    """
+    pkg_dir = Path(package_dir)
+    cfg = package.get("platforms", {}).get("youtube", {})
+    if not (isinstance(cfg, dict) and cfg.get("enabled") is True):
+        event("prestage", "\n[YOUTUBE] Not enabled in this package. Nothing to pre-stage.",
+              platform="youtube", outcome="skipped")
+        return None
+
+    if "youtube" in completed_platforms(pkg_dir):
+        event("prestage", "\n[YOUTUBE] already published in this run (journal). Nothing to pre-stage.",
+              platform="youtube", outcome="skipped")
+        return None
 
-    if should_run("reddit"):
-        reddit.run(package, package_dir=package_dir, dry_run=dry_run)
+    existing = prestaged_video_id(pkg_dir)
+    if existing:
+        event("prestage", f"\n[YOUTUBE] already pre-staged as {existing} (journal). Skipped.",
+              platform="youtube", outcome="skipped", video_id=existing)
+        return existing
 
-    if should_run("instagram"):
-        instagram.run(package, package_dir=package_dir, dry_run=dry_run)
+    return _run_journaled(
+        "youtube",
+        partial(youtube.run, package, package_dir=pkg_dir, dry_run=dry_run, visibility_override="private"),
+        pkg_dir,
+        dry_run,
+        action="prestage",
+        upload_bytes=_upload_bytes("youtube", package, pkg_dir),
+    )
@@ -0,0 +1,272 @@
+# src/retention.py
+"""
+Retention / garbage collection for data/out run folders.
+
+Policy, applied per episode (post_package.json "id"):
+  - runs with a real publish or a pending pre-staged upload are always kept;
+  - of the other (dry) runs, the newest keep_dry_runs are kept, and the newest one
+    is never removed (it is what the daemon would dispatch);
+  - with a disk budget, further dry runs are removed oldest first until the
+    run folders fit.
+Folders without a post_package.json (interrupted generations) are removed once they
+are older than INCOMPLETE_MIN_AGE_S.
+
+Disk usage is counted per inode: a media file hardlinked into several runs is one
+blob, and its bytes are only reclaimed when every link to it goes away. The preview
+shows the planned estimate; with --confirm the reported total is measured while
+deleting (files re-stat'ed just before their run is removed).
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from journal import JOURNAL_NAME, completed_platforms, read_entries
+from runs import PACKAGE_NAME
+from tracing import span
+
+DEFAULT_KEEP_DRY_RUNS = 3
+
+# A folder without a package may still be generating.
+INCOMPLETE_MIN_AGE_S = 3600
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+Inode = Tuple[int, int]  # (st_dev, st_ino)
+
+
+@dataclass
+class RunInfo:
+    run_id: str
+    path: Path
+    episode_id: Optional[str]  # None: no readable post_package.json
+    published: bool
+    prestaged: bool
+    mtime: float
+    files: List[Tuple[Inode, int, int]] = field(default_factory=list)  # (inode, size, nlink)
+
+    @property
+    def keep_always(self) -> bool:
+        return self.published or self.prestaged
+
+
+@dataclass
+class GcPlan:
+    runs: List[RunInfo]
+    delete: Dict[str, str]  # run_id -> reason
+    total_bytes: int        # unique blobs across all run folders
+    reclaim_bytes: int
+    max_bytes: Optional[int]
+
+    @property
+    def budget_met(self) -> bool:
+        return self.max_bytes is None or self.total_bytes - self.reclaim_bytes <= self.max_bytes
+
+
+def parse_size(text: str) -> int:
+    """'20G', '500MB', '1.5GiB', '1048576' -> bytes (binary units)."""
+    m = _SIZE_RE.match(text or "")
+    if not m:
+        raise ValueError(f"Invalid size: {text!r} (expected e.g. 500M, 20G)")
+    return int(float(m.group(1)) * _UNITS[m.group(2).lower()])
+
+
+def format_size(n: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def _scan_files(path: str, out: List[Tuple[Inode, int, int]]) -> None:
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                _scan_files(entry.path, out)
+            elif entry.is_file(follow_symlinks=False):
+                st = entry.stat(follow_symlinks=False)
+                out.append(((st.st_dev, st.st_ino), st.st_size, st.st_nlink))
+
+
+def _episode_id(run_dir: Path) -> Optional[str]:
+    try:
+        package = json.loads((run_dir / PACKAGE_NAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return str(package.get("id") or f"package_{run_dir.name}") if isinstance(package, dict) else None
+
+
+def _journal_state(run_dir: Path) -> Tuple[bool, bool]:
+    """(published, prestaged) from one pass over the run journal."""
+    if not (run_dir / JOURNAL_NAME).exists():
+        return False, False
+    published = prestaged = False
+    for e in read_entries(run_dir):
+        if e.get("event") == "result" and e.get("outcome") == "ok" and e.get("dry_run") is False:
+            if e.get("action", "publish") == "publish":
+                published = True
+            elif e.get("action") == "prestage":
+                prestaged = True
+    return published, prestaged
+
+
+def scan_runs(out_root: Path) -> List[RunInfo]:
+    """Every run folder under out_root (oldest first), with its files' inodes."""
+    runs: List[RunInfo] = []
+    if not out_root.exists():
+        return runs
+    with span("gc.scan") as sp, os.scandir(out_root) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False) or entry.name.startswith(("_", ".")):
+                continue
+            run_dir = Path(entry.path)
+            published, prestaged = _journal_state(run_dir)
+            info = RunInfo(
+                run_id=entry.name,
+                path=run_dir,
+                episode_id=_episode_id(run_dir),
+                published=published,
+                prestaged=prestaged,
+                mtime=entry.stat(follow_symlinks=False).st_mtime,
+            )
+            _scan_files(entry.path, info.files)
+            runs.append(info)
+        runs.sort(key=lambda r: r.run_id)
+        sp["runs"] = len(runs)
+        sp["files"] = sum(len(r.files) for r in runs)
+    return runs
+
+
+def plan_gc(
+    runs: List[RunInfo],
+    *,
+    keep_dry_runs: int = DEFAULT_KEEP_DRY_RUNS,
+    max_bytes: Optional[int] = None,
+    now: Optional[float] = None,
+) -> GcPlan:
+    now = time.time() if now is None else now
+    keep_dry_runs = max(1, keep_dry_runs)
+
+    sizes: Dict[Inode, int] = {}
+    nlinks: Dict[Inode, int] = {}
+    for r in runs:
+        for ino, size, nlink in r.files:
+            sizes[ino] = size
+            nlinks[ino] = nlink
+    total = sum(sizes.values())
+
+    delete: Dict[str, str] = {}
+    linked: Dict[Inode, int] = defaultdict(int)  # links inside the runs planned for deletion
+    reclaim = 0
+
+    def drop(r: RunInfo, reason: str) -> None:
+        nonlocal reclaim
+        delete[r.run_id] = reason
+        for ino, _, _ in r.files:
+            linked[ino] += 1
+            if linked[ino] == nlinks[ino]:  # last link to this blob
+                reclaim += sizes[ino]
+
+    by_episode: Dict[str, List[RunInfo]] = defaultdict(list)
+    for r in runs:
+        if r.episode_id is None:
+            if not r.keep_always and now - r.mtime >= INCOMPLETE_MIN_AGE_S:
+                drop(r, "incomplete")
+        elif not r.keep_always:
+            by_episode[r.episode_id].append(r)
+
+    spare: List[RunInfo] = []  # kept by count only: removable under the disk budget
+    for dry in by_episode.values():
+        # runs are sorted oldest first
+        for r in dry[:-keep_dry_runs]:
+            drop(r, f"dry run beyond the newest {keep_dry_runs}")
+        spare.extend(dry[-keep_dry_runs:-1])
+
+    if max_bytes is not None:
+        for r in sorted(spare, key=lambda r: r.run_id):
+            if total - reclaim <= max_bytes:
+                break
+            drop(r, "disk budget")
+
+    return GcPlan(runs=runs, delete=delete, total_bytes=total, reclaim_bytes=reclaim, max_bytes=max_bytes)
+
+
+def apply_gc(plan: GcPlan) -> Tuple[int, int]:
+    """
+    Deletes the planned runs. Returns (runs removed, bytes reclaimed). Bytes count only
+    inodes whose link count dropped to zero: each run's files are re-stat'ed right before
+    it is removed, so links made or dropped since the scan are accounted for.
+    """
+    removed = reclaimed = 0
+    with span("gc.apply") as sp:
+        for r in plan.runs:
+            if r.run_id not in plan.delete:
+                continue
+            # A dispatch may have finished since the scan: never drop a published run.
+            if completed_platforms(r.path):
+                print(f" - {r.run_id}: published since the scan, kept")
+                continue
+            files: List[Tuple[Inode, int, int]] = []
+            try:
+                _scan_files(str(r.path), files)
+            except FileNotFoundError:
+                continue
+            shutil.rmtree(r.path, ignore_errors=True)
+            if r.path.exists():
+                continue  # partly removed: its blobs are not counted
+            removed += 1
+            links: Dict[Inode, int] = defaultdict(int)  # links to each blob inside this run
+            blobs: Dict[Inode, Tuple[int, int]] = {}     # inode -> (size, nlink before removal)
+            for ino, size, nlink in files:
+                links[ino] += 1
+                blobs[ino] = (size, nlink)
+            for ino, (size, nlink) in blobs.items():
+                if nlink <= links[ino]:  # every remaining link was inside this run
+                    reclaimed += size
+        sp["removed"] = removed
+        sp["reclaimed"] = reclaimed
+    return removed, reclaimed
+
+
+def run_gc(out_root: Path, *, keep_dry_runs: int, max_bytes: Optional[int], confirm: bool) -> GcPlan:
+    """--gc: prints the plan; deletes only with confirm."""
+    t0 = time.perf_counter()
+    runs = scan_runs(out_root)
+    plan = plan_gc(runs, keep_dry_runs=keep_dry_runs, max_bytes=max_bytes)
+    ms = (time.perf_counter() - t0) * 1000
+
+    kept_published = sum(1 for r in runs if r.keep_always)
+    print(f"Runs: {len(runs)} scanned in {ms:.0f} ms, {kept_published} published/pre-staged (kept), "
+          f"{format_size(plan.total_bytes)} on disk")
+    budget = f" (budget {format_size(max_bytes)})" if max_bytes is not None else ""
+    print(f"Policy: keep the newest {max(1, keep_dry_runs)} dry run(s) per episode{budget}")
+
+    if not plan.delete:
+        print("Nothing to collect.")
+    else:
+        print(f"{'Would remove' if not confirm else 'Removing'} {len(plan.delete)} run(s):")
+        for r in runs:
+            if r.run_id in plan.delete:
+                print(f" - {r.run_id}  {r.episode_id or '-':<12} {plan.delete[r.run_id]}")
+
+    if confirm and plan.delete:
+        removed, reclaimed = apply_gc(plan)
+        print(f"Removed {removed}/{len(plan.delete)} run(s); bytes reclaimed: {format_size(reclaimed)}")
+    else:
+        print(f"Bytes reclaimable: {format_size(plan.reclaim_bytes)}")
+    if not plan.budget_met:
+        left = plan.total_bytes - plan.reclaim_bytes
+        print(f"⚠️ Budget not met: {format_size(left)} left after removing every eligible dry run.")
+
+    if not confirm and plan.delete:
+        print("(preview only: add --confirm to delete)")
+    return plan
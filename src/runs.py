@@ -0,0 +1,168 @@
+# src/runs.py
+from __future__ import annotations
+
+import fnmatch
+import json
+import re
+import secrets
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from journal import completed_platforms
+
+PACKAGE_NAME = "post_package.json"
+
+# Working folder of --watch: rebuilt in place, never treated as a run to dispatch.
+WATCH_RUN_ID = "_watch"
+
+# Attempts before create_run_dir gives up (a collision needs same ms + same random suffix).
+CREATE_ATTEMPTS = 16
+
+_last_id = ""
+_id_lock = threading.Lock()
+
+
+def new_run_id(now: datetime | None = None) -> str:
+    """
+    Sortable, unique run id: YYYYMMDD_HHMMSS_<ms><4 hex>, e.g. 20260314_091502_0427f3c.
+    The time prefix keeps ids in creation order (and sorted after older second-only ids);
+    the random suffix separates processes; within one process ids strictly increase.
+    """
+    global _last_id
+    now = now or datetime.now()
+    with _id_lock:
+        run_id = f"{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}{secrets.token_hex(2)}"
+        if run_id <= _last_id:
+            # Same millisecond in this process (or clock went back): stay monotonic.
+            prefix, suffix = _last_id.rsplit("_", 1)
+            run_id = f"{prefix}_{int(suffix, 16) + 1:0{len(suffix)}x}"
+        _last_id = run_id
+    return run_id
+
+
+def create_run_dir(out_root: Path) -> Path:
+    """
+    Creates data/out/<new run id> exclusively (mkdir fails if it exists), so two
+    concurrent generations can never share a folder.
+    """
+    out_root.mkdir(parents=True, exist_ok=True)
+    for _ in range(CREATE_ATTEMPTS):
+        run_out = out_root / new_run_id()
+        try:
+            run_out.mkdir()
+            return run_out
+        except FileExistsError:
+            continue
+    raise RuntimeError(f"Could not create a unique run folder in {out_root}")
+
+
+def iter_run_dirs(out_root: Path) -> List[Path]:
+    """
+    Run folders under data/out that contain a post_package.json, oldest first.
+    Folders starting with "_" (e.g. the --watch working folder) are not runs.
+    """
+    if not out_root.exists():
+        return []
+    runs = [
+        p for p in out_root.iterdir()
+        if p.is_dir() and not p.name.startswith("_") and (p / PACKAGE_NAME).exists()
+    ]
+    return sorted(runs, key=lambda p: p.name)
+
+
+def load_package(run_dir: Path) -> Dict[str, Any]:
+    return json.loads((run_dir / PACKAGE_NAME).read_text(encoding="utf-8"))
+
+
+def since_prefix(since: str) -> str:
+    """
+    --since value -> run id prefix it compares against: "2026-03-14" -> "20260314",
+    "2026-03-14 09:15" -> "20260314_0915"; a run id (prefix) is used as is.
+    """
+    s = since.strip()
+    m = re.fullmatch(r"(\d{4})-?(\d{2})-?(\d{2})(?:[T _](\d{2}):?(\d{2})(?::?(\d{2}))?)?", s)
+    if not m:
+        return s
+    date = "".join(m.group(1, 2, 3))
+    time = "".join(g for g in m.group(4, 5, 6) if g)
+    return f"{date}_{time}" if time else date
+
+
+def select_runs(out_root: Path, patterns: Sequence[str], since: Optional[str] = None) -> Tuple[List[Path], List[str]]:
+    """
+    Run folders matching any of patterns (exact run ids or globs like "202603*") and,
+    with since, created at or after it (run ids sort by creation time). No patterns
+    with since selects every run since. Returns (runs oldest first, patterns that matched nothing).
+    """
+    runs = iter_run_dirs(out_root)
+    if patterns:
+        selected: Dict[str, Path] = {}
+        missing = []
+        for pattern in patterns:
+            hits = [p for p in runs if fnmatch.fnmatchcase(p.name, pattern)]
+            if not hits:
+                missing.append(pattern)
+            selected.update((p.name, p) for p in hits)
+        runs = sorted(selected.values(), key=lambda p: p.name)
+    else:
+        missing = []
+    if since:
+        prefix = since_prefix(since)
+        runs = [p for p in runs if p.name >= prefix]
+    return runs, missing
+
+
+def episode_id(package: Dict[str, Any], run_dir: Path) -> str:
+    """Episode a run belongs to: post_package.json "id", else the run id."""
+    return str(package.get("id") or run_dir.name)
+
+
+def dispatch_candidates(runs: Iterable[Tuple[Path, str, bool]]) -> Dict[str, Path]:
+    """
+    episode id -> the one run folder that may be dispatched for it, from (run_dir,
+    episode id, has a real publish) given oldest first: the newest run with a real
+    publish in its journal, else the newest run. An episode published from an older
+    folder is never uploaded again from a newer dry-run folder.
+    """
+    newest: Dict[str, Path] = {}
+    published: Dict[str, Path] = {}
+    for run_dir, episode, done in runs:  # oldest first: later runs win
+        newest[episode] = run_dir
+        if done:
+            published[episode] = run_dir
+    return {**newest, **published}
+
+
+def one_run_per_episode(out_root: Path, selected: Sequence[Path]) -> Tuple[List[Path], Dict[str, Path]]:
+    """
+    Reduces a replay selection to one run per episode with the dispatch_candidates()
+    rule. Runs with a real publish count even when not selected, so a selection never
+    re-uploads an episode that was published from another folder. Unreadable packages
+    stay selected (replay reports them). Returns (runs to replay oldest first,
+    superseded run id -> run that replaces it).
+    """
+    chosen = {p.name for p in selected}
+    infos: List[Tuple[Path, str, bool]] = []
+    unreadable: List[Path] = []
+    for run_dir in iter_run_dirs(out_root):
+        try:
+            episode = episode_id(load_package(run_dir), run_dir)
+        except (OSError, ValueError):
+            if run_dir.name in chosen:
+                unreadable.append(run_dir)
+            continue
+        done = bool(completed_platforms(run_dir))
+        if run_dir.name in chosen or done:
+            infos.append((run_dir, episode, done))
+
+    episodes = {episode for run_dir, episode, _ in infos if run_dir.name in chosen}
+    winners = dispatch_candidates(info for info in infos if info[1] in episodes)
+    keep = sorted({*winners.values(), *unreadable}, key=lambda p: p.name)
+    superseded = {
+        run_dir.name: winners[episode]
+        for run_dir, episode, _ in infos
+        if run_dir.name in chosen and winners[episode] != run_dir
+    }
+    return keep, superseded
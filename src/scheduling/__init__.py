@@ -1,31 +1,74 @@
 # src/scheduling/__init__.py
 
-from datetime import datetime
-from scheduling.calendar import is_correct_week
-from scheduling.windows import is_within_locked_window
+from datetime import datetime, timezone
+from typing import Optional
 
+from scheduling.calendar import is_correct_week, week_start
+from scheduling.planner import effective_week_id
+from scheduling.windows import WindowsConfigError, is_within_locked_window, window_in_week, window_now
 
-def can_dispatch(job_window_key: str, meta: dict, now: datetime) -> bool:
+
+def can_dispatch(job_window_key: str, meta: dict, now: datetime, schedule: Optional[dict] = None) -> bool:
     """
     Central Phase 10 guardrail.
     Returns True only if:
     - package_ready == True
-    - correct ISO week
+    - correct ISO week (the planned week from schedule.json when present, else release.week_id),
+      taken in the window's own timezone
     - within locked time window
+    A malformed windows file raises WindowsConfigError instead of blocking every job silently.
     """
     try:
         release = meta.get("release", {})
         if release.get("package_ready") is not True:
             return False
 
-        week_id = release.get("week_id")
-        if not is_correct_week(week_id, now):
+        week_id = effective_week_id(meta, schedule)
+        if not is_correct_week(week_id, window_now(job_window_key, now)):
             return False
 
         if not is_within_locked_window(job_window_key, now):
             return False
 
         return True
+    except WindowsConfigError:
+        raise
     except Exception:
         # Phase 10 must NEVER crash the pipeline
         return False
+
+
+def next_dispatch_time(
+    job_window_key: str,
+    meta: dict,
+    now: datetime,
+    schedule: Optional[dict] = None,
+) -> Optional[datetime]:
+    """
+    Earliest moment (UTC) at which can_dispatch() can become True for this job:
+    the opening of the window inside its (planned) week, or 'now' if that window is open.
+    None if the job is not ready, the week is invalid or the window already closed.
+    """
+    try:
+        release = meta.get("release", {})
+        if release.get("package_ready") is not True:
+            return None
+
+        monday = week_start(effective_week_id(meta, schedule))
+        if monday is None:
+            return None
+
+        bounds = window_in_week(job_window_key, monday)
+        if bounds is None:
+            return None
+
+        # Compare in UTC: same-tzinfo arithmetic ignores DST offset changes.
+        opens_at, closes_at = (b.astimezone(timezone.utc) for b in bounds)
+        now_utc = now.astimezone(timezone.utc)
+        if closes_at < now_utc:
+            return None
+        return max(opens_at, now_utc)
+    except WindowsConfigError:
+        raise
+    except Exception:
+        return None
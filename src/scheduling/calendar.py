@@ -1,6 +1,7 @@
 # src/scheduling/calendar.py
 
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 import re
 
 WEEK_RE = re.compile(r"^\d{4}-W\d{2}$")
@@ -23,3 +24,21 @@ def is_correct_week(release_week_id: str, now: datetime) -> bool:
         return release_week_id == current
     except Exception:
         return False
+
+
+def week_start(release_week_id: str) -> Optional[date]:
+    """
+    Monday of the ISO week 'YYYY-Www'.
+    Silent failure (returns None) on any invalid input.
+    """
+    if not release_week_id or not isinstance(release_week_id, str):
+        return None
+
+    if not WEEK_RE.match(release_week_id):
+        return None
+
+    try:
+        year, week = release_week_id.split("-W")
+        return date.fromisocalendar(int(year), int(week), 1)
+    except ValueError:
+        return None
@@ -0,0 +1,207 @@
+# src/scheduling/estimate.py
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from journal import read_entries
+from scheduling.windows import next_window
+
+# Used when nothing is configured and no real upload has been journaled yet.
+DEFAULT_UPLINK_MBPS = 10.0
+
+# Only the most recent uploads describe the current uplink.
+MEASURE_LAST_N = 20
+
+# Platforms blocked by the Phase 10 window check (Reddit is never blocked).
+WINDOW_GATED = ("youtube", "instagram")
+
+
+@dataclass
+class Bandwidth:
+    bytes_per_s: float
+    source: str  # configured | measured | default
+    samples: int = 0
+
+    @property
+    def mbps(self) -> float:
+        return self.bytes_per_s * 8 / 1_000_000
+
+
+@dataclass
+class UploadEstimate:
+    platform: str
+    bytes: int
+    seconds: float       # offset from dispatch start to upload completion
+    completes_at: datetime
+    in_window: bool
+
+
+def measured_bandwidth(out_root: Path, last_n: int = MEASURE_LAST_N) -> Optional[Bandwidth]:
+    """
+    Aggregate throughput (total bytes / total seconds) of the last N real uploads
+    recorded in data/out/*/journal.jsonl. None if no upload was ever journaled.
+    """
+    if not out_root.exists():
+        return None
+
+    samples: List[Tuple[str, int, int]] = []
+    for run_dir in out_root.iterdir():
+        if not run_dir.is_dir():
+            continue
+        for e in read_entries(run_dir):
+            if e.get("event") != "result" or e.get("outcome") != "ok" or e.get("dry_run") is not False:
+                continue
+            sent = e.get("bytes_sent") or 0
+            ms = e.get("duration_ms") or 0
+            if sent > 0 and ms > 0:
+                samples.append((str(e.get("ts", "")), int(sent), int(ms)))
+
+    if not samples:
+        return None
+
+    samples.sort(reverse=True)
+    recent = samples[:last_n]
+    total_bytes = sum(s[1] for s in recent)
+    total_s = sum(s[2] for s in recent) / 1000
+    return Bandwidth(bytes_per_s=total_bytes / total_s, source="measured", samples=len(recent))
+
+
+def resolve_bandwidth(out_root: Path) -> Bandwidth:
+    """UPLINK_MBPS (env) wins, then measured journal throughput, then DEFAULT_UPLINK_MBPS."""
+    configured = os.getenv("UPLINK_MBPS")
+    if configured:
+        try:
+            mbps = float(configured)
+        except ValueError:
+            mbps = 0.0
+        if mbps > 0:
+            return Bandwidth(bytes_per_s=mbps * 1_000_000 / 8, source="configured")
+
+    measured = measured_bandwidth(out_root)
+    if measured:
+        return measured
+
+    return Bandwidth(bytes_per_s=DEFAULT_UPLINK_MBPS * 1_000_000 / 8, source="default")
+
+
+def upload_concurrency() -> int:
+    """UPLOAD_CONCURRENCY (env); unset, empty or invalid means 1 (sequential dispatch)."""
+    configured = os.getenv("UPLOAD_CONCURRENCY")
+    if configured:
+        try:
+            return max(1, int(configured))
+        except ValueError:
+            pass
+    return 1
+
+
+def completion_offsets(uploads: List[Tuple[str, int]], bytes_per_s: float, concurrency: int = 1) -> Dict[str, float]:
+    """
+    Seconds from start until each upload finishes on a shared uplink.
+    Uploads start in order, at most `concurrency` at a time, and active uploads
+    split the bandwidth evenly (concurrency=1 is today's sequential dispatch).
+    """
+    concurrency = max(1, concurrency)
+    pending = [[name, float(size)] for name, size in uploads]
+    active: List[List] = []
+    done: Dict[str, float] = {}
+    t = 0.0
+
+    while pending or active:
+        while pending and len(active) < concurrency:
+            active.append(pending.pop(0))
+
+        share = bytes_per_s / len(active)
+        step = min(rem for _, rem in active) / share
+        t += step
+        for job in active:
+            job[1] -= step * share
+
+        still: List[List] = []
+        for job in active:
+            if job[1] <= 1e-6:
+                done[job[0]] = t
+            else:
+                still.append(job)
+        active = still
+
+    return done
+
+
+def estimate_dispatch(
+    window_key: str,
+    uploads: List[Tuple[str, int]],
+    now: datetime,
+    bandwidth: Bandwidth,
+    concurrency: int = 1,
+) -> Optional[Tuple[datetime, datetime, datetime, List[UploadEstimate]]]:
+    """
+    Estimate when each upload completes if dispatch starts at the window opening
+    (or now, when already inside the window).
+    Returns (start, opens_at, closes_at, estimates) or None if window_key is unknown.
+    """
+    bounds = next_window(window_key, now)
+    if bounds is None:
+        return None
+    opens_at, closes_at = bounds
+    tz = opens_at.tzinfo
+    now = now.replace(tzinfo=tz) if now.tzinfo is None else now.astimezone(tz)
+    start = max(opens_at, now)
+
+    offsets = completion_offsets(uploads, bandwidth.bytes_per_s, concurrency)
+    estimates: List[UploadEstimate] = []
+    for name, size in uploads:
+        completes_at = start + timedelta(seconds=offsets.get(name, 0.0))
+        estimates.append(UploadEstimate(
+            platform=name,
+            bytes=size,
+            seconds=offsets.get(name, 0.0),
+            completes_at=completes_at,
+            in_window=completes_at <= closes_at,
+        ))
+    return start, opens_at, closes_at, estimates
+
+
+def _fmt_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{n} B"
+
+
+def print_dispatch_estimate(
+    window_key: str,
+    uploads: List[Tuple[str, int]],
+    out_root: Path,
+    now: datetime,
+    concurrency: int = 1,
+) -> None:
+    bw = resolve_bandwidth(out_root)
+    res = estimate_dispatch(window_key, uploads, now, bw, concurrency)
+    if res is None:
+        print(f"\n[ESTIMATE] Unknown window '{window_key}', no estimate.")
+        return
+
+    start, opens_at, closes_at, estimates = res
+    src = f"{bw.source}, {bw.samples} uploads" if bw.source == "measured" else bw.source
+    print(f"\n[ESTIMATE] Window '{window_key}': {opens_at:%a %Y-%m-%d %H:%M}–{closes_at:%H:%M} {opens_at.tzinfo}")
+    print(f"Uplink     : {bw.mbps:.1f} Mbps ({src}), concurrency {max(1, concurrency)}")
+    print(f"Start      : {start:%H:%M:%S}")
+
+    for est in estimates:
+        mark = "OK" if est.in_window else "LATE"
+        print(f"{est.platform:<11}: {_fmt_bytes(est.bytes)} → ~{est.seconds / 60:.1f} min, done {est.completes_at:%H:%M:%S} [{mark}]")
+
+    for est in estimates:
+        if est.platform in WINDOW_GATED and not est.in_window:
+            print(
+                f"⚠️ {est.platform}: estimated completion {est.completes_at:%H:%M} lands outside "
+                f"the '{window_key}' window (closes {closes_at:%H:%M})."
+            )
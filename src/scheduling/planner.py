@@ -0,0 +1,274 @@
+# src/scheduling/planner.py
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from metadata import METADATA_NAME, load_metadata_yaml
+from scheduling.calendar import week_start
+from scheduling.windows import get_windows
+
+SCHEDULE_NAME = "schedule.json"
+
+# Two episodes of the same episode_type must be at least this many weeks apart
+# (2 == never back to back). Pinned episodes (allow_skip_week: false) are exempt.
+MIN_TYPE_GAP_WEEKS = 2
+
+# How far ahead the planner looks for a free week.
+HORIZON_WEEKS = 520
+
+# metadata assets flag -> window key
+ASSET_WINDOWS = (
+    ("has_youtube_full", "full"),
+    ("has_short_01", "short_01"),
+    ("has_short_02", "short_02"),
+)
+
+
+def week_id_of(d: date) -> str:
+    iso_year, iso_week, _ = d.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+def monday_of(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+@dataclass
+class Episode:
+    episode_id: str
+    episode_type: str
+    ready: bool
+    week_id: Optional[str]
+    allow_skip_week: bool
+    slots: List[str]
+    source: str
+    fingerprint: Tuple[int, int]
+
+    @classmethod
+    def from_meta(cls, meta: dict, source: Path, fingerprint: Tuple[int, int]) -> Optional["Episode"]:
+        epi = meta.get("episode", {}) if isinstance(meta.get("episode"), dict) else {}
+        rel = meta.get("release", {}) if isinstance(meta.get("release"), dict) else {}
+        assets = meta.get("assets", {}) if isinstance(meta.get("assets"), dict) else {}
+
+        episode_id = epi.get("episode_id")
+        if not isinstance(episode_id, str) or not episode_id.strip():
+            return None
+
+        if assets:
+            slots = [w for flag, w in ASSET_WINDOWS if assets.get(flag) is True]
+        else:
+            slots = ["full"]
+        windows = get_windows()
+
+        return cls(
+            episode_id=episode_id.strip(),
+            episode_type=str(epi.get("episode_type") or ""),
+            ready=rel.get("package_ready") is True,
+            week_id=rel.get("week_id") if isinstance(rel.get("week_id"), str) else None,
+            allow_skip_week=rel.get("allow_skip_week") is True,
+            slots=[w for w in slots if w in windows],
+            source=str(source),
+            fingerprint=fingerprint,
+        )
+
+
+@dataclass
+class Plan:
+    assignments: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    unplaced: Dict[str, str] = field(default_factory=dict)  # episode_id -> reason
+    sources: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # path -> cached episode fields
+    reparsed: int = 0
+
+
+def find_metadata_files(input_dir: Path) -> List[Path]:
+    """Every metadata.yaml under INPUT_DIR (one per episode folder, or the single root file)."""
+    if not input_dir.exists():
+        return []
+    out = []
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d != "media")
+        if METADATA_NAME in filenames:
+            out.append(Path(dirpath) / METADATA_NAME)
+    return out
+
+
+def load_schedule(out_root: Path) -> dict:
+    path = out_root / SCHEDULE_NAME
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def effective_week_id(meta: dict, schedule: Optional[dict]) -> Optional[str]:
+    """The planned week for this episode if the schedule has one, else release.week_id."""
+    release = meta.get("release", {}) if isinstance(meta.get("release"), dict) else {}
+    if schedule:
+        epi = meta.get("episode", {}) if isinstance(meta.get("episode"), dict) else {}
+        entry = (schedule.get("episodes") or {}).get(epi.get("episode_id"))
+        if isinstance(entry, dict) and entry.get("week_id"):
+            return entry["week_id"]
+    return release.get("week_id")
+
+
+def _load_episodes(files: Iterable[Path], previous_sources: Dict[str, Any], plan: Plan) -> List[Episode]:
+    """Parse only metadata files whose (size, mtime_ns) changed since the last plan."""
+    episodes: List[Episode] = []
+    for path in files:
+        st = path.stat()
+        fp = (st.st_size, st.st_mtime_ns)
+        cached = previous_sources.get(str(path))
+
+        if cached and tuple(cached.get("fingerprint", ())) == fp:
+            ep = Episode(**{**cached, "fingerprint": fp}) if cached.get("episode_id") else None
+        else:
+            try:
+                ep = Episode.from_meta(load_metadata_yaml(path), path, fp)
+            except RuntimeError as e:
+                plan.unplaced[str(path)] = str(e)
+                continue
+            plan.reparsed += 1
+
+        plan.sources[str(path)] = {**ep.__dict__, "fingerprint": list(fp)} if ep else {"fingerprint": list(fp)}
+        if ep:
+            episodes.append(ep)
+    return episodes
+
+
+class _Board:
+    """Occupied weeks plus, per episode_type, a sorted list of used weeks for spacing checks."""
+
+    def __init__(self):
+        self.taken: Dict[date, str] = {}
+        self.by_type: Dict[str, List[date]] = {}
+
+    def type_ok(self, episode_type: str, monday: date) -> bool:
+        weeks = self.by_type.get(episode_type)
+        if not episode_type or not weeks:
+            return True
+        gap = timedelta(weeks=MIN_TYPE_GAP_WEEKS)
+        i = bisect.bisect_left(weeks, monday)
+        if i < len(weeks) and weeks[i] - monday < gap:
+            return False
+        if i > 0 and monday - weeks[i - 1] < gap:
+            return False
+        return True
+
+    def take(self, ep: Episode, monday: date) -> None:
+        self.taken[monday] = ep.episode_id
+        bisect.insort(self.by_type.setdefault(ep.episode_type, []), monday)
+
+
+def plan_releases(input_dir: Path, out_root: Path, today: Optional[date] = None) -> Plan:
+    """
+    Assign ready episodes to upcoming ISO weeks (one episode per week, using the
+    windows its assets declare). Episodes with allow_skip_week: false stay on their
+    release.week_id; the others go to the earliest free week at or after their
+    release.week_id (or this week) that respects MIN_TYPE_GAP_WEEKS.
+
+    Incremental: unchanged metadata files are not re-parsed, and episodes whose
+    metadata did not change keep their previous week when it is still valid.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    this_monday = monday_of(today)
+
+    previous = load_schedule(out_root)
+    prev_sources = previous.get("sources") or {}
+    prev_episodes = previous.get("episodes") or {}
+
+    plan = Plan()
+    episodes = _load_episodes(find_metadata_files(input_dir), prev_sources, plan)
+
+    board = _Board()
+    seen: Dict[str, Episode] = {}
+    pinned: List[Episode] = []
+    flexible: List[Episode] = []
+
+    for ep in episodes:
+        if ep.episode_id in seen:
+            plan.unplaced[ep.episode_id] = f"duplicate episode_id (also in {seen[ep.episode_id].source})"
+            continue
+        seen[ep.episode_id] = ep
+        if not ep.ready:
+            plan.unplaced[ep.episode_id] = "release.package_ready is not true"
+        elif not ep.slots:
+            plan.unplaced[ep.episode_id] = "no window declared in assets"
+        elif not ep.allow_skip_week:
+            pinned.append(ep)
+        else:
+            flexible.append(ep)
+
+    def assign(ep: Episode, monday: date) -> None:
+        board.take(ep, monday)
+        plan.assignments[ep.episode_id] = {
+            "week_id": week_id_of(monday),
+            "slots": list(ep.slots),
+            "episode_type": ep.episode_type,
+            "pinned": not ep.allow_skip_week,
+            "source": ep.source,
+        }
+
+    # 1) Pinned episodes: their week or nothing.
+    for ep in sorted(pinned, key=lambda e: e.episode_id):
+        monday = week_start(ep.week_id)
+        if monday is None:
+            plan.unplaced[ep.episode_id] = f"invalid release.week_id: {ep.week_id!r}"
+        elif monday < this_monday:
+            plan.unplaced[ep.episode_id] = f"release.week_id {ep.week_id} is in the past (allow_skip_week: false)"
+        elif monday in board.taken:
+            plan.unplaced[ep.episode_id] = f"week {ep.week_id} already pinned by {board.taken[monday]}"
+        else:
+            assign(ep, monday)
+
+    # 2) Keep previous placements of unchanged flexible episodes (stable plan).
+    unchanged_paths = {p for p, src in prev_sources.items() if plan.sources.get(p) == src}
+    to_place: List[Episode] = []
+    for ep in flexible:
+        prev = prev_episodes.get(ep.episode_id)
+        monday = week_start(prev.get("week_id")) if isinstance(prev, dict) and ep.source in unchanged_paths else None
+        if monday and monday >= this_monday and monday not in board.taken and board.type_ok(ep.episode_type, monday):
+            assign(ep, monday)
+        else:
+            to_place.append(ep)
+
+    # 3) Place the rest, earliest first.
+    def not_before(ep: Episode) -> date:
+        declared = week_start(ep.week_id)
+        return max(this_monday, declared) if declared else this_monday
+
+    for ep in sorted(to_place, key=lambda e: (not_before(e), e.episode_id)):
+        monday = not_before(ep)
+        for _ in range(HORIZON_WEEKS):
+            if monday not in board.taken and board.type_ok(ep.episode_type, monday):
+                assign(ep, monday)
+                break
+            monday += timedelta(weeks=1)
+        else:
+            plan.unplaced[ep.episode_id] = f"no free week within {HORIZON_WEEKS} weeks"
+
+    return plan
+
+
+def write_schedule(out_root: Path, plan: Plan) -> Path:
+    out_root.mkdir(parents=True, exist_ok=True)
+    data = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "episodes": dict(sorted(plan.assignments.items(), key=lambda kv: (kv[1]["week_id"], kv[0]))),
+        "unplaced": plan.unplaced,
+        "sources": plan.sources,
+    }
+    path = out_root / SCHEDULE_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
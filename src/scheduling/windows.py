@@ -1,11 +1,19 @@
 # src/scheduling/windows.py
 
-from datetime import datetime, timedelta, time
-from zoneinfo import ZoneInfo
+import bisect
+import os
+from datetime import date, datetime, timedelta, time, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-# Phase 7 — LOCKED WINDOWS
+from metadata import safe_load
+
+DEFAULT_TZ = "America/New_York"
+
+# Phase 7 — LOCKED WINDOWS (used when no config/windows.yaml is found)
 # weekday: Monday=0 ... Sunday=6
-WINDOWS = {
+DEFAULT_WINDOWS = {
     "full": {
         "weekday": 1,   # Tuesday
         "time": time(13, 0),
@@ -23,37 +31,254 @@ WINDOWS = {
     },
 }
 
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "windows.yaml"
+
+# Number of weeks precomputed by WindowCalendar.
+CALENDAR_WEEKS = 52
+
+
+class WindowsConfigError(ValueError):
+    """Raised when the posting windows file cannot be read or is malformed."""
+
+
+def _parse_weekday(v) -> int:
+    if isinstance(v, int) and 0 <= v <= 6:
+        return v
+    if isinstance(v, str) and v.strip().lower() in WEEKDAYS:
+        return WEEKDAYS.index(v.strip().lower())
+    raise ValueError(f"invalid weekday: {v!r}")
+
+
+def _parse_time(v) -> time:
+    if isinstance(v, time):
+        return v
+    if isinstance(v, int):
+        # YAML 1.1 reads an unquoted 13:00 as sexagesimal minutes (780)
+        return time(v // 60, v % 60)
+    if isinstance(v, str):
+        return time.fromisoformat(v.strip())
+    raise ValueError(f"invalid time: {v!r}")
+
+
+def _config_path() -> Path:
+    env = os.getenv("WINDOWS_CONFIG")
+    return Path(env) if env else DEFAULT_CONFIG_PATH
+
+
+def load_windows(path: Optional[Path] = None) -> Dict[str, dict]:
+    """
+    Loads posting windows from WINDOWS_CONFIG (default: config/windows.yaml).
+    Every window gets its own 'tz' (window tz > file 'timezone' > TIMEZONE env > America/New_York).
+    Falls back to DEFAULT_WINDOWS when no config file exists.
+    Raises WindowsConfigError (naming the file) on anything unreadable or malformed.
+    """
+    path = path or _config_path()
+
+    default_tz = os.getenv("TIMEZONE") or DEFAULT_TZ
+    raw_windows = DEFAULT_WINDOWS
+
+    try:
+        if path.exists():
+            data = safe_load(path.read_text(encoding="utf-8")) or {}
+            if not isinstance(data, dict):
+                raise ValueError("expected a mapping with 'timezone' and 'windows'")
+            default_tz = data.get("timezone") or default_tz
+            raw_windows = data.get("windows") or {}
+            if not isinstance(raw_windows, dict) or not raw_windows:
+                raise ValueError("'windows' must be a non-empty mapping")
+
+        windows: Dict[str, dict] = {}
+        for key, cfg in raw_windows.items():
+            if not isinstance(cfg, dict):
+                raise ValueError(f"window {key!r} must be a mapping")
+            for field in ("weekday", "time"):
+                if field not in cfg:
+                    raise ValueError(f"window {key!r} has no {field!r}")
+            tz_name = cfg.get("tz") or default_tz
+            try:
+                ZoneInfo(tz_name)  # fail fast on unknown zones
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(f"window {key!r}: unknown timezone {tz_name!r}") from None
+            windows[str(key)] = {
+                "weekday": _parse_weekday(cfg["weekday"]),
+                "time": _parse_time(cfg["time"]),
+                "tolerance_min": int(cfg.get("tolerance_min", 30)),
+                "tz": tz_name,
+            }
+    except Exception as e:  # YAML syntax, bad values, unreadable file
+        raise WindowsConfigError(f"Invalid posting windows file {path}: {e}") from e
+    return windows
+
+
+_windows: Optional[Tuple[Tuple[str, Optional[int], Optional[str]], Dict[str, dict]]] = None
+
+
+def get_windows() -> Dict[str, dict]:
+    """
+    Shared windows, loaded on first use (not at import, so a broken file only fails the
+    modes that need windows) and reloaded when the file, WINDOWS_CONFIG or TIMEZONE changed.
+    """
+    global _windows
+    path = _config_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    key = (str(path), mtime, os.getenv("TIMEZONE"))
+    if _windows is None or _windows[0] != key:
+        _windows = (key, load_windows(path))
+    return _windows[1]
+
+
+class WindowCalendar:
+    """
+    Next N weeks of every window, precomputed as sorted UTC intervals.
+
+    Per window key, opens/closes are parallel sorted lists of POSIX timestamps,
+    so membership and "next occurrence" are a bisect instead of date arithmetic.
+    """
+
+    def __init__(self, windows: Dict[str, dict], start: datetime, weeks: int = CALENDAR_WEEKS):
+        start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        self.windows = windows
+        self.start_ts = start.timestamp()
+        self.end_ts = (start + timedelta(weeks=weeks)).timestamp()
+
+        self.opens: Dict[str, List[float]] = {}
+        self.closes: Dict[str, List[float]] = {}
+        self.intervals: List[Tuple[float, float, str]] = []
+        self.longest_s = max((2 * cfg["tolerance_min"] * 60 for cfg in windows.values()), default=0)
+
+        for key, cfg in windows.items():
+            tz = ZoneInfo(cfg["tz"])
+            tolerance = timedelta(minutes=cfg["tolerance_min"])
+            local_start = start.astimezone(tz).date() - timedelta(days=1)
+            first = local_start + timedelta(days=(cfg["weekday"] - local_start.weekday()) % 7)
+
+            opens, closes = [], []
+            for i in range(weeks + 1):
+                target = datetime.combine(first + timedelta(weeks=i), cfg["time"], tzinfo=tz)
+                opens.append((target - tolerance).timestamp())
+                closes.append((target + tolerance).timestamp())
+            self.opens[key] = opens
+            self.closes[key] = closes
+            self.intervals.extend(zip(opens, closes, [key] * len(opens)))
+
+        self.intervals.sort()
+
+    def covers(self, ts: float) -> bool:
+        return self.start_ts <= ts < self.end_ts
+
+    def is_open(self, window_key: str, ts: float) -> bool:
+        opens = self.opens.get(window_key)
+        if not opens:
+            return False
+        i = bisect.bisect_right(opens, ts) - 1
+        return i >= 0 and ts <= self.closes[window_key][i]
+
+    def upcoming(self, ts: float, n: int = 10) -> List[Tuple[float, float, str]]:
+        """Next n intervals (any window) that have not closed yet, in opening order."""
+        i = bisect.bisect_left(self.intervals, (ts - self.longest_s,))
+        out = []
+        for iv in self.intervals[i:]:
+            if iv[1] >= ts:
+                out.append(iv)
+                if len(out) == n:
+                    break
+        return out
+
+    def next_occurrences(self, window_key: str, ts: float, n: int = 1) -> List[Tuple[datetime, datetime]]:
+        """Current (if open) and following occurrences, as zone-aware (opens_at, closes_at)."""
+        closes = self.closes.get(window_key)
+        if not closes:
+            return []
+        tz = ZoneInfo(self.windows[window_key]["tz"])
+        i = bisect.bisect_left(closes, ts)
+        out = []
+        for j in range(i, min(i + n, len(closes))):
+            out.append((
+                datetime.fromtimestamp(self.opens[window_key][j], tz),
+                datetime.fromtimestamp(closes[j], tz),
+            ))
+        return out
+
+
+_calendar: Optional[WindowCalendar] = None
+
+
+def get_calendar(now: Optional[datetime] = None) -> WindowCalendar:
+    """Shared calendar, rebuilt only when 'now' falls outside its precomputed range."""
+    global _calendar
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    windows = get_windows()
+    if _calendar is None or _calendar.windows is not windows or not _calendar.covers(now.timestamp()):
+        _calendar = WindowCalendar(windows, now - timedelta(days=7))
+    return _calendar
+
+
+def window_tz(window_key: str) -> ZoneInfo:
+    return ZoneInfo(get_windows()[window_key]["tz"])
+
+
+def _localize(now: datetime, window_key: str) -> datetime:
+    tz = window_tz(window_key)
+    return now.replace(tzinfo=tz) if now.tzinfo is None else now
+
+
+def window_now(window_key: str, now: datetime) -> datetime:
+    """'now' as wall time in the window's timezone (naive is read as already local to it)."""
+    if window_key not in get_windows():
+        return now
+    return _localize(now, window_key).astimezone(window_tz(window_key))
+
 
 def is_within_locked_window(
     window_key: str,
     now: datetime,
-    tz_name: str = "America/New_York",
 ) -> bool:
     """
     Returns True if 'now' is within the locked posting window.
     Silent False if window_key is unknown or out of window.
+    A naive 'now' is read in the window's own timezone.
     """
-    if window_key not in WINDOWS:
+    if window_key not in get_windows():
         return False
 
-    tz = ZoneInfo(tz_name)
-    if now.tzinfo is None:
-        now = now.replace(tzinfo=tz)
-    else:
-        now = now.astimezone(tz)
+    now = _localize(now, window_key)
+    return get_calendar(now).is_open(window_key, now.timestamp())
 
-    cfg = WINDOWS[window_key]
 
-    if now.weekday() != cfg["weekday"]:
-        return False
+def window_bounds(window_key: str, day: date) -> tuple[datetime, datetime]:
+    """
+    Returns (opens_at, closes_at) of the window on a given local date,
+    i.e. target time +/- tolerance_min.
+    """
+    cfg = get_windows()[window_key]
+    target_dt = datetime.combine(day, cfg["time"], tzinfo=window_tz(window_key))
+    tolerance = timedelta(minutes=cfg["tolerance_min"])
+    return target_dt - tolerance, target_dt + tolerance
 
-    target_dt = datetime.combine(
-        now.date(),
-        cfg["time"],
-        tzinfo=tz,
-    )
 
-    tolerance = timedelta(minutes=cfg["tolerance_min"])
-    delta = abs(now - target_dt)
+def next_window(window_key: str, now: datetime) -> Optional[tuple[datetime, datetime]]:
+    """
+    Returns the current window occurrence if 'now' is inside it, else the next one.
+    None if window_key is unknown.
+    """
+    if window_key not in get_windows():
+        return None
+
+    now = _localize(now, window_key)
+    occ = get_calendar(now).next_occurrences(window_key, now.timestamp(), 1)
+    return occ[0] if occ else None
+
 
-    return delta <= tolerance
+def window_in_week(window_key: str, monday: date) -> Optional[tuple[datetime, datetime]]:
+    """(opens_at, closes_at) of the window inside the ISO week starting on 'monday'."""
+    if window_key not in get_windows():
+        return None
+    day = monday + timedelta(days=get_windows()[window_key]["weekday"])
+    return window_bounds(window_key, day)
@@ -0,0 +1,547 @@
+# src/standin.py
+"""
+Local stand-ins for the platform APIs the adapters talk to, for load tests and
+fault-injection runs without touching real accounts.
+
+    with StandIns(Faults(latency_ms=80, bandwidth_bps=4_000_000, error_rate=0.02)) as s:
+        os.environ.update(s.env())      # YOUTUBE_API_BASE, REDDIT_URL, REDDIT_OAUTH_URL...
+        dispatch(package, package_dir=run_dir, dry_run=False)
+        print(s.stats())
+
+    python src/standin.py --latency-ms 80 --rate-limit 20   # serve, print env exports
+
+One ThreadingHTTPServer per platform on 127.0.0.1 (port 0 = any free port), speaking
+just enough of each API for the real client libraries (googleapiclient, praw, requests):
+
+    youtube    resumable videos.insert, thumbnails.set, playlistItems.insert,
+               videos.update, videos.list (processingDetails moves from 'processing'
+               to 'succeeded' processing_s after the upload)
+    reddit     OAuth password grant, /api/v1/me, media asset lease + upload, /api/submit
+               (video posts finish over the websocket praw waits on), /comments/<id>/
+
+Instagram has no stand-in: its adapter only prints (posting is manual from the outbox).
+
+Faults apply to every request (the websocket excepted): latency (+ jitter), request
+bodies read at bandwidth_bps per connection, error_rate random 503s, and rate_limit
+requests/s per server (token bucket) answered with 429 + Retry-After.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import secrets
+import string
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PROCESSING_S = 2.0
+ACCESS_TOKEN = "standin-token"
+READ_CHUNK = 64 * 1024
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+Response = Tuple[int, Any, Dict[str, str]]  # (status, JSON payload or None, extra headers)
+
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0  # uniform +/- around latency_ms
+    bandwidth_bps: float = 0.0  # request body bytes/s per connection, 0 = unlimited
+    error_rate: float = 0.0  # fraction of requests answered 503
+    rate_limit: float = 0.0  # requests/s per server, 0 = unlimited
+
+
+class _TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.t = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """0 when a request may go through, else seconds until the next token."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.t) * self.rate)
+            self.t = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, platform: str, handler: type, faults: Faults, *, processing_s: float,
+                 processing_failure_rate: float = 0.0, host: str = "127.0.0.1", port: int = 0,
+                 seed: Optional[int] = None):
+        super().__init__((host, port), handler)
+        self.platform = platform
+        self.faults = faults
+        self.processing_s = processing_s
+        self.processing_failure_rate = processing_failure_rate
+        self.rng = random.Random(seed)
+        self.bucket = _TokenBucket(faults.rate_limit) if faults.rate_limit > 0 else None
+        self.lock = threading.Lock()
+        self.counters: Counter = Counter()
+        self.state: Dict[str, Dict[str, Any]] = {}  # per-platform objects: uploads, videos, posts...
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, **deltas: int) -> None:
+        with self.lock:
+            self.counters.update(deltas)
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def new_id(self, alphabet: str, n: int) -> str:
+        return "".join(secrets.choice(alphabet) for _ in range(n))
+
+    def processing_state(self, obj: Dict[str, Any]) -> str:
+        """'processing' | 'succeeded' | 'failed' for an uploaded object (decided once, at upload)."""
+        if obj.get("uploaded_at") is None:
+            return "pending"
+        if time.time() - obj["uploaded_at"] < self.processing_s:
+            return "processing"
+        return "failed" if obj.get("fails") else "succeeded"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Shared transport: body reading, faults, routing, JSON responses. Subclasses list ROUTES."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    server: StandInServer
+    ROUTES: List[Tuple[str, str, str, bool]] = []  # (method, path regex, handler name, needs auth)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    # -----------------------------
+    # Transport
+    # -----------------------------
+
+    def _read_body(self) -> bytes:
+        """Request body (Content-Length or chunked), throttled to faults.bandwidth_bps."""
+        bps = self.server.faults.bandwidth_bps
+        t0 = time.monotonic()
+        parts: List[bytes] = []
+        got = 0
+
+        def take(n: int) -> None:
+            nonlocal got
+            while n > 0:
+                chunk = self.rfile.read(min(READ_CHUNK, n))
+                if not chunk:
+                    raise ConnectionError("client closed the connection mid-body")
+                parts.append(chunk)
+                got += len(chunk)
+                n -= len(chunk)
+                if bps > 0:
+                    ahead = got / bps - (time.monotonic() - t0)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                take(size)
+                self.rfile.readline()
+        else:
+            take(int(self.headers.get("Content-Length") or 0))
+
+        self.server.count(bytes_in=got)
+        return b"".join(parts)
+
+    def _send(self, status: int, payload: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        # {"error": {"code", "message"}} is what Google and Graph clients both parse.
+        self._send(status, {"error": {"code": status, "message": message}}, headers)
+
+    def _dispatch(self, method: str) -> None:
+        srv = self.server
+        parts = urlsplit(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        srv.count(requests=1)
+
+        if method == "GET" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._websocket(parts.path)
+            return
+
+        try:
+            self.body = self._read_body()
+        except (ConnectionError, ValueError):
+            self.close_connection = True
+            return
+
+        f = srv.faults
+        if f.latency_ms or f.jitter_ms:
+            with srv.lock:
+                jitter = srv.rng.uniform(-f.jitter_ms, f.jitter_ms)
+            time.sleep(max(0.0, f.latency_ms + jitter) / 1000)
+
+        if srv.bucket is not None:
+            wait = srv.bucket.take()
+            if wait:
+                srv.count(rate_limited=1)
+                self._error(429, "Rate limit exceeded", {"Retry-After": str(max(1, math.ceil(wait)))})
+                return
+
+        if srv.roll(f.error_rate):
+            srv.count(errors_injected=1)
+            self._error(503, "Backend error (injected)")
+            return
+
+        for route_method, pattern, name, needs_auth in self.ROUTES:
+            if route_method != method:
+                continue
+            m = re.fullmatch(pattern, parts.path.rstrip("/"))
+            if not m:
+                continue
+            if needs_auth and not self._authorized():
+                self._error(401, "Invalid credentials")
+                return
+            srv.count(**{f"{method} {name}": 1})
+            self._send(*getattr(self, name)(*m.groups()))
+            return
+
+        self._error(404, f"No stand-in route for {method} {parts.path}")
+
+    def _authorized(self) -> bool:
+        auth = self.headers.get("Authorization", "")
+        if auth.split(" ", 1)[-1] == ACCESS_TOKEN or self.query.get("access_token") == ACCESS_TOKEN:
+            return True
+        form = self._form() if "form-urlencoded" in self.headers.get("Content-Type", "") else {}
+        return form.get("access_token") == ACCESS_TOKEN
+
+    def _form(self) -> Dict[str, str]:
+        return {k: v[-1] for k, v in parse_qs(self.body.decode("utf-8", "replace")).items()}
+
+    def _json_body(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            return {}
+
+    def _websocket(self, path: str) -> None:
+        self.close_connection = True
+        self._error(404, "No websocket here")
+
+
+# -----------------------------
+# YouTube Data API v3
+# -----------------------------
+
+class YouTubeHandler(_Handler):
+    ROUTES = [
+        ("POST", r"/upload/youtube/v3/videos", "videos_insert", True),
+        ("PUT", r"/upload/session/(\w+)", "upload_session", False),
+        ("POST", r"/upload/youtube/v3/thumbnails/set", "thumbnails_set", True),
+        ("POST", r"/youtube/v3/playlistItems", "playlist_items_insert", True),
+        ("PUT", r"/youtube/v3/videos", "videos_update", True),
+        ("GET", r"/youtube/v3/videos", "videos_list", True),
+    ]
+
+    def videos_insert(self) -> Response:
+        if self.query.get("uploadType") != "resumable":
+            return 400, {"error": {"code": 400, "message": "stand-in only accepts resumable uploads"}}, {}
+        srv = self.server
+        session = srv.new_id(string.ascii_letters + string.digits, 24)
+        with srv.lock:
+            srv.state.setdefault("sessions", {})[session] = {
+                "body": self._json_body(),
+                "size": int(self.headers.get("X-Upload-Content-Length") or 0),
+            }
+        return 200, None, {"Location": f"{srv.url}/upload/session/{session}"}
+
+    def upload_session(self, session: str) -> Response:
+        srv = self.server
+        with srv.lock:
+            pending = srv.state.get("sessions", {}).pop(session, None)
+        if pending is None:
+            return 404, {"error": {"code": 404, "message": "Unknown upload session"}}, {}
+
+        video_id = srv.new_id(string.ascii_letters + string.digits + "-_", 11)
+        body = pending["body"]
+        video = {
+            "id": video_id,
+            "snippet": body.get("snippet", {}),
+            "status": {"privacyStatus": "private", **body.get("status", {})},
+            "uploaded_at": time.time(),
+            "fails": srv.roll(srv.processing_failure_rate),
+            "bytes": len(self.body),
+        }
+        with srv.lock:
+            srv.state.setdefault("videos", {})[video_id] = video
+        return 200, self._resource(video), {}
+
+    def thumbnails_set(self) -> Response:
+        return 200, {"kind": "youtube#thumbnailSetResponse", "items": [{"default": {"url": "stand-in"}}]}, {}
+
+    def playlist_items_insert(self) -> Response:
+        item = self._json_body()
+        item.update(kind="youtube#playlistItem", id=self.server.new_id(string.ascii_letters, 16))
+        return 200, item, {}
+
+    def videos_update(self) -> Response:
+        body = self._json_body()
+        with self.server.lock:
+            video = self.server.state.get("videos", {}).get(body.get("id"))
+            if video is not None:
+                video["status"].update(body.get("status", {}))
+        if video is None:
+            return 404, {"error": {"code": 404, "message": "Video not found"}}, {}
+        return 200, self._resource(video), {}
+
+    def videos_list(self) -> Response:
+        ids = [i for i in self.query.get("id", "").split(",") if i]
+        if len(ids) > 50:
+            return 400, {"error": {"code": 400, "message": "Too many ids (max 50)"}}, {}
+        with self.server.lock:
+            videos = self.server.state.get("videos", {})
+            items = [self._resource(videos[i]) for i in ids if i in videos]
+        return 200, {"kind": "youtube#videoListResponse", "items": items,
+                     "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}, {}
+
+    def _resource(self, video: Dict[str, Any]) -> Dict[str, Any]:
+        state = self.server.processing_state(video)
+        upload_status = {"processing": "uploaded", "succeeded": "processed", "failed": "failed"}[state]
+        details: Dict[str, Any] = {"processingStatus": state}
+        if state == "processing":
+            total = max(self.server.processing_s, 1e-3)
+            done = min(1.0, (time.time() - video["uploaded_at"]) / total)
+            details["processingProgress"] = {"partsTotal": 1000, "partsProcessed": int(done * 1000),
+                                             "timeLeftMs": int((1 - done) * total * 1000)}
+        elif state == "failed":
+            details["processingFailureReason"] = "transcodeFailed"
+        return {
+            "kind": "youtube#video",
+            "id": video["id"],
+            "snippet": video["snippet"],
+            "status": {**video["status"], "uploadStatus": upload_status},
+            "processingDetails": details,
+        }
+
+
+# -----------------------------
+# Reddit (OAuth + the endpoints praw uses to submit)
+# -----------------------------
+
+class RedditHandler(_Handler):
+    ROUTES = [
+        ("POST", r"/api/v1/access_token", "access_token", False),
+        ("GET", r"/api/v1/me", "me", True),
+        ("POST", r"/api/media/asset\.json", "media_asset", True),
+        ("POST", r"/media-upload", "media_upload", False),
+        ("POST", r"/api/submit", "submit", True),
+        ("GET", r"/comments/(\w+)", "comments", True),
+    ]
+
+    def access_token(self) -> Response:
+        if self._form().get("grant_type") != "password":
+            return 400, {"error": "unsupported_grant_type"}, {}
+        return 200, {"access_token": ACCESS_TOKEN, "token_type": "bearer", "expires_in": 86400, "scope": "*"}, {}
+
+    def me(self) -> Response:
+        return 200, {"name": "standin", "id": "standin", "created_utc": 0}, {}
+
+    def media_asset(self) -> Response:
+        form = self._form()
+        asset_id = self.server.new_id(string.ascii_lowercase + string.digits, 13)
+        host = self.server.url.split("://", 1)[1]
+        return 200, {
+            "args": {
+                "action": f"//{host}/media-upload",
+                "fields": [{"name": "key", "value": f"{asset_id}/{form.get('filepath', 'media')}"},
+                           {"name": "Content-Type", "value": form.get("mimetype", "application/octet-stream")}],
+            },
+            "asset": {"asset_id": asset_id, "websocket_url": self._ws_url(asset_id)},
+        }, {}
+
+    def media_upload(self) -> Response:
+        return 201, None, {}
+
+    def submit(self) -> Response:
+        form = self._form()
+        srv = self.server
+        post_id = srv.new_id(string.ascii_lowercase + string.digits, 7)
+        sr = form.get("sr", "test")
+        slug = re.sub(r"[^a-z0-9]+", "_", form.get("title", "").lower()).strip("_")[:50] or "post"
+        permalink = f"/r/{sr}/comments/{post_id}/{slug}/"
+        with srv.lock:
+            srv.state.setdefault("posts", {})[post_id] = {
+                "id": post_id, "name": f"t3_{post_id}", "subreddit": sr, "title": form.get("title", ""),
+                "permalink": permalink, "url": form.get("url") or f"https://www.reddit.com{permalink}",
+                "is_self": form.get("kind") == "self", "selftext": form.get("text", ""), "created_utc": time.time(),
+            }
+        if form.get("kind") in ("video", "videogif", "image"):
+            return 200, {"json": {"errors": [], "data": {"user_submitted_page": "", "websocket_url": self._ws_url(post_id)}}}, {}
+        return 200, {"json": {"errors": [], "data": {"url": f"https://www.reddit.com{permalink}", "drafts_count": 0,
+                                                     "id": post_id, "name": f"t3_{post_id}"}}}, {}
+
+    def comments(self, post_id: str) -> Response:
+        with self.server.lock:
+            post = self.server.state.get("posts", {}).get(post_id)
+        if post is None:
+            return 404, {"message": "Not Found", "error": 404}, {}
+        return 200, [
+            {"kind": "Listing", "data": {"after": None, "before": None, "children": [{"kind": "t3", "data": post}]}},
+            {"kind": "Listing", "data": {"after": None, "before": None, "children": []}},
+        ], {}
+
+    def _ws_url(self, key: str) -> str:
+        return self.server.url.replace("http://", "ws://", 1) + f"/ws/{key}"
+
+    def _websocket(self, path: str) -> None:
+        """Minimal RFC 6455 handshake, then the single 'success' frame praw waits for."""
+        self.close_connection = True
+        m = re.fullmatch(r"/ws/(\w+)", path)
+        with self.server.lock:
+            post = self.server.state.get("posts", {}).get(m.group(1)) if m else None
+        if post is None:
+            self._error(404, "Unknown websocket")
+            return
+
+        time.sleep(self.server.processing_s)
+        if self.server.roll(self.server.processing_failure_rate):
+            message = {"type": "failed", "payload": {}}
+        else:
+            message = {"type": "success", "payload": {"redirect": f"https://www.reddit.com{post['permalink']}"}}
+
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+
+        data = json.dumps(message).encode("utf-8")
+        header = bytes([0x81, len(data)]) if len(data) < 126 else bytes([0x81, 126]) + len(data).to_bytes(2, "big")
+        self.wfile.write(header + data)
+        self.wfile.flush()
+
+
+HANDLERS: Dict[str, type] = {"youtube": YouTubeHandler, "reddit": RedditHandler}
+
+
+class StandIns:
+    """The YouTube and Reddit stand-ins, each served from its own thread. Use as a context manager."""
+
+    def __init__(self, faults: Optional[Faults] = None, *, processing_s: float = DEFAULT_PROCESSING_S,
+                 processing_failure_rate: float = 0.0, host: str = "127.0.0.1", seed: Optional[int] = None):
+        self.faults = faults or Faults()
+        self.servers: Dict[str, StandInServer] = {
+            name: StandInServer(name, handler, self.faults, processing_s=processing_s,
+                                processing_failure_rate=processing_failure_rate, host=host, seed=seed)
+            for name, handler in HANDLERS.items()
+        }
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "StandIns":
+        for name, srv in self.servers.items():
+            t = threading.Thread(target=srv.serve_forever, name=f"standin-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def close(self) -> None:
+        for srv in self.servers.values():
+            srv.shutdown()
+            srv.server_close()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads.clear()
+
+    def __enter__(self) -> "StandIns":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points the YouTube and Reddit adapters at these servers."""
+        return {
+            "YOUTUBE_API_BASE": self.servers["youtube"].url,
+            "YOUTUBE_ACCESS_TOKEN": ACCESS_TOKEN,
+            "REDDIT_URL": self.servers["reddit"].url,
+            "REDDIT_OAUTH_URL": self.servers["reddit"].url,
+            "REDDIT_CLIENT_ID": "standin",
+            "REDDIT_CLIENT_SECRET": "standin",
+            "REDDIT_USERNAME": "standin",
+            "REDDIT_PASSWORD": "standin",
+            "praw_check_for_updates": "False",  # no PyPI request per client
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        out = {}
+        for name, srv in self.servers.items():
+            with srv.lock:
+                out[name] = dict(srv.counters)
+        return out
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve local platform stand-ins and print the env that targets them.")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="request body bytes/s per connection (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/s per platform before 429 (0 = unlimited)")
+    parser.add_argument("--processing-s", type=float, default=DEFAULT_PROCESSING_S)
+    parser.add_argument("--processing-failure-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    faults = Faults(args.latency_ms, args.jitter_ms, args.bandwidth, args.error_rate, args.rate_limit)
+    with StandIns(faults, processing_s=args.processing_s, processing_failure_rate=args.processing_failure_rate) as s:
+        for k, v in s.env().items():
+            print(f"export {k}={v}")
+        print("# Ctrl-C to stop", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        print(json.dumps(s.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# src/tracing.py
+"""
+Lightweight stage tracing.
+
+Disabled by default: span() returns a shared no-op object and annotate() returns immediately,
+so instrumented code pays one global lookup per call.
+
+When enabled (--trace or TRACE=1), finished spans are buffered in memory and flushed with
+write(run_dir) to <run_dir>/trace.json, one Chrome trace event per line. The file is a JSON
+array without its closing bracket, which chrome://tracing and ui.perfetto.dev both accept,
+and it can be appended to by later replays of the same run.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+TRACE_NAME = "trace.json"
+
+_events: Optional[List[Dict[str, Any]]] = None  # None == disabled
+_span_hook: Optional[Any] = None  # object with enter(name, depth) / exit(name, depth), e.g. the profiler
+_epoch_offset_ns = 0
+_local = threading.local()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "_t0")
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self._t0 = 0
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.args[key] = value
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        if _span_hook is not None:
+            _span_hook.enter(self.name, len(stack))
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        t1 = time.perf_counter_ns()
+        if _span_hook is not None:
+            _span_hook.exit(self.name, len(_local.stack))
+        _local.stack.pop()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        events = _events
+        if events is not None:
+            events.append({
+                "name": self.name,
+                "ph": "X",
+                "ts": (self._t0 + _epoch_offset_ns) // 1000,
+                "dur": (t1 - self._t0) // 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": self.args,
+            })
+        return False
+
+
+def enable() -> None:
+    global _events, _epoch_offset_ns
+    if _events is None:
+        _epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        _events = []
+
+
+def set_span_hook(hook: Optional[Any]) -> None:
+    """Calls hook.enter(name, depth) / hook.exit(name, depth) around every span (depth 1 = outermost)."""
+    global _span_hook
+    _span_hook = hook
+
+
+def is_enabled() -> bool:
+    return _events is not None
+
+
+def span(name: str, **attrs: Any):
+    """
+    Usage:
+        with span("write_outboxes", files=3) as sp:
+            ...
+            sp["bytes"] = total
+    """
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def annotate(**attrs: Any) -> None:
+    """Attach attributes to the innermost open span of this thread (no-op when disabled)."""
+    if _events is None:
+        return
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].args.update(attrs)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span(); use annotate() inside the function to add attributes."""
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _events is None:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def write(run_dir: str | Path) -> Optional[Path]:
+    """
+    Flush buffered spans to <run_dir>/trace.json (appending). Returns the path, or None
+    when tracing is disabled or nothing was recorded.
+    """
+    global _events
+    if not _events:
+        return None
+
+    events, _events = _events, []
+    path = Path(run_dir) / TRACE_NAME
+    new_file = not path.exists()
+    with path.open("a", encoding="utf-8") as f:
+        if new_file:
+            f.write("[\n")
+        for ev in events:
+            f.write(json.dumps(ev, ensure_ascii=False, default=str) + ",\n")
+    return path
@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from tracing import annotate, traced
+
 
 class ValidationError(Exception):
     """Raised when the post package is invalid."""
@@ -54,15 +56,17 @@ def load_post_package(package_path: Path) -> Dict[str, Any]:
     return data
 
 
-def validate_post_package(package_path: Path) -> ValidationResult:
+def validate_post_package(package_path: Path, data: Optional[Dict[str, Any]] = None) -> ValidationResult:
+    """data: the already-parsed package, when the caller has it (not read again)."""
     errors: List[str] = []
     base_dir = package_path.parent
 
     # 1) Load JSON
-    try:
-        data = load_post_package(package_path)
-    except ValidationError as e:
-        return ValidationResult(ok=False, errors=[str(e)])
+    if data is None:
+        try:
+            data = load_post_package(package_path)
+        except ValidationError as e:
+            return ValidationResult(ok=False, errors=[str(e)])
 
     # 2) Required top-level keys
     for k in REQUIRED_TOP_LEVEL_KEYS:
@@ -153,8 +157,10 @@ def validate_post_package(package_path: Path) -> ValidationResult:
     return ValidationResult(ok=(len(errors) == 0), errors=errors)
 
 
-def raise_if_invalid(package_path: Path) -> None:
-    res = validate_post_package(package_path)
+@traced("raise_if_invalid")
+def raise_if_invalid(package_path: Path, data: Optional[Dict[str, Any]] = None) -> None:
+    res = validate_post_package(package_path, data)
+    annotate(errors=len(res.errors))
     if not res.ok:
         msg = "Post package validation failed:\n" + "\n".join(f"- {e}" for e in res.errors)
         raise ValidationError(msg)
@@ -0,0 +1,169 @@
+# src/watch.py
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+# Bursts of events (editor save = write + rename + chmod...) are merged until the
+# input folder has been quiet for this long.
+DEFAULT_DEBOUNCE_S = 0.3
+DEFAULT_POLL_S = 0.5
+
+# inotify(7)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ATTRIB
+_EVENT = struct.Struct("iIII")
+
+
+def _skip(name: str) -> bool:
+    # editor swap/backup files never change the package
+    return name.startswith(".") or name.endswith(("~", ".swp", ".tmp"))
+
+
+class InotifyWatcher:
+    """Linux inotify through libc (ctypes), watching INPUT_DIR and its subfolders."""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify not available")
+
+        self.root = root
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wds: Dict[int, Path] = {}
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not _skip(d)]
+            self._add(Path(dirpath))
+
+    def _add(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._wds[wd] = path
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        """Changed paths (relative to root); empty set on timeout."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[Path] = set()
+        off = 0
+        while off + _EVENT.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT.unpack_from(buf, off)
+            name = buf[off + _EVENT.size: off + _EVENT.size + length].rstrip(b"\0").decode("utf-8", "replace")
+            off += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(Path("."))  # events lost: treat as "everything changed"
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            base = self._wds.get(wd)
+            if base is None or (name and _skip(name)):
+                continue
+            path = base / name if name else base
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add(path)
+            changed.add(path.relative_to(self.root))
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback: re-stat every file under root every poll_s seconds."""
+
+    def __init__(self, root: Path, poll_s: float = DEFAULT_POLL_S):
+        self.root = root
+        self.poll_s = poll_s
+        self._state = self._snapshot()
+
+    def _snapshot(self) -> Dict[Path, tuple]:
+        state = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not _skip(d)]
+            for fn in filenames:
+                if _skip(fn):
+                    continue
+                p = Path(dirpath) / fn
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                state[p.relative_to(self.root)] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.poll_s if deadline is None else max(0.0, min(self.poll_s, deadline - time.monotonic())))
+            new = self._snapshot()
+            changed = {p for p in new.keys() | self._state.keys() if new.get(p) != self._state.get(p)}
+            self._state = new
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(root: Path):
+    if os.getenv("WATCH_POLLING") != "1":
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+def watch(root: Path, on_change: Callable[[Set[Path]], None], *, debounce_s: float = DEFAULT_DEBOUNCE_S) -> None:
+    """
+    Calls on_change(changed relative paths) once per burst of changes under root,
+    after debounce_s of quiet. Runs until KeyboardInterrupt.
+    """
+    watcher = make_watcher(root)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else f"polling every {DEFAULT_POLL_S}s"
+    print(f"Watching: {root.resolve()} ({kind}). Ctrl+C to stop.")
+    try:
+        while True:
+            changed = watcher.wait(None)
+            while True:
+                more = watcher.wait(debounce_s)
+                if not more:
+                    break
+                changed |= more
+            if changed:
+                on_change(changed)
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
+    finally:
+        watcher.close()
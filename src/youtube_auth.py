@@ -1,11 +1,13 @@
 # src/youtube_auth.py
 from __future__ import annotations
 
+import functools
 import json
 from pathlib import Path
 from typing import Sequence
 
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -43,3 +45,22 @@ def get_youtube_service(
         token_file.write_text(creds.to_json(), encoding="utf-8")
 
     return build("youtube", "v3", credentials=creds)
+
+
+@functools.lru_cache(maxsize=None)
+def _static_discovery_doc() -> str:
+    return get_static_doc("youtube", "v3")
+
+
+def get_youtube_service_at(api_base: str, access_token: str):
+    """
+    YouTube API client for another server with the same API (YOUTUBE_API_BASE, e.g. the
+    local stand-ins in src/standin.py), authenticated with a static bearer token.
+    The discovery document's rootUrl is replaced rather than passing api_endpoint:
+    googleapiclient builds media upload URLs from rootUrl only.
+    """
+    doc = json.loads(_static_discovery_doc())
+    root = api_base.rstrip("/") + "/"
+    doc["rootUrl"] = root
+    doc["baseUrl"] = root + doc["servicePath"]
+    return build_from_document(doc, credentials=Credentials(token=access_token))